@@ -1,38 +1,141 @@
 from flask import Flask
 from flask_migrate import Migrate
 from flask_cors import CORS
+from sqlalchemy import create_engine
 
+from backend.commands import COMMANDS
+from backend.logic.write_queue import WriteQueue
 from backend.models import db
 from backend.routes import api_bp
-from backend.seed import seed_database
+from backend.utils.db_routing import READ_ENGINE
+from backend.utils.engine_profiles import configure_engine, engine_options
+from backend.utils.metrics import init_metrics, instrument_engine
+from backend.utils.passwords import DEFAULT_ROUNDS, default_workers, password_hasher
+from backend.utils.principals import principal_cache
+from backend.utils.slow_queries import init_slow_query_log
 
 import logging
+import os
+from pathlib import Path
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
 
-app = Flask(__name__)
 
-# Configure Database
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///database.db"
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-app.config["JWT_SECRET"] = "your-very-secret-key"
-app.config["JWT_ALGORITHM"] = "HS256"
-app.config["JWT_EXP_DELTA_SECONDS"] = 3600  # 1 hour
-app.config["DEBUG"] = True
+def default_config():
+    return {
+        "SQLALCHEMY_DATABASE_URI": os.environ.get("DATABASE_URL", "sqlite:///database.db"),
+        "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+        # optional replica (or read-only SQLite connection) for GET endpoints
+        "SQLALCHEMY_READ_DATABASE_URI": os.environ.get("READ_DATABASE_URL"),
+        # auto, sqlite, server or default; see backend/utils/engine_profiles.py
+        "DB_ENGINE_PROFILE": os.environ.get("DB_ENGINE_PROFILE", "auto"),
+        "SQLITE_BUSY_TIMEOUT_MS": 5000,
+        "SQLITE_CACHE_SIZE_KB": 64 * 1024,
+        "SQLITE_MMAP_SIZE": 256 * 1024 * 1024,
+        "DB_POOL_SIZE": int(os.environ.get("DB_POOL_SIZE", 10)),
+        "DB_MAX_OVERFLOW": int(os.environ.get("DB_MAX_OVERFLOW", 20)),
+        "DB_POOL_RECYCLE_SECONDS": 1800,
+        # funnel saves through one writer thread that commits them in batches
+        "WRITE_QUEUE_ENABLED": os.environ.get("WRITE_QUEUE_ENABLED", "").lower() in ("1", "true"),
+        "WRITE_QUEUE_BATCH_SIZE": 32,
+        "WRITE_QUEUE_LINGER_MS": 2,
+        # attempts and base backoff for saves that hit "database is locked"
+        "WRITE_RETRY_ATTEMPTS": 5,
+        "WRITE_RETRY_BASE_MS": 10,
+        "JWT_SECRET": "your-very-secret-key",
+        "JWT_ALGORITHM": "HS256",
+        "JWT_EXP_DELTA_SECONDS": 3600,  # 1 hour
+        # token -> principal cache used to authorize requests without a User lookup
+        "PRINCIPAL_CACHE_TTL_SECONDS": 60,
+        "PRINCIPAL_CACHE_SIZE": 1024,
+        # bcrypt cost; pick one for this host with `flask calibrate-password-hashing`
+        "PASSWORD_HASH_ROUNDS": int(os.environ.get("PASSWORD_HASH_ROUNDS", DEFAULT_ROUNDS)),
+        "PASSWORD_HASH_WORKERS": int(os.environ.get("PASSWORD_HASH_WORKERS", default_workers())),
+        # hashes queued or running at once; further requests wait up to the queue timeout
+        "PASSWORD_HASH_MAX_PENDING": 16,
+        "PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS": 2.0,
+        # per-endpoint request and SQL metrics at /api/metrics
+        "METRICS_ENABLED": True,
+        # add a Server-Timing header (database time, query count) to every response
+        "SERVER_TIMING_ENABLED": os.environ.get("SERVER_TIMING_ENABLED", "").lower()
+        in ("1", "true"),
+        # JSON-lines log of statements slower than the threshold, with their query plans
+        "SLOW_QUERY_LOG_PATH": os.environ.get("SLOW_QUERY_LOG"),
+        "SLOW_QUERY_THRESHOLD_MS": float(os.environ.get("SLOW_QUERY_THRESHOLD_MS", 100)),
+        "SLOW_QUERY_LOG_MAX_BYTES": 10 * 1024 * 1024,
+        "SLOW_QUERY_LOG_BACKUPS": 5,
+        "DEBUG": True,
+        # comma separated emails of users allowed to use the /api/admin endpoints
+        "ADMIN_EMAILS": [
+            email.strip()
+            for email in os.environ.get("ADMIN_EMAILS", "").split(",")
+            if email.strip()
+        ],
+    }
 
-# Initialize Database with Flask app
-db.init_app(app)
-Migrate(app, db)
-CORS(app)
 
-# Register Routes
-app.register_blueprint(api_bp)
+def create_app(config=None):
+    """Build the Flask app. Only wires things up: the database is created and seeded
+    with ``flask seed``, and the test seed is written with ``flask export-seed``."""
+    app = Flask(__name__)
+    app.config.update(default_config())
+    app.config.update(config or {})
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        **engine_options(app.config),
+        **app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}),
+    }
+
+    # Initialize Database with Flask app
+    db.init_app(app)
+    with app.app_context():
+        engines = [db.engine]
+    configure_engine(engines[0], app.config)
+    if app.config["SQLALCHEMY_READ_DATABASE_URI"]:
+        read_engine = create_engine(
+            app.config["SQLALCHEMY_READ_DATABASE_URI"], **app.config["SQLALCHEMY_ENGINE_OPTIONS"]
+        )
+        configure_engine(read_engine, app.config, read_only=True)
+        app.extensions[READ_ENGINE] = read_engine
+        engines.append(read_engine)
+    if app.config["METRICS_ENABLED"]:
+        for engine in engines:
+            instrument_engine(engine)
+    init_slow_query_log(app, engines)
+    Migrate(app, db, directory=str(MIGRATIONS_DIR))
+    CORS(app)
+    principal_cache.configure(
+        app.config["PRINCIPAL_CACHE_TTL_SECONDS"], app.config["PRINCIPAL_CACHE_SIZE"]
+    )
+    password_hasher.configure(
+        rounds=app.config["PASSWORD_HASH_ROUNDS"],
+        workers=app.config["PASSWORD_HASH_WORKERS"],
+        max_pending=app.config["PASSWORD_HASH_MAX_PENDING"],
+        queue_timeout=app.config["PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS"],
+        timeout=30.0,
+    )
+
+    if app.config["WRITE_QUEUE_ENABLED"]:
+        app.extensions["write_queue"] = WriteQueue(
+            app,
+            batch_size=app.config["WRITE_QUEUE_BATCH_SIZE"],
+            linger_ms=app.config["WRITE_QUEUE_LINGER_MS"],
+            attempts=app.config["WRITE_RETRY_ATTEMPTS"],
+            base_ms=app.config["WRITE_RETRY_BASE_MS"],
+        )
+
+    # Register Routes
+    app.register_blueprint(api_bp)
+    init_metrics(app)
+
+    # Register CLI commands
+    for command in COMMANDS:
+        app.cli.add_command(command)
+
+    return app
 
-with app.app_context():
-    db.create_all()
-    seed_database()
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    create_app().run(host="0.0.0.0", port=5000, debug=True)
@@ -0,0 +1,138 @@
+"""Benchmark compute_needs_analytics on a synthetic season.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_analytics --sites 10000
+"""
+
+import argparse
+import random
+import time
+
+from sqlalchemy import insert
+
+from backend.benchmarks.bench_upsert import create_bench_app
+from backend.logic.analytics import compute_needs_analytics
+from backend.models import (
+    db,
+    Assessment,
+    Organization,
+    OrganizationQuestion,
+    OrganizationQuestionResponse,
+    Page,
+    Question,
+    QuestionResponse,
+    Site,
+    SiteAssessment,
+    SitePage,
+)
+
+CATEGORIES = ["Food", "Clothing", "Hygiene", "Baby Items", "Household"]
+ITEMS = [f"Item {i}" for i in range(20)]
+REGIONS = ["North", "South", "East", "West"]
+
+
+def seed_season(num_sites, seed=0):
+    """One needs question per category page, one site assessment per site, bulk inserted."""
+    rng = random.Random(seed)
+    assessment = Assessment(year=2025, season="Spring")
+    region = OrganizationQuestion(
+        text="What region do you operate in?",
+        question_type="MultiSelectWithOther",
+        order=1,
+        slug="orgregion",
+    )
+    db.session.add_all([assessment, region])
+    db.session.flush()
+
+    questions = []
+    for order, category in enumerate(CATEGORIES):
+        page = Page(title=category, assessment_id=assessment.id, order=order)
+        db.session.add(page)
+        db.session.flush()
+        question = Question(
+            page_id=page.id,
+            text=f"What {category} items do you need?",
+            question_type="MultiSelect",
+            options=ITEMS,
+            order=1,
+        )
+        db.session.add(question)
+        db.session.flush()
+        questions.append((page.id, question.id))
+
+    ids = range(1, num_sites + 1)
+    db.session.execute(insert(Organization), [{"id": i, "name": f"Org {i}"} for i in ids])
+    db.session.execute(
+        insert(Site),
+        [
+            {
+                "id": i,
+                "name": f"Site {i}",
+                "organization_id": i,
+                "people_served": rng.randint(1, 500),
+            }
+            for i in ids
+        ],
+    )
+    db.session.execute(
+        insert(OrganizationQuestionResponse),
+        [
+            {"organization_id": i, "question_id": region.id, "value": [rng.choice(REGIONS)]}
+            for i in ids
+        ],
+    )
+    db.session.execute(
+        insert(SiteAssessment),
+        [{"id": i, "site_id": i, "assessment_id": assessment.id, "revision": 0} for i in ids],
+    )
+    site_pages = []
+    responses = []
+    for i in ids:
+        for order, (page_id, question_id) in enumerate(questions):
+            site_page_id = len(site_pages) + 1
+            site_pages.append(
+                {
+                    "id": site_page_id,
+                    "site_assessment_id": i,
+                    "page_id": page_id,
+                    "order": order,
+                    "title": CATEGORIES[order],
+                }
+            )
+            responses.append(
+                {
+                    "site_page_id": site_page_id,
+                    "question_id": question_id,
+                    "value": rng.sample(ITEMS, rng.randint(0, 5)),
+                }
+            )
+    db.session.execute(insert(SitePage), site_pages)
+    db.session.execute(insert(QuestionResponse), responses)
+    db.session.commit()
+    return assessment.year, assessment.season, len(responses)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sites", type=int, default=10000)
+    parser.add_argument("--database-uri", default="sqlite:///:memory:")
+    args = parser.parse_args()
+
+    app = create_bench_app(args.database_uri)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        year, season, num_responses = seed_season(args.sites)
+
+        start = time.perf_counter()
+        analytics = compute_needs_analytics(year, season)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{args.sites} sites, {num_responses} responses: {elapsed * 1000:.0f} ms, "
+            f"{len(analytics['items'])} items, {len(analytics['regions'])} region rows"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Concurrent save_site_page requests against a SQLite file, per engine profile.
+
+Every thread plays one site autosaving its page over and over. Compares the engine
+profiles from backend/utils/engine_profiles.py ("default" is the setup the app
+used before profiles: rollback journal, full fsync), optionally with the saves
+funnelled through the single-writer queue. Run from the repository root:
+
+    python -m backend.benchmarks.bench_concurrency --threads 16 --saves 25
+    python -m backend.benchmarks.bench_concurrency --profiles sqlite --write-queue
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, UTC
+from pathlib import Path
+
+from backend.app import create_app
+from backend.logic.catalog_sync import sync_catalog
+from backend.models import db, Organization, Site, SitePage, User
+from backend.utils.item_catalog import load_item_catalog
+from backend.utils.jwt_utils import generate_jwt_payload
+from backend.utils.utils import ensure_assessment_exists, get_current_season
+
+BENCH_PAGE = "Food"
+
+
+def _value(question):
+    return {"Numeric": "1", "MultiSelect": [], "DemoGrid": "", "SizingGrid": ""}.get(
+        question.question_type, "Yes"
+    )
+
+
+def seed_sites(num_sites):
+    """The current season's catalog and one site assessment per site.
+
+    Returns [(save url, responses, headers)], one per site.
+    """
+    sync_catalog(
+        datetime.now(UTC).year,
+        get_current_season(),
+        "backend/data/questions.csv",
+        "backend/data/response_options.json",
+        load_item_catalog().choices,
+    )
+    org = Organization(name="Bench Org")
+    db.session.add(org)
+    db.session.flush()
+    sites = [Site(name=f"Bench Site {i}", organization_id=org.id) for i in range(num_sites)]
+    db.session.add_all(sites)
+    db.session.flush()
+    # saves are scoped to the caller's site; these users never log in
+    users = [
+        User(
+            email=f"bench{i}@bench.example",
+            hashed_password="-",
+            organization_id=org.id,
+            site_id=site.id,
+        )
+        for i, site in enumerate(sites)
+    ]
+    db.session.add_all(users)
+    db.session.commit()
+
+    targets = []
+    for site, user in zip(sites, users):
+        site_assessment = ensure_assessment_exists(site.id)
+        site_page = SitePage.query.filter_by(
+            site_assessment_id=site_assessment.id, title=BENCH_PAGE
+        ).one()
+        responses = [{"questionId": q.id, "value": _value(q)} for q in site_page.page.questions]
+        url = f"/api/site-assessment/{site_assessment.id}/site-page/{site_page.id}/save"
+        headers = {"Authorization": f"Bearer {generate_jwt_payload(user)}"}
+        targets.append((url, responses, headers))
+    db.session.remove()
+    return targets
+
+
+def run_profile(profile, threads, saves, directory, write_queue=False):
+    name = f"{profile}-queue" if write_queue else profile
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{Path(directory) / f'{name}.db'}",
+            "DB_ENGINE_PROFILE": profile,
+            "WRITE_QUEUE_ENABLED": write_queue,
+            "DEBUG": False,
+        }
+    )
+    with app.app_context():
+        db.create_all()
+        targets = seed_sites(threads)
+
+    def autosave(target):
+        url, responses, headers = target
+        latencies, errors = [], 0
+        with app.test_client() as client:
+            for _ in range(saves):
+                start = time.perf_counter()
+                response = client.post(
+                    url, json={"responses": responses, "confirmed": False}, headers=headers
+                )
+                latencies.append(time.perf_counter() - start)
+                errors += response.status_code != 200
+        return latencies, errors
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(autosave, targets))
+    elapsed = time.perf_counter() - start
+    if write_queue:
+        batches = app.extensions["write_queue"].stats()
+        app.extensions["write_queue"].stop()
+
+    latencies = sorted(latency for thread_latencies, _ in results for latency in thread_latencies)
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "saves_per_s": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": quantiles[94] * 1000,
+        "p99_ms": quantiles[98] * 1000,
+        "errors": sum(errors for _, errors in results),
+        "largest_batch": batches["largestBatch"] if write_queue else 1,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--saves", type=int, default=25, help="saves per thread")
+    parser.add_argument("--profiles", nargs="+", default=["default", "sqlite"])
+    parser.add_argument(
+        "--write-queue", action="store_true", help="also run each profile with the write queue"
+    )
+    args = parser.parse_args()
+
+    print(f"{args.threads} threads x {args.saves} saves of the {BENCH_PAGE} page")
+    with tempfile.TemporaryDirectory() as directory:
+        for profile in args.profiles:
+            for write_queue in (False, True) if args.write_queue else (False,):
+                result = run_profile(profile, args.threads, args.saves, directory, write_queue)
+                label = f"{profile}+queue" if write_queue else profile
+                print(
+                    f"{label:>13}: {result['saves_per_s']:7.1f} saves/s  "
+                    f"p50 {result['p50_ms']:7.1f} ms  p95 {result['p95_ms']:7.1f} ms  "
+                    f"p99 {result['p99_ms']:7.1f} ms  {result['errors']} errors  "
+                    f"largest batch {result['largest_batch']}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,543 @@
+"""Time every api_bp endpoint against synthetic data and compare with a stored baseline.
+
+Seeds the current season's catalog from questions.csv and a synthetic population:
+``--orgs`` organizations with ``--sites-per-org`` sites each, one user per site and
+every page, organization and site question answered with values that pass the app's
+own validation (options for MultiSelect/Dropdown, grids for DemoGrid/SizingGrid,
+numbers for Numeric). Each endpoint is then called ``--requests`` times through the
+Flask test client, recording p50/p95 latency and SQL statements per request, and
+once more under tracemalloc for its peak memory. Run from the repository root:
+
+    python -m backend.benchmarks.bench_endpoints --orgs 20 --sites-per-org 10
+    python -m backend.benchmarks.bench_endpoints --update-baseline
+    python -m backend.benchmarks.bench_endpoints --baseline backend/benchmarks/baseline_endpoints.json
+
+With ``--baseline`` the run exits with status 1 when an endpoint got slower than the
+baseline by more than ``--time-tolerance`` (plus ``--slack-ms``), runs more queries,
+or peaks above ``--memory-tolerance``. Timings depend on the host, so compare against
+a baseline recorded on the same machine, or pass ``--check queries memory``.
+Passwords use ``--hash-rounds`` bcrypt rounds (4 by default), so login measures
+the endpoint rather than bcrypt.
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, UTC
+from pathlib import Path
+
+from sqlalchemy import event, insert
+
+from backend.app import create_app
+from backend.catalog import get_assessment_catalog
+from backend.logic.catalog_sync import sync_catalog
+from backend.logic.progress import COMPLETE, recount_progress
+from backend.logic.results import rebuild_all_results
+from backend.models import (
+    db,
+    Organization,
+    OrganizationQuestion,
+    OrganizationQuestionResponse,
+    QuestionResponse,
+    Site,
+    SiteAssessment,
+    SitePage,
+    SiteQuestion,
+    SiteQuestionResponse,
+    User,
+)
+from backend.utils.item_catalog import load_item_catalog
+from backend.utils.jwt_utils import generate_jwt_payload
+from backend.utils.passwords import password_hasher
+from backend.utils.utils import get_current_season
+from backend.validation import GRID_SHAPES, CompiledQuestion
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline_endpoints.json")
+PASSWORD = "password123"
+ADMIN_EMAIL = "admin@bench.example"
+PROFILE_EMAIL = "profile@bench.example"
+BENCH_PAGE = "Food"
+CHECKS = ("time", "queries", "memory")
+WORDS = ["water", "blankets", "tents", "soap", "rice", "shoes", "diapers", "winter", "coats"]
+
+
+def answer(question, rng):
+    """A realistic value for ``question`` (a CompiledQuestion), or None for display text."""
+    question_type = question.question_type
+    options = sorted(question.options)
+    if question_type == "DisplayText":
+        return None
+    if question_type in ("MultiSelect", "MultiselectWithOther") and options:
+        return rng.sample(options, rng.randint(1, min(3, len(options))))
+    if question_type == "Dropdown" and options:
+        return rng.choice(options)
+    if question_type == "YesNo":
+        return rng.choice(["Yes", "No"])
+    if question_type == "Numeric":
+        return rng.randint(0, 500)
+    if question_type in GRID_SHAPES:
+        rows, columns = GRID_SHAPES[question_type]
+        return {row: {column: rng.randint(0, 50) for column in sorted(columns)} for row in rows}
+    return " ".join(rng.sample(WORDS, 3))
+
+
+def answers(questions, rng, overrides=None):
+    """Responses for every answerable question, checked against the app's validation."""
+    overrides = overrides or {}
+    responses = []
+    for question in questions:
+        value = overrides.get(question.slug, answer(question, rng))
+        if value is None:
+            continue
+        response = {"questionId": question.id, "value": value}
+        errors = question.validate(dict(response))
+        if errors:
+            raise ValueError(f"Generated an invalid answer: {errors}")
+        responses.append(response)
+    return responses
+
+
+def response_rows(owner_key, owner_id, responses):
+    return [
+        {owner_key: owner_id, "question_id": r["questionId"], "value": r["value"]}
+        for r in responses
+    ]
+
+
+def seed_scale_data(num_orgs, sites_per_org, seed=0):
+    """Bulk insert the synthetic season. Returns what the endpoint specs need."""
+    rng = random.Random(seed)
+    assessment = sync_catalog(
+        datetime.now(UTC).year,
+        get_current_season(),
+        "backend/data/questions.csv",
+        "backend/data/response_options.json",
+        load_item_catalog().choices,
+    )[0]
+    db.session.commit()
+    catalog = get_assessment_catalog(assessment.id)
+    org_questions = [
+        CompiledQuestion(q) for q in OrganizationQuestion.query.filter_by(retired=False)
+    ]
+    site_questions = [CompiledQuestion(q) for q in SiteQuestion.query.filter_by(retired=False)]
+    pages = [page for page in catalog.pages if not page.retired]
+    hashed_password = password_hasher.hash(PASSWORD)
+
+    org_ids = range(1, num_orgs + 1)
+    site_ids = range(1, num_orgs * sites_per_org + 1)
+    db.session.execute(insert(Organization), [{"id": i, "name": f"Bench Org {i}"} for i in org_ids])
+    db.session.execute(
+        insert(Site),
+        [
+            {
+                "id": i,
+                "name": f"Bench Site {i}",
+                "organization_id": (i - 1) // sites_per_org + 1,
+                "people_served": rng.randint(10, 5000),
+            }
+            for i in site_ids
+        ],
+    )
+    db.session.execute(
+        insert(User),
+        [
+            {
+                "email": f"site{i}@bench.example",
+                "hashed_password": hashed_password,
+                "organization_id": (i - 1) // sites_per_org + 1,
+                "site_id": i,
+            }
+            for i in site_ids
+        ]
+        + [
+            {"email": email, "hashed_password": hashed_password, "organization_id": 1}
+            for email in (ADMIN_EMAIL, PROFILE_EMAIL)
+        ],
+    )
+    db.session.execute(
+        insert(OrganizationQuestionResponse),
+        [
+            row
+            for i in org_ids
+            for row in response_rows(
+                "organization_id", i, answers(org_questions, rng, {"orgname": f"Bench Org {i}"})
+            )
+        ],
+    )
+    db.session.execute(
+        insert(SiteQuestionResponse),
+        [
+            row
+            for i in site_ids
+            for row in response_rows(
+                "site_id", i, answers(site_questions, rng, {"sitename": f"Bench Site {i}"})
+            )
+        ],
+    )
+    db.session.execute(
+        insert(SiteAssessment),
+        [{"id": i, "site_id": i, "assessment_id": assessment.id, "revision": 0} for i in site_ids],
+    )
+
+    site_pages = []
+    responses = []
+    for site_id in site_ids:
+        for page in pages:
+            site_page_id = len(site_pages) + 1
+            site_pages.append(
+                {
+                    "id": site_page_id,
+                    "site_assessment_id": site_id,
+                    "page_id": page.id,
+                    "order": page.order,
+                    "required": True,
+                    "progress": COMPLETE,
+                    "is_confirmation_page": page.is_confirmation_page,
+                    "title": page.title,
+                }
+            )
+            page_questions = [catalog.questions[qid] for qid in page.question_ids]
+            responses += response_rows("site_page_id", site_page_id, answers(page_questions, rng))
+    db.session.execute(insert(SitePage), site_pages)
+    db.session.execute(insert(QuestionResponse), responses)
+    recount_progress()
+    db.session.commit()
+    rebuild_all_results()
+    db.session.commit()
+
+    users = {user.email: user for user in User.query.filter(User.site_id.is_(None))}
+    site_user = User.query.filter_by(site_id=1).one()
+    bench_page = next(page for page in pages if page.title == BENCH_PAGE)
+    site_page = SitePage.query.filter_by(site_assessment_id=1, page_id=bench_page.id).one()
+    context = {
+        "year": assessment.year,
+        "season": assessment.season,
+        "site_assessment_id": 1,
+        "site_page_id": site_page.id,
+        "site_email": site_user.email,
+        "tokens": {
+            "site": generate_jwt_payload(site_user),
+            "admin": generate_jwt_payload(users[ADMIN_EMAIL]),
+            "profile": generate_jwt_payload(users[PROFILE_EMAIL]),
+        },
+        "page_responses": answers([catalog.questions[qid] for qid in bench_page.question_ids], rng),
+        "org_responses": answers(org_questions, rng, {"orgname": "Bench Org 1"}),
+        "site_questions": site_questions,
+        "rng": rng,
+        "counts": {
+            "organizations": num_orgs,
+            "sites": len(site_ids),
+            "sitePages": len(site_pages),
+            "responses": len(responses),
+        },
+    }
+    db.session.remove()
+    return context
+
+
+def _assessment_url(ctx, suffix=""):
+    return f"/api/site-assessment/{ctx['site_assessment_id']}{suffix}"
+
+
+def _page_url(ctx, suffix=""):
+    return _assessment_url(ctx, f"/site-page/{ctx['site_page_id']}{suffix}")
+
+
+def _season(ctx):
+    return f"year={ctx['year']}&season={ctx['season']}"
+
+
+# endpoint -> (ctx, i) -> (method, url, json body, token name)
+ENDPOINTS = {
+    "api.status": lambda ctx, i: ("GET", "/api/status", None, None),
+    "api.get_catalog_stats": lambda ctx, i: ("GET", "/api/catalog/stats", None, "admin"),
+    "api.get_auth_stats": lambda ctx, i: ("GET", "/api/auth/stats", None, "admin"),
+    "api.get_metrics": lambda ctx, i: ("GET", "/api/metrics", None, "admin"),
+    "api.login": lambda ctx, i: (
+        "POST",
+        "/api/login",
+        {"email": ctx["site_email"], "password": PASSWORD},
+        None,
+    ),
+    "api.get_site_assessment": lambda ctx, i: ("GET", "/api/site-assessment", None, "site"),
+    "api.get_site_assessment_by_id": lambda ctx, i: ("GET", _assessment_url(ctx), None, "site"),
+    "api.save_site_page": lambda ctx, i: (
+        "POST",
+        _page_url(ctx, "/save"),
+        {"responses": ctx["page_responses"], "confirmed": False},
+        "site",
+    ),
+    "api.get_assessment_page": lambda ctx, i: ("GET", _page_url(ctx), None, "site"),
+    "api.register": lambda ctx, i: (
+        "POST",
+        "/api/register",
+        {"email": f"new{i}@bench.example", "orgName": f"New Org {i}", "password": PASSWORD},
+        None,
+    ),
+    "api.get_site_assessment_summary": lambda ctx, i: (
+        "GET",
+        _assessment_url(ctx, "/summary"),
+        None,
+        "site",
+    ),
+    "api.confirm_site_assessment": lambda ctx, i: (
+        "POST",
+        _assessment_url(ctx, "/confirm"),
+        None,
+        "site",
+    ),
+    "api.check_email": lambda ctx, i: (
+        "POST",
+        "/api/check-email",
+        {"email": ctx["site_email"]},
+        None,
+    ),
+    "api.get_current_user_profile": lambda ctx, i: ("GET", "/api/me", None, "site"),
+    "api.get_org_questions": lambda ctx, i: ("GET", "/api/organization/questions", None, "site"),
+    "api.get_org_responses": lambda ctx, i: ("GET", "/api/organization/responses", None, "site"),
+    "api.save_org_responses": lambda ctx, i: (
+        "POST",
+        "/api/organization/save",
+        {"responses": ctx["org_responses"]},
+        "site",
+    ),
+    "api.get_site_questions": lambda ctx, i: ("GET", "/api/site/questions", None, "site"),
+    "api.get_site_responses": lambda ctx, i: ("GET", "/api/site/responses", None, "site"),
+    # every call creates a new site, so each needs a name of its own
+    "api.save_site_responses": lambda ctx, i: (
+        "POST",
+        "/api/site/save",
+        {
+            "responses": answers(
+                ctx["site_questions"], ctx["rng"], {"sitename": f"New Bench Site {i}"}
+            )
+        },
+        "profile",
+    ),
+    "api.get_needs_analytics": lambda ctx, i: (
+        "GET",
+        f"/api/admin/analytics/needs?{_season(ctx)}",
+        None,
+        "admin",
+    ),
+    "api.export_season": lambda ctx, i: (
+        "GET",
+        f"/api/admin/export/season?{_season(ctx)}&format=ndjson",
+        None,
+        "admin",
+    ),
+}
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+
+def call(client, ctx, spec, i):
+    """One request, with the body read in full (streamed exports included)."""
+    method, url, body, token = spec(ctx, i)
+    headers = {"Authorization": f"Bearer {ctx['tokens'][token]}"} if token else {}
+    response = client.open(url, method=method, json=body, headers=headers)
+    response.get_data()
+    if response.status_code >= 400:
+        raise RuntimeError(f"{method} {url} returned {response.status_code}: {response.data[:200]}")
+    return method, url, response.status_code
+
+
+def bench_endpoint(client, ctx, name, requests, warmup, counter, calls):
+    spec = ENDPOINTS[name]
+    for _ in range(warmup):
+        call(client, ctx, spec, next(calls))
+    latencies, queries = [], []
+    for _ in range(requests):
+        before = counter.count
+        start = time.perf_counter()
+        method, url, status = call(client, ctx, spec, next(calls))
+        latencies.append((time.perf_counter() - start) * 1000)
+        queries.append(counter.count - before)
+
+    # a separate pass, so tracemalloc's overhead stays out of the timings
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        call(client, ctx, spec, next(calls))
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+    quantiles = statistics.quantiles(latencies, n=20) if len(latencies) > 1 else latencies * 19
+    return {
+        "method": method,
+        "path": url,
+        "status": status,
+        "requests": requests,
+        "p50Ms": round(statistics.median(latencies), 3),
+        "p95Ms": round(quantiles[18], 3),
+        "queries": max(queries),
+        "peakKb": round(peak / 1024, 1),
+    }
+
+
+def run(orgs, sites_per_org, requests, warmup, hash_rounds, directory, only=None):
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{Path(directory) / 'bench.db'}",
+            "PASSWORD_HASH_ROUNDS": hash_rounds,
+            "PASSWORD_HASH_WORKERS": 1,
+            "ADMIN_EMAILS": [ADMIN_EMAIL],
+            # nothing changes the catalog during a run; a periodic version check landing
+            # in a timed request would add a query to it at random
+            "CATALOG_VERSION_CHECK_SECONDS": 24 * 3600,
+            "DEBUG": False,
+        }
+    )
+    api_endpoints = sorted(
+        rule.endpoint for rule in app.url_map.iter_rules() if rule.endpoint.startswith("api.")
+    )
+    unknown = set(ENDPOINTS) - set(api_endpoints)
+    if unknown:
+        raise SystemExit(f"Benchmarked endpoints that no longer exist: {sorted(unknown)}")
+    missing = [name for name in api_endpoints if name not in ENDPOINTS]
+    if missing:
+        print(f"Not benchmarked (add them to ENDPOINTS): {', '.join(missing)}", file=sys.stderr)
+
+    with app.app_context():
+        db.create_all()
+        ctx = seed_scale_data(orgs, sites_per_org)
+        counter = QueryCounter(db.engine)
+    calls = iter(range(sys.maxsize))
+    endpoints = {}
+    with app.test_client() as client:
+        for name in api_endpoints:
+            if name in ENDPOINTS and (not only or name in only):
+                endpoints[name] = bench_endpoint(
+                    client, ctx, name, requests, warmup, counter, calls
+                )
+    password_hasher.shutdown()
+    return {
+        "meta": {
+            "createdAt": datetime.now(UTC).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": {"orgs": orgs, "sitesPerOrg": sites_per_org, **ctx["counts"]},
+            "requests": requests,
+        },
+        "endpoints": endpoints,
+    }
+
+
+def compare(results, baseline, checks, time_tolerance, memory_tolerance, slack_ms, slack_kb):
+    """Regressions of ``results`` against ``baseline``, as messages."""
+    if results["meta"]["scale"] != baseline["meta"]["scale"]:
+        raise SystemExit(
+            f"Baseline scale {baseline['meta']['scale']} differs from this run's "
+            f"{results['meta']['scale']}; rerun with the same --orgs/--sites-per-org."
+        )
+    regressions = []
+    for name, old in baseline["endpoints"].items():
+        new = results["endpoints"].get(name)
+        if new is None:
+            continue
+        if "time" in checks:
+            for metric in ("p50Ms", "p95Ms"):
+                limit = old[metric] * (1 + time_tolerance) + slack_ms
+                if new[metric] > limit:
+                    regressions.append(
+                        f"{name}: {metric} {new[metric]:.2f} > {limit:.2f} (baseline {old[metric]:.2f})"
+                    )
+        if "queries" in checks and new["queries"] > old["queries"]:
+            regressions.append(f"{name}: {new['queries']} queries (baseline {old['queries']})")
+        if "memory" in checks:
+            limit = old["peakKb"] * (1 + memory_tolerance) + slack_kb
+            if new["peakKb"] > limit:
+                regressions.append(
+                    f"{name}: peak {new['peakKb']:.0f} KiB > {limit:.0f} KiB (baseline {old['peakKb']:.0f})"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orgs", type=int, default=10)
+    parser.add_argument("--sites-per-org", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=20, help="timed requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--hash-rounds", type=int, default=4)
+    parser.add_argument("--endpoints", nargs="+", help="only these endpoints, e.g. api.summary")
+    parser.add_argument("--output", default="bench_endpoints.json", help="results JSON file")
+    parser.add_argument("--baseline", type=Path, help="fail on regressions against this file")
+    parser.add_argument(
+        "--update-baseline",
+        nargs="?",
+        type=Path,
+        const=DEFAULT_BASELINE,
+        help=f"write the results as the new baseline (default {DEFAULT_BASELINE})",
+    )
+    parser.add_argument("--check", nargs="+", choices=CHECKS, default=list(CHECKS))
+    parser.add_argument("--time-tolerance", type=float, default=0.5, help="fraction, e.g. 0.5")
+    parser.add_argument("--memory-tolerance", type=float, default=0.25)
+    parser.add_argument("--slack-ms", type=float, default=5.0, help="absolute timing allowance")
+    parser.add_argument("--slack-kb", type=float, default=64.0, help="absolute memory allowance")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = run(
+            args.orgs,
+            args.sites_per_org,
+            args.requests,
+            args.warmup,
+            args.hash_rounds,
+            directory,
+            set(args.endpoints or ()),
+        )
+
+    scale = results["meta"]["scale"]
+    print(
+        f"{scale['organizations']} orgs, {scale['sites']} sites, {scale['sitePages']} site pages, "
+        f"{scale['responses']} responses; {args.requests} requests per endpoint"
+    )
+    print(f"{'endpoint':<34} {'p50 ms':>8} {'p95 ms':>8} {'queries':>8} {'peak KiB':>9}")
+    for name, result in results["endpoints"].items():
+        print(
+            f"{name:<34} {result['p50Ms']:>8.2f} {result['p95Ms']:>8.2f} "
+            f"{result['queries']:>8} {result['peakKb']:>9.0f}"
+        )
+    Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+    print(f"Wrote {args.output}")
+
+    if args.update_baseline:
+        args.update_baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Wrote baseline {args.update_baseline}")
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare(
+            results,
+            baseline,
+            args.check,
+            args.time_tolerance,
+            args.memory_tolerance,
+            args.slack_ms,
+            args.slack_kb,
+        )
+        if regressions:
+            print(f"{len(regressions)} regressions against {args.baseline}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
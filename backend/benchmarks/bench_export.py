@@ -0,0 +1,51 @@
+"""Check that the season export runs in flat memory as the number of sites grows.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_export --sites 1000 10000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from backend.benchmarks.bench_analytics import seed_season
+from backend.benchmarks.bench_upsert import create_bench_app
+from backend.models import db
+from backend.utils.season_export import iter_season_export
+
+
+def measure_export(year, season, export_format):
+    """Consume the export like a download would; return (bytes, seconds, peak bytes)."""
+    size = 0
+    tracemalloc.start()
+    start = time.perf_counter()
+    for chunk in iter_season_export(year, season, export_format):
+        size += len(chunk)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sites", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--format", dest="export_format", default="ndjson")
+    args = parser.parse_args()
+
+    for num_sites in args.sites:
+        app = create_bench_app("sqlite:///:memory:")
+        with app.app_context():
+            db.create_all()
+            year, season, _ = seed_season(num_sites)
+            db.session.expunge_all()
+            size, elapsed, peak = measure_export(year, season, args.export_format)
+            print(
+                f"{num_sites:>7} sites: {size / 1e6:7.1f} MB exported in {elapsed * 1000:6.0f} ms, "
+                f"peak traced memory {peak / 1e6:5.1f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Time the seeding pipeline phases for many seasons of a (possibly generated) catalog.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_seed --seasons 10
+    python -m backend.benchmarks.bench_seed --seasons 4 --pages 50 --questions-per-page 40
+"""
+
+import argparse
+import statistics
+import time
+
+from backend.benchmarks.bench_upsert import create_bench_app
+from backend.logic.seeding import build_seed_plan, read_seed_plan, write_seed_plan
+from backend.models import db
+from backend.utils.item_catalog import load_item_catalog
+
+
+def generated_rows(num_pages, questions_per_page):
+    """questions.csv rows for a synthetic catalog, including a parent/child pair per page."""
+    rows = []
+    for page in range(num_pages):
+        for number in range(questions_per_page):
+            rows.append(
+                {
+                    "Page": f"Page {page}",
+                    "ItemID": f"P{page}" if number == 0 else "",
+                    "ParentItemID": f"P{page}" if number == 1 else "",
+                    "ItemText": f"Question {page}.{number}",
+                    "Subtext": "",
+                    "Mandatory in Section": "Y" if number % 2 else "",
+                    "Type": "Numeric",
+                    "QuestionOrder": str(page * questions_per_page + number),
+                    "Slug": "",
+                }
+            )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seasons", type=int, default=10)
+    parser.add_argument("--pages", type=int, help="generate a catalog instead of questions.csv")
+    parser.add_argument("--questions-per-page", type=int, default=20)
+    parser.add_argument("--database-uri", default="sqlite:///:memory:")
+    args = parser.parse_args()
+
+    app = create_bench_app(args.database_uri)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        choices = load_item_catalog().choices
+
+        plan_times = []
+        write_times = []
+        for season in range(args.seasons):
+            start = time.perf_counter()
+            if args.pages:
+                plan = build_seed_plan(
+                    generated_rows(args.pages, args.questions_per_page), {}, choices
+                )
+            else:
+                plan = read_seed_plan(
+                    "backend/data/questions.csv", "backend/data/response_options.json", choices
+                )
+            planned = time.perf_counter()
+            write_seed_plan(plan, 2000 + season, "Spring")
+            plan_times.append(planned - start)
+            write_times.append(time.perf_counter() - planned)
+
+        print(
+            f"{args.seasons} seasons of {len(plan.pages)} pages / {len(plan.questions)} questions"
+        )
+        print(f"  plan  median {statistics.median(plan_times) * 1000:8.1f} ms")
+        print(f"  write median {statistics.median(write_times) * 1000:8.1f} ms")
+        print(f"  total        {(sum(plan_times) + sum(write_times)) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
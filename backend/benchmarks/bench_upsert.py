@@ -0,0 +1,141 @@
+"""Benchmark saving a large page of responses: row-by-row loop vs upsert_responses.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_upsert --responses 500 --rounds 5
+"""
+
+import argparse
+import statistics
+import time
+
+from flask import Flask
+from sqlalchemy import event
+
+from backend.logic.responses import upsert_responses
+from backend.models import (
+    db,
+    Assessment,
+    Organization,
+    Page,
+    Question,
+    QuestionResponse,
+    Site,
+    SiteAssessment,
+    SitePage,
+)
+
+
+def create_bench_app(database_uri):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_uri
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+    return app
+
+
+def seed_page(num_questions):
+    """Create one SitePage whose Page has ``num_questions`` questions."""
+    assessment = Assessment(year=2025, season="Spring")
+    org = Organization(name="Bench Org")
+    db.session.add_all([assessment, org])
+    db.session.flush()
+    site = Site(name="Bench Site", organization_id=org.id)
+    page = Page(title="Food", assessment_id=assessment.id, order=1)
+    db.session.add_all([site, page])
+    db.session.flush()
+    db.session.add_all(
+        Question(page_id=page.id, text=f"Item {i}", question_type="Numeric", order=i)
+        for i in range(num_questions)
+    )
+    site_assessment = SiteAssessment(site_id=site.id, assessment_id=assessment.id)
+    db.session.add(site_assessment)
+    db.session.flush()
+    site_page = SitePage(
+        site_assessment_id=site_assessment.id, page_id=page.id, order=1, title=page.title
+    )
+    db.session.add(site_page)
+    db.session.commit()
+    question_ids = [q.id for q in Question.query.filter_by(page_id=page.id)]
+    return site_page.id, question_ids
+
+
+def legacy_save(site_page_id, responses_data):
+    """The per-response SELECT then INSERT/UPDATE loop the save endpoints used to run."""
+    for response in responses_data:
+        question_id = response.get("questionId")
+        if question_id is None:
+            continue
+        existing = QuestionResponse.query.filter_by(
+            site_page_id=site_page_id, question_id=question_id
+        ).first()
+        if existing:
+            existing.value = response.get("value")
+        else:
+            db.session.add(
+                QuestionResponse(
+                    site_page_id=site_page_id, question_id=question_id, value=response["value"]
+                )
+            )
+    db.session.commit()
+
+
+def bulk_save(site_page_id, responses_data):
+    upsert_responses(QuestionResponse, site_page_id, responses_data)
+    db.session.commit()
+
+
+def time_save(save, site_page_id, question_ids, rounds):
+    """Time the first save (all inserts) and the following rounds (all updates)."""
+    QuestionResponse.query.filter_by(site_page_id=site_page_id).delete()
+    db.session.commit()
+
+    statements = []
+
+    def count(*args):
+        statements.append(1)
+
+    event.listen(db.engine, "before_cursor_execute", count)
+    timings = []
+    try:
+        for round_number in range(rounds + 1):
+            responses = [{"questionId": qid, "value": round_number} for qid in question_ids]
+            db.session.expire_all()
+            start = time.perf_counter()
+            save(site_page_id, responses)
+            timings.append(time.perf_counter() - start)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count)
+
+    return {
+        "insert_ms": timings[0] * 1000,
+        "update_ms": statistics.median(timings[1:]) * 1000,
+        "statements_per_save": len(statements) / len(timings),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--responses", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--database-uri", default="sqlite:///:memory:")
+    args = parser.parse_args()
+
+    app = create_bench_app(args.database_uri)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        site_page_id, question_ids = seed_page(args.responses)
+
+        print(f"{args.responses} responses, {args.rounds} update rounds")
+        for name, save in (("row-by-row", legacy_save), ("upsert_responses", bulk_save)):
+            result = time_save(save, site_page_id, question_ids, args.rounds)
+            print(
+                f"{name:>18}: insert {result['insert_ms']:8.1f} ms  "
+                f"update {result['update_ms']:8.1f} ms  "
+                f"{result['statements_per_save']:6.1f} statements/save"
+            )
+
+
+if __name__ == "__main__":
+    main()
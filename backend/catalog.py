@@ -0,0 +1,295 @@
+"""In-process cache of question definitions.
+
+Pages and questions only change when an assessment is seeded (or otherwise edited),
+so they are loaded once into immutable catalog objects and shared by every request.
+Each change to the definitions must call ``bump_catalog_version`` in the same
+transaction; processes notice the new version within
+``CATALOG_VERSION_CHECK_SECONDS`` and swap in freshly built catalogs.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from backend.models import (
+    db,
+    Assessment,
+    CatalogVersion,
+    OrganizationQuestion,
+    Page,
+    Question,
+    SiteQuestion,
+)
+from backend.serialize.serialize import serialize_question
+from backend.validation import CompiledQuestion
+
+DEFAULT_VERSION_CHECK_SECONDS = 5
+
+
+@dataclass(frozen=True)
+class CatalogPage:
+    id: int
+    title: str
+    order: int
+    is_confirmation_page: bool
+    is_profile_page: bool
+    # retired pages stay resolvable for existing site pages but are not offered anymore
+    retired: bool
+    question_ids: tuple
+    # the "page" object of a serialized SitePage; shared, so never mutate it
+    serialized: dict
+
+
+@dataclass(frozen=True)
+class AssessmentCatalog:
+    assessment_id: int
+    version: int
+    pages: tuple
+    pages_by_id: Mapping
+    pages_by_title: Mapping
+    questions: Mapping
+    serialized_questions: Mapping
+    children: Mapping
+    by_slug: Mapping
+    # question texts repeat across pages, so each text maps to a tuple of questions
+    by_text: Mapping
+
+
+@dataclass(frozen=True)
+class ProfileCatalog:
+    version: int
+    organization_questions: tuple
+    site_questions: tuple
+    organization_by_slug: Mapping
+    site_by_slug: Mapping
+
+
+@dataclass(frozen=True)
+class _CacheState:
+    version: int
+    assessments: Mapping
+    profile: ProfileCatalog | None = None
+
+
+def _freeze(mapping):
+    return MappingProxyType(dict(mapping))
+
+
+def template_id_of(assessment_id):
+    """Scalar subquery for the id of the assessment owning ``assessment_id``'s pages."""
+    return (
+        select(func.coalesce(Assessment.template_id, Assessment.id))
+        .where(Assessment.id == assessment_id)
+        .scalar_subquery()
+    )
+
+
+def build_assessment_catalog(assessment_id, version):
+    """Load every page and question of an assessment with a single query.
+
+    Retired questions stay in ``questions`` so answers given before they were retired
+    still validate when a page is saved again, but pages no longer list them.
+    """
+    rows = db.session.execute(
+        select(Page, Question)
+        .outerjoin(Question, Question.page_id == Page.id)
+        .where(Page.assessment_id == template_id_of(assessment_id))
+        .order_by(Page.order, Page.id, Question.id)
+    ).all()
+
+    page_rows = {}
+    questions = {}
+    live_questions = []
+    serialized_questions = {}
+    for page, question in rows:
+        page_questions = page_rows.setdefault(page.id, (page, []))[1]
+        if question is None:
+            continue
+        questions[question.id] = CompiledQuestion(question)
+        if not question.retired:
+            page_questions.append(question.id)
+            live_questions.append(questions[question.id])
+            serialized_questions[question.id] = serialize_question(question)
+
+    pages = tuple(
+        CatalogPage(
+            id=page.id,
+            title=page.title,
+            order=page.order,
+            is_confirmation_page=page.is_confirmation_page,
+            is_profile_page=page.is_profile_page,
+            retired=page.retired,
+            question_ids=tuple(question_ids),
+            serialized={
+                "id": page.id,
+                "title": page.title,
+                "questions": [serialized_questions[qid] for qid in question_ids],
+            },
+        )
+        for page, question_ids in page_rows.values()
+    )
+
+    children = {}
+    by_slug = {}
+    by_text = {}
+    for question in live_questions:
+        if question.parent_question_id is not None:
+            children.setdefault(question.parent_question_id, []).append(question.id)
+        if question.slug:
+            by_slug[question.slug] = question
+        by_text.setdefault(question.text, []).append(question)
+
+    return AssessmentCatalog(
+        assessment_id=assessment_id,
+        version=version,
+        pages=pages,
+        pages_by_id=_freeze({p.id: p for p in pages}),
+        pages_by_title=_freeze({p.title: p for p in pages}),
+        questions=_freeze(questions),
+        serialized_questions=_freeze(serialized_questions),
+        children=_freeze({qid: tuple(ids) for qid, ids in children.items()}),
+        by_slug=_freeze(by_slug),
+        by_text=_freeze({text: tuple(qs) for text, qs in by_text.items()}),
+    )
+
+
+def build_profile_catalog(version):
+    """Load the organization and site questions, in display order."""
+    org_questions = (
+        OrganizationQuestion.query.filter_by(retired=False)
+        .order_by(OrganizationQuestion.order)
+        .all()
+    )
+    site_questions = SiteQuestion.query.filter_by(retired=False).order_by(SiteQuestion.order).all()
+    return ProfileCatalog(
+        version=version,
+        organization_questions=tuple(serialize_question(q) for q in org_questions),
+        site_questions=tuple(serialize_question(q) for q in site_questions),
+        organization_by_slug=_freeze(
+            {q.slug: CompiledQuestion(q) for q in org_questions if q.slug}
+        ),
+        site_by_slug=_freeze({q.slug: CompiledQuestion(q) for q in site_questions if q.slug}),
+    )
+
+
+class CatalogCache:
+    """Holds the catalogs of the current version and swaps them out when it changes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = None
+        self._checked_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.rebuilds = 0
+
+    def _load_version(self):
+        version = db.session.execute(select(CatalogVersion.version)).scalar()
+        return version or 0
+
+    def _current_state(self):
+        interval = current_app.config.get(
+            "CATALOG_VERSION_CHECK_SECONDS", DEFAULT_VERSION_CHECK_SECONDS
+        )
+        state = self._state
+        now = time.monotonic()
+        if state is None or now - self._checked_at >= interval:
+            version = self._load_version()
+            self._checked_at = now
+            if state is None or state.version != version:
+                if state is not None:
+                    self.rebuilds += 1
+                state = _CacheState(version=version, assessments=MappingProxyType({}))
+                self._state = state
+        return state
+
+    def assessment(self, assessment_id):
+        state = self._current_state()
+        catalog = state.assessments.get(assessment_id)
+        if catalog is not None:
+            self.hits += 1
+            return catalog
+
+        with self._lock:
+            self.misses += 1
+            catalog = build_assessment_catalog(assessment_id, state.version)
+            # only publish if no newer version replaced the state meanwhile
+            current = self._state
+            if current.version == state.version:
+                assessments = {**current.assessments, assessment_id: catalog}
+                self._state = _CacheState(
+                    version=current.version,
+                    assessments=MappingProxyType(assessments),
+                    profile=current.profile,
+                )
+        return catalog
+
+    def profile(self):
+        state = self._current_state()
+        if state.profile is not None:
+            self.hits += 1
+            return state.profile
+
+        with self._lock:
+            self.misses += 1
+            profile = build_profile_catalog(state.version)
+            current = self._state
+            if current.version == state.version:
+                self._state = _CacheState(
+                    version=current.version, assessments=current.assessments, profile=profile
+                )
+        return profile
+
+    def reset(self, version):
+        """Drop every catalog and start over at ``version``."""
+        with self._lock:
+            if self._state is not None:
+                self.rebuilds += 1
+            self._state = _CacheState(version=version, assessments=MappingProxyType({}))
+            self._checked_at = time.monotonic()
+
+    def stats(self):
+        state = self._state
+        return {
+            "version": state.version if state else None,
+            "assessments": len(state.assessments) if state else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "rebuilds": self.rebuilds,
+        }
+
+
+_cache = CatalogCache()
+
+
+def get_assessment_catalog(assessment_id) -> AssessmentCatalog:
+    return _cache.assessment(assessment_id)
+
+
+def get_profile_catalog() -> ProfileCatalog:
+    return _cache.profile()
+
+
+def get_catalog_version():
+    return _cache._current_state().version
+
+
+def bump_catalog_version():
+    """Record that question definitions changed. The caller commits."""
+    row = db.session.execute(select(CatalogVersion)).scalar()
+    if row is None:
+        row = CatalogVersion(version=0)
+        db.session.add(row)
+    row.version = (row.version or 0) + 1
+    db.session.flush()
+    _cache.reset(row.version)
+    return row.version
+
+
+def catalog_stats():
+    return _cache.stats()
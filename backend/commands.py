@@ -0,0 +1,158 @@
+"""Flask CLI commands, e.g. ``flask rebuild-results``."""
+
+import json
+from datetime import datetime, UTC
+
+import click
+from flask import current_app
+
+from backend.logic.results import rebuild_all_results
+from backend.models import db
+from backend.seed import seed_database, sync_catalog_from_csv
+from backend.utils.export_data import export_seed_data
+from backend.utils.passwords import MAX_ROUNDS, MIN_ROUNDS, calibrate_rounds
+from backend.utils.item_catalog import ITEM_CATALOG_PATH, SHEET_URL, refresh_item_catalog
+from backend.utils.season_export import EXPORT_FORMATS, iter_season_export
+from backend.utils.slow_queries import analyze, log_files
+from backend.utils.utils import get_current_season
+
+
+@click.command("seed")
+def seed_command():
+    """Create missing tables, the current season's catalog and the test users."""
+    db.create_all()
+    seed_database()
+
+
+@click.command("export-seed")
+@click.option("--path", default="data/test_seed.json", show_default=True)
+def export_seed_command(path):
+    """Write the assessments, pages, questions, sites and users to a test seed file."""
+    export_seed_data(path)
+
+
+@click.command("rebuild-results")
+def rebuild_results_command():
+    """Regenerate every materialized SiteAssessmentResult."""
+    count = rebuild_all_results()
+    click.echo(f"✅ Rebuilt {count} site assessment results.")
+
+
+@click.command("needs-analytics")
+@click.option("--year", type=int, default=lambda: datetime.now(UTC).year)
+@click.option("--season", default=get_current_season)
+@click.option("--output", type=click.File("w"), default="-", help="Defaults to stdout.")
+def needs_analytics_command(year, season, output):
+    """Aggregate needs across all sites for a season and print them as JSON."""
+    from backend.logic.analytics import compute_needs_analytics
+
+    json.dump(compute_needs_analytics(year, season), output, indent=2)
+    output.write("\n")
+
+
+@click.command("export-season")
+@click.option("--year", type=int, default=lambda: datetime.now(UTC).year)
+@click.option("--season", default=get_current_season)
+@click.option(
+    "--format", "export_format", type=click.Choice(sorted(EXPORT_FORMATS)), default="ndjson"
+)
+@click.option("--output", type=click.File("w"), default="-", help="Defaults to stdout.")
+def export_season_command(year, season, export_format, output):
+    """Stream every site, organization and answer of a season as NDJSON or CSV."""
+    for chunk in iter_season_export(year, season, export_format):
+        output.write(chunk)
+
+
+@click.command("refresh-item-catalog")
+@click.argument("source", default=SHEET_URL)
+@click.option("--output", type=click.Path(dir_okay=False), default=str(ITEM_CATALOG_PATH))
+@click.option("--header-row", type=int, default=1, help="Row of the CSV holding the column names.")
+def refresh_item_catalog_command(source, output, header_row):
+    """Write a new item catalog snapshot from the Google Sheet or a local CSV export."""
+    catalog = refresh_item_catalog(source, output, header_row)
+    items = sum(len(items) for items in catalog.choices.values())
+    click.echo(
+        f"✅ Wrote item catalog v{catalog.version} ({items} items in "
+        f"{len(catalog.choices)} categories) to {output}."
+    )
+
+
+@click.command("sync-catalog")
+@click.option("--year", type=int, default=lambda: datetime.now(UTC).year)
+@click.option("--season", default=get_current_season)
+@click.option("--questions", "filepath", default="data/questions.csv", show_default=True)
+@click.option("--options", "options_file", default="data/response_options.json", show_default=True)
+@click.option("--dry-run", is_flag=True, help="Only report what would change.")
+def sync_catalog_command(year, season, filepath, options_file, dry_run):
+    """Apply the changes in questions.csv to a season's pages and questions."""
+    assessment, diff = sync_catalog_from_csv(year, season, filepath, options_file, dry_run)
+    if diff is None:
+        verb = "Would seed" if dry_run else "Seeded"
+        click.echo(f"{verb} {season} {year} from scratch (no earlier catalog).")
+        return
+    for table, counts in diff.counts().items():
+        click.echo(
+            f"{table:>24}: {counts['inserted']} inserted, {counts['updated']} updated, "
+            f"{counts['retired']} retired"
+        )
+    if not dry_run:
+        click.echo(f"✅ Synced catalog of {season} {year} (assessment {assessment.id}).")
+
+
+@click.command("calibrate-password-hashing")
+@click.option("--target-ms", type=float, default=250, show_default=True)
+@click.option("--max-rounds", type=click.IntRange(MIN_ROUNDS, 31), default=MAX_ROUNDS)
+def calibrate_password_hashing_command(target_ms, max_rounds):
+    """Time bcrypt on this host and suggest PASSWORD_HASH_ROUNDS for a target latency."""
+    rounds, timings = calibrate_rounds(target_ms, max_rounds=max_rounds)
+    for cost, ms in timings.items():
+        click.echo(f"{cost:>3} rounds: {ms:8.1f} ms")
+    click.echo(f"PASSWORD_HASH_ROUNDS={rounds}")
+
+
+@click.command("slow-queries")
+@click.argument("path", required=False)
+@click.option("--sort", type=click.Choice(["total", "p95"]), default="total", show_default=True)
+@click.option("--top", type=int, default=20, show_default=True)
+@click.option("--plans", is_flag=True, help="Print the captured query plan of each statement.")
+@click.option("--json", "as_json", is_flag=True, help="Print the full ranking as JSON.")
+def slow_queries_command(path, sort, top, plans, as_json):
+    """Rank the statements in the slow-query log (and its rotated files) by time."""
+    path = path or current_app.config["SLOW_QUERY_LOG_PATH"]
+    if not path:
+        raise click.UsageError("Pass the log path or set SLOW_QUERY_LOG.")
+    files = log_files(path)
+    if not files:
+        raise click.UsageError(f"No slow-query log at {path}.")
+    ranked = analyze(files)
+    ranked.sort(key=lambda g: g["totalMs" if sort == "total" else "p95Ms"], reverse=True)
+    ranked = ranked[:top]
+    if as_json:
+        click.echo(json.dumps(ranked, indent=2))
+        return
+    click.echo(
+        f"{'total ms':>10} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}  statement"
+    )
+    for group in ranked:
+        click.echo(
+            f"{group['totalMs']:>10.1f} {group['count']:>6} {group['p50Ms']:>8.1f} "
+            f"{group['p95Ms']:>8.1f} {group['maxMs']:>8.1f}  {group['statement'][:120]}"
+        )
+        click.echo(f"{'':>44}routes: {', '.join(group['routes']) or '-'}")
+        click.echo(f"{'':>44}from: {', '.join(group['callSites']) or '-'}")
+        if plans and group["plan"]:
+            for row in group["plan"] if isinstance(group["plan"], list) else [group["plan"]]:
+                click.echo(f"{'':>44}plan: {row}")
+
+
+COMMANDS = [
+    seed_command,
+    export_seed_command,
+    rebuild_results_command,
+    needs_analytics_command,
+    export_season_command,
+    refresh_item_catalog_command,
+    sync_catalog_command,
+    calibrate_password_hashing_command,
+    slow_queries_command,
+]
@@ -2,3 +2,6 @@ REQUIRED_PAGES = {"Demographics"}
 
 
 ORG_NAME = "orgname"
+SITE_NAME = "sitename"
+SITE_PEOPLE_SERVED = "sitenumserved"
+SITE_NEEDS = "siteneeds"
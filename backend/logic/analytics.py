@@ -0,0 +1,151 @@
+"""Cross-site needs analytics for one assessment season.
+
+All QuestionResponse rows of the season are streamed into a pandas frame with a
+single query; every aggregate below is a vectorized group-by over that frame.
+"""
+
+import pandas as pd
+from sqlalchemy import select
+
+from backend.models import (
+    db,
+    Assessment,
+    OrganizationQuestion,
+    OrganizationQuestionResponse,
+    Page,
+    Question,
+    QuestionResponse,
+    Site,
+    SiteAssessment,
+    SitePage,
+)
+
+REGION_SLUG = "orgregion"
+STREAM_BATCH_SIZE = 5000
+RESPONSE_COLUMNS = [
+    "site_id",
+    "organization_id",
+    "people_served",
+    "category",
+    "question_id",
+    "question_text",
+    "question_type",
+    "value",
+]
+
+
+def _stream_frame(stmt, columns):
+    """Run ``stmt`` with a server-side cursor and collect the rows batch by batch."""
+    result = db.session.execute(stmt.execution_options(yield_per=STREAM_BATCH_SIZE))
+    frames = [
+        pd.DataFrame.from_records(partition, columns=columns) for partition in result.partitions()
+    ]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_season_responses(year, season):
+    """One row per QuestionResponse of the season, with its site and question."""
+    stmt = (
+        select(
+            Site.id,
+            Site.organization_id,
+            Site.people_served,
+            Page.title,
+            Question.id,
+            Question.text,
+            Question.question_type,
+            QuestionResponse.value,
+        )
+        .join(SitePage, SitePage.id == QuestionResponse.site_page_id)
+        .join(SiteAssessment, SiteAssessment.id == SitePage.site_assessment_id)
+        .join(Assessment, Assessment.id == SiteAssessment.assessment_id)
+        .join(Site, Site.id == SiteAssessment.site_id)
+        .join(Question, Question.id == QuestionResponse.question_id)
+        .join(Page, Page.id == Question.page_id)
+        .where(Assessment.year == year, Assessment.season == season)
+    )
+    return _stream_frame(stmt, RESPONSE_COLUMNS)
+
+
+def load_organization_regions():
+    """One row per (organization, region) from the answers to the region question."""
+    stmt = (
+        select(OrganizationQuestionResponse.organization_id, OrganizationQuestionResponse.value)
+        .join(
+            OrganizationQuestion,
+            OrganizationQuestion.id == OrganizationQuestionResponse.question_id,
+        )
+        .where(OrganizationQuestion.slug == REGION_SLUG)
+    )
+    regions = _stream_frame(stmt, ["organization_id", "region"])
+    return _explode_values(regions, "region")
+
+
+def _explode_values(frame, column):
+    """Turn list answers into one row per selected value, dropping empty selections."""
+    frame = frame.explode(column)
+    frame = frame[frame[column].notna()]
+    frame = frame.assign(**{column: frame[column].astype(str).str.strip()})
+    return frame[(frame[column] != "") & (frame[column] != "None")]
+
+
+def needs_frame(responses):
+    """One row per (site, category, item) the site says it needs."""
+    is_need = responses["question_text"].str.lower().str.contains("need", regex=False) & (
+        responses["question_type"] == "MultiSelect"
+    )
+    needs = responses.loc[
+        is_need, ["site_id", "organization_id", "people_served", "category", "value"]
+    ]
+    needs = _explode_values(needs.rename(columns={"value": "item"}), "item")
+    needs = needs.assign(
+        people_served=pd.to_numeric(needs["people_served"], errors="coerce").fillna(0)
+    )
+    return needs.drop_duplicates(["site_id", "category", "item"])
+
+
+def _aggregate(needs, keys):
+    """Sites needing, item needs and people-served weighted demand per ``keys``."""
+    grouped = needs.groupby(keys, sort=True)
+    per_site = needs.drop_duplicates(keys + ["site_id"]).groupby(keys, sort=True)
+    return pd.DataFrame(
+        {
+            "sites": grouped["site_id"].nunique(),
+            "itemNeeds": grouped.size(),
+            "peopleServed": per_site["people_served"].sum(),
+        }
+    ).reset_index()
+
+
+def _records(frame):
+    records = frame.to_dict(orient="records")
+    for record in records:
+        for key, value in record.items():
+            if hasattr(value, "item"):
+                record[key] = value.item()
+    return records
+
+
+def compute_needs_analytics(year, season):
+    """Aggregate the needs of every site that answered the given season."""
+    responses = load_season_responses(year, season)
+    needs = needs_frame(responses)
+
+    regions = load_organization_regions()
+    by_region = needs.astype({"organization_id": "int64"}).merge(
+        regions.astype({"organization_id": "int64"}), on="organization_id", how="inner"
+    )
+
+    # each site lists an item at most once, so itemNeeds would equal sites here
+    items = _aggregate(needs, ["category", "item"]).drop(columns="itemNeeds")
+
+    return {
+        "year": year,
+        "season": season,
+        "respondingSites": int(responses["site_id"].nunique()),
+        "items": _records(items.sort_values(["sites", "item"], ascending=[False, True])),
+        "categories": _records(_aggregate(needs, ["category"])),
+        "regions": _records(_aggregate(by_region, ["region", "category"])),
+    }
@@ -0,0 +1,343 @@
+"""Sync the question catalog with questions.csv by diffing instead of re-seeding.
+
+A new season no longer gets its own copy of every page and question: its
+Assessment points at the latest template (``Assessment.template_id``) for as long
+as its questions are the same. Pages are matched by title, questions by page and
+slug (text when there is no slug), and only the differences are written:
+
+* inserts for rows that are new in the CSV,
+* updates for rows whose definition (text, options, order, ...) changed,
+* retirements for rows that disappeared; they stay in the database, flagged
+  ``retired``, so earlier answers still join to their question.
+
+Pages and questions shared with another season are never written to. Before a
+diff touches them, the season gets its own copy (copy-on-write, see ``fork_catalog``)
+and the diff is applied to the copy, so earlier seasons keep the questions they were
+answered with. Seasons sharing a template share question ids, so comparing their
+answers is a plain join on ``question_id``.
+
+Organization and site questions belong to no season and are updated in place.
+"""
+
+import logging
+from dataclasses import dataclass, field
+
+from sqlalchemy import select, update
+
+from backend.catalog import bump_catalog_version
+from backend.logic.results import rebuild_result
+from backend.logic.seeding import (
+    PROFILE_KINDS,
+    IdAllocator,
+    bulk_insert,
+    question_row,
+    read_seed_plan,
+    write_seed_plan,
+)
+from backend.models import (
+    db,
+    Assessment,
+    Page,
+    Question,
+    QuestionResponse,
+    SiteAssessment,
+    SitePage,
+)
+from backend.utils.utils import bump_site_assessment_revisions
+
+
+@dataclass
+class CatalogDiff:
+    # model -> rows to insert / {"id": ..., changed columns} / ids to retire
+    inserts: dict = field(default_factory=dict)
+    updates: dict = field(default_factory=dict)
+    retirements: dict = field(default_factory=dict)
+
+    def is_empty(self):
+        changes = (self.inserts, self.updates, self.retirements)
+        return not any(rows for change in changes for rows in change.values())
+
+    def touches_assessment(self):
+        """Whether the diff writes pages or questions of the template."""
+        changes = (self.inserts, self.updates, self.retirements)
+        return any(change.get(model) for change in changes for model in (Page, Question))
+
+    def counts(self):
+        models = {*self.inserts, *self.updates, *self.retirements}
+        return {
+            model.__tablename__: {
+                "inserted": len(self.inserts.get(model, [])),
+                "updated": len(self.updates.get(model, [])),
+                "retired": len(self.retirements.get(model, [])),
+            }
+            for model in sorted(models, key=lambda m: m.__tablename__)
+        }
+
+
+def question_key(page, question):
+    return page, question.slug or question.text
+
+
+def _changed(row, values):
+    return {key: value for key, value in values.items() if getattr(row, key) != value}
+
+
+def _diff_pages(plan, template_id, diff):
+    existing = {}
+    for page in Page.query.filter_by(assessment_id=template_id).order_by(Page.id):
+        existing.setdefault(page.title, page)
+    allocate = IdAllocator(Page)
+    page_ids = {}
+    inserts, updates = [], []
+    for planned in plan.pages:
+        values = {
+            "order": planned.order,
+            "is_confirmation_page": planned.is_confirmation_page,
+            "is_profile_page": planned.is_profile_page,
+            "retired": False,
+        }
+        page = existing.pop(planned.title, None)
+        if page is None:
+            page_ids[planned.title] = allocate()
+            inserts.append(
+                {
+                    "id": page_ids[planned.title],
+                    "title": planned.title,
+                    "assessment_id": template_id,
+                    **values,
+                }
+            )
+            continue
+        page_ids[planned.title] = page.id
+        changed = _changed(page, values)
+        if changed:
+            updates.append({"id": page.id, **changed})
+
+    diff.inserts[Page] = inserts
+    diff.updates[Page] = updates
+    diff.retirements[Page] = [page.id for page in existing.values() if not page.retired]
+    return page_ids
+
+
+def _diff_questions(model, planned_questions, existing, diff, page_ids=None):
+    """Diff ``planned_questions`` against ``existing`` (key -> rows, oldest first)."""
+    allocate = IdAllocator(model)
+    matched = {}
+    ids = {}
+    for planned in planned_questions:
+        key = question_key(planned.page, planned)
+        rows = existing.get(key)
+        if rows:
+            matched[key] = rows.pop(0)
+            ids[key] = matched[key].id
+        else:
+            ids[key] = allocate()
+    by_item = {
+        (planned.page, planned.item_id): ids[question_key(planned.page, planned)]
+        for planned in planned_questions
+        if planned.item_id
+    }
+
+    inserts, updates = [], []
+    for planned in planned_questions:
+        key = question_key(planned.page, planned)
+        values = question_row(
+            planned, ids[key], by_item.get((planned.page, planned.parent_item_id))
+        )
+        values["retired"] = False
+        if page_ids is not None:
+            values["page_id"] = page_ids[planned.page]
+        if key not in matched:
+            inserts.append(values)
+            continue
+        changed = _changed(matched[key], values)
+        if changed:
+            updates.append({"id": ids[key], **changed})
+
+    diff.inserts[model] = sorted(inserts, key=lambda row: row["parent_question_id"] is not None)
+    diff.updates[model] = updates
+    # whatever is left over, including duplicates of a matched key, is retired
+    diff.retirements[model] = [
+        row.id for rows in existing.values() for row in rows if not row.retired
+    ]
+
+
+def diff_catalog(plan, template_id):
+    """Work out the writes that bring template ``template_id`` in line with ``plan``."""
+    diff = CatalogDiff()
+    page_ids = _diff_pages(plan, template_id, diff)
+
+    existing = {}
+    questions = (
+        select(Question, Page.title)
+        .join(Page, Page.id == Question.page_id)
+        .where(Page.assessment_id == template_id)
+        .order_by(Question.id)
+    )
+    for question, title in db.session.execute(questions):
+        existing.setdefault(question_key(title, question), []).append(question)
+    _diff_questions(Question, plan.assessment_questions(), existing, diff, page_ids)
+
+    for kind, model in PROFILE_KINDS.items():
+        existing = {}
+        for question in model.query.order_by(model.id):
+            existing.setdefault(question_key(kind, question), []).append(question)
+        _diff_questions(model, plan.profile_questions(kind), existing, diff)
+    return diff
+
+
+def apply_catalog_diff(diff):
+    """Write ``diff``: inserts first so updated rows can point at new pages and parents."""
+    for model, rows in diff.inserts.items():
+        bulk_insert(model, rows)
+    for model, rows in diff.updates.items():
+        for row in rows:
+            db.session.execute(update(model).where(model.id == row["id"]).values(**row))
+    for model, ids in diff.retirements.items():
+        if ids:
+            db.session.execute(update(model).where(model.id.in_(ids)).values(retired=True))
+
+
+def _clone_catalog(template_id, owner_id):
+    """Copy the pages and questions of ``template_id`` to ``owner_id``.
+
+    Returns the maps from old to new page ids and question ids.
+    """
+    pages = Page.query.filter_by(assessment_id=template_id).order_by(Page.id).all()
+    allocate_page = IdAllocator(Page)
+    page_ids = {page.id: allocate_page() for page in pages}
+    bulk_insert(
+        Page,
+        [
+            {
+                "id": page_ids[page.id],
+                "title": page.title,
+                "assessment_id": owner_id,
+                "order": page.order,
+                "is_confirmation_page": page.is_confirmation_page,
+                "is_profile_page": page.is_profile_page,
+                "retired": page.retired,
+            }
+            for page in pages
+        ],
+    )
+
+    questions = (
+        Question.query.filter(Question.page_id.in_(page_ids)).order_by(Question.id).all()
+        if page_ids
+        else []
+    )
+    allocate_question = IdAllocator(Question)
+    question_ids = {question.id: allocate_question() for question in questions}
+    rows = [
+        {column.key: getattr(question, column.key) for column in Question.__table__.columns}
+        | {
+            "id": question_ids[question.id],
+            "page_id": page_ids[question.page_id],
+            "parent_question_id": question_ids.get(question.parent_question_id),
+        }
+        for question in questions
+    ]
+    bulk_insert(Question, sorted(rows, key=lambda row: row["parent_question_id"] is not None))
+    return page_ids, question_ids
+
+
+def _repoint_site_assessments(assessment_ids, page_ids, question_ids):
+    """Move the site pages and answers of ``assessment_ids`` to cloned rows."""
+    criteria = SiteAssessment.assessment_id.in_(assessment_ids)
+    site_assessment_ids = select(SiteAssessment.id).where(criteria)
+    site_page_ids = select(SitePage.id).where(SitePage.site_assessment_id.in_(site_assessment_ids))
+    for old, new in page_ids.items():
+        db.session.execute(
+            update(SitePage)
+            .where(SitePage.site_assessment_id.in_(site_assessment_ids), SitePage.page_id == old)
+            .values(page_id=new)
+        )
+    for old, new in question_ids.items():
+        db.session.execute(
+            update(QuestionResponse)
+            .where(
+                QuestionResponse.site_page_id.in_(site_page_ids),
+                QuestionResponse.question_id == old,
+            )
+            .values(question_id=new)
+        )
+    bump_site_assessment_revisions(criteria)
+    db.session.expire_all()
+    # stored summaries carry question ids
+    for site_assessment in SiteAssessment.query.filter(criteria):
+        rebuild_result(site_assessment)
+
+
+def fork_catalog(assessment):
+    """Make sure nothing but ``assessment`` uses its pages and questions.
+
+    A season that shares a template gets its own copy of it. A template that other
+    seasons share keeps its rows and hands a copy to those seasons instead (the
+    oldest becomes their template). Either way the site pages and answers of the
+    seasons that move are pointed at the copy.
+    """
+    if assessment.template_id is not None:
+        page_ids, question_ids = _clone_catalog(assessment.template_id, assessment.id)
+        _repoint_site_assessments([assessment.id], page_ids, question_ids)
+        assessment.template_id = None
+        return
+
+    sharing = Assessment.query.filter_by(template_id=assessment.id).order_by(Assessment.id).all()
+    if not sharing:
+        return
+    owner, *others = sharing
+    page_ids, question_ids = _clone_catalog(assessment.id, owner.id)
+    _repoint_site_assessments([a.id for a in sharing], page_ids, question_ids)
+    owner.template_id = None
+    for other in others:
+        other.template_id = owner.id
+
+
+def latest_template():
+    return (
+        Assessment.query.filter(Assessment.template_id.is_(None))
+        .order_by(Assessment.id.desc())
+        .first()
+    )
+
+
+def sync_catalog(year, season, filepath, options_file, choices, dry_run=False):
+    """Bring the season's catalog in line with the CSV. Returns (assessment, diff).
+
+    A season without an Assessment gets one that reuses the latest template; the
+    very first season is seeded from scratch (and returns a ``None`` diff). Changes
+    to pages or questions other seasons share go to a copy (``fork_catalog``).
+    """
+    plan = read_seed_plan(filepath, options_file, choices)
+    assessment = Assessment.query.filter_by(year=year, season=season).first()
+    if assessment is not None:
+        template_id = assessment.template_id or assessment.id
+    else:
+        template = latest_template()
+        if template is None:
+            if dry_run:
+                return None, None
+            return write_seed_plan(plan, year, season), None
+        template_id = template.id
+
+    diff = diff_catalog(plan, template_id)
+    if dry_run:
+        db.session.rollback()
+        return assessment, diff
+
+    if assessment is None:
+        assessment = Assessment(year=year, season=season, template_id=template_id)
+        db.session.add(assessment)
+    if diff.touches_assessment():
+        db.session.flush()
+        fork_catalog(assessment)
+        db.session.flush()
+        diff = diff_catalog(plan, assessment.template_id or assessment.id)
+    apply_catalog_diff(diff)
+    if not diff.is_empty() or assessment.id is None:
+        db.session.flush()
+        bump_catalog_version()
+    db.session.commit()
+    logging.info(f"Synced catalog of {season} {year}: {diff.counts()}")
+    return assessment, diff
@@ -8,35 +8,30 @@ from backend.models import (
     OrganizationQuestion,
     OrganizationQuestionResponse,
 )
-from backend.consts import ORG_NAME
+from backend.consts import ORG_NAME, SITE_NAME, SITE_PEOPLE_SERVED
+from backend.logic.responses import upsert_responses
+from backend.utils.principals import invalidate_principal_on_commit
 
 
 def update_org_and_responses(organization, name):
     if name:
         org_question = OrganizationQuestion.query.filter_by(slug=ORG_NAME).first()
-        existing = OrganizationQuestionResponse.query.filter_by(
-            organization_id=organization.id,
-            question_id=org_question.id,
-        ).first()
-        if existing:
-            existing.value = name
-            db.session.add(existing)
-        else:
-            new_response = OrganizationQuestionResponse(
-                organization_id=organization.id, question_id=org_question.id, value=name
-            )
-            db.session.add(new_response)
-            organization.question_responses.append(new_response)
+        upsert_responses(
+            OrganizationQuestionResponse,
+            organization.id,
+            [{"questionId": org_question.id, "value": name}],
+        )
     db.session.commit()
 
 
 def create_or_update_site_from_responses(user, responses_data):
+    """Create the user's site from the site profile answers. Does not commit."""
     organization = user.organization_id
     responses = {r["questionId"]: r["value"] for r in responses_data}
 
     # find the sitequestion with slug sitename
-    site_name_id = SiteQuestion.query.filter_by(slug="sitename").first().id
-    people_served_id = SiteQuestion.query.filter_by(slug="sitenumserved").first().id
+    site_name_id = SiteQuestion.query.filter_by(slug=SITE_NAME).first().id
+    people_served_id = SiteQuestion.query.filter_by(slug=SITE_PEOPLE_SERVED).first().id
     site_name = responses.get(site_name_id, None)
     people_served = responses.get(people_served_id, None)
 
@@ -52,7 +47,7 @@ def create_or_update_site_from_responses(user, responses_data):
     # update the site with the new data
     site.people_served = people_served
     db.session.add(site)
-    db.session.commit()
+    db.session.flush()
     site = Site.query.filter_by(name=site_name, organization_id=organization).first()
     user.site_id = site.id
     db.session.add(user)
@@ -62,14 +57,16 @@ def create_or_update_site_from_responses(user, responses_data):
     if org:
         org.sites.append(site)
         db.session.add(org)
-    db.session.commit()
+    db.session.flush()
+    invalidate_principal_on_commit(db.session, user.id)
     return site
 
 
 def create_or_update_org_from_responses(user, responses_data):
+    """Create or rename the user's organization. Does not commit."""
     responses = {r["questionId"]: r["value"] for r in responses_data}
     # find the sitequestion with slug sitename
-    org_name_id = OrganizationQuestion.query.filter_by(slug="orgname").first().id
+    org_name_id = OrganizationQuestion.query.filter_by(slug=ORG_NAME).first().id
     org_name = responses.get(org_name_id, None)
 
     if user.organization_id:
@@ -86,10 +83,11 @@ def create_or_update_org_from_responses(user, responses_data):
             org = Organization(name=org_name)
 
         db.session.add(org)
-        db.session.commit()
+        db.session.flush()
         org = Organization.query.filter_by(name=org_name).first()
         user.organization_id = org.id
         db.session.add(user)
+        invalidate_principal_on_commit(db.session, user.id)
 
-    db.session.commit()
+    db.session.flush()
     return org
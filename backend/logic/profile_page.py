@@ -0,0 +1,72 @@
+"""Side effects of saving an assessment's profile page, looked up by question slug.
+
+Each handler folds one answer into a ``ProfileChanges``; nothing is written until
+every answer has been seen, and then the changes go out as at most three UPDATEs
+(counters, site pages, site), whatever the number of answers or pages.
+"""
+
+from dataclasses import dataclass, field
+
+from sqlalchemy import update
+
+from backend.consts import ORG_NAME, SITE_NEEDS, SITE_PEOPLE_SERVED
+from backend.logic.progress import require_pages
+from backend.models import db, Site
+
+# question slug -> handler(changes, value)
+PROFILE_SIDE_EFFECTS = {}
+
+
+@dataclass
+class ProfileChanges:
+    required_titles: set = field(default_factory=set)
+    site: dict = field(default_factory=dict)
+
+
+def profile_side_effect(slug):
+    def register(handler):
+        PROFILE_SIDE_EFFECTS[slug] = handler
+        return handler
+
+    return register
+
+
+@profile_side_effect(SITE_NEEDS)
+def _require_needed_pages(changes, value):
+    changes.required_titles.update(value or ())
+
+
+@profile_side_effect(ORG_NAME)
+def _rename_site(changes, value):
+    changes.site["name"] = value
+
+
+@profile_side_effect(SITE_PEOPLE_SERVED)
+def _set_people_served(changes, value):
+    changes.site["people_served"] = value
+
+
+def side_effects_by_question(catalog):
+    """Question id -> handler, for the registered slugs the assessment has questions for."""
+    return {
+        catalog.by_slug[slug].id: handler
+        for slug, handler in PROFILE_SIDE_EFFECTS.items()
+        if slug in catalog.by_slug
+    }
+
+
+def update_from_profile_page(catalog, site_assessment, responses_data):
+    """Apply the side effects of a profile page save. Does not commit."""
+    handlers = side_effects_by_question(catalog)
+    changes = ProfileChanges()
+    for response in responses_data:
+        handler = handlers.get(response["questionId"])
+        if handler:
+            handler(changes, response["value"])
+
+    if changes.required_titles:
+        require_pages(site_assessment.id, changes.required_titles)
+    if changes.site:
+        db.session.execute(
+            update(Site).where(Site.id == site_assessment.site_id).values(**changes.site)
+        )
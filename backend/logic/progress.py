@@ -0,0 +1,222 @@
+"""Page progress as an explicit state machine, with counters kept on SiteAssessment.
+
+A site page moves through::
+
+    LOCKED -> UNSTARTEDREQUIRED / UNSTARTEDOPTIONAL -> STARTEDREQUIRED / STARTEDOPTIONAL -> COMPLETE
+
+``unlock`` takes every LOCKED page of an assessment to UNSTARTED*, ``save`` to
+STARTED* (also reopening a COMPLETE page) and ``confirm`` to COMPLETE. Required
+pages (and the confirmation page) are the *REQUIRED variants.
+
+Every change is folded into the assessment's counters as a delta computed from
+the page alone, so the counters always equal what counting the pages would give:
+
+* ``pages_locked``: pages still LOCKED,
+* ``required_remaining``: unlocked required pages, other than the confirmation
+  page, that are not COMPLETE,
+* ``optional_started``: pages in STARTEDOPTIONAL,
+* ``pages_complete``: pages that are COMPLETE.
+
+The remaining pages unlock once no unlocked required page is left, and an
+assessment is ready to confirm once nothing is locked or required; both are
+checks on the counters rather than on the pages.
+"""
+
+from sqlalchemy import and_, case, func, or_, select, update
+
+from backend.models import db, SiteAssessment, SitePage
+
+LOCKED = "LOCKED"
+UNSTARTED_REQUIRED = "UNSTARTEDREQUIRED"
+UNSTARTED_OPTIONAL = "UNSTARTEDOPTIONAL"
+STARTED_REQUIRED = "STARTEDREQUIRED"
+STARTED_OPTIONAL = "STARTEDOPTIONAL"
+COMPLETE = "COMPLETE"
+
+COUNTERS = ("pages_locked", "required_remaining", "optional_started", "pages_complete")
+
+
+def _variant(required, is_confirmation_page, when_required, otherwise):
+    return when_required if required or is_confirmation_page else otherwise
+
+
+def next_progress(progress, event, required, is_confirmation_page=False):
+    """The state a page in ``progress`` moves to on ``event`` (unlock, save or confirm)."""
+    if event == "unlock":
+        if progress != LOCKED:
+            return progress
+        return _variant(required, is_confirmation_page, UNSTARTED_REQUIRED, UNSTARTED_OPTIONAL)
+    if event == "save":
+        return STARTED_REQUIRED if required else STARTED_OPTIONAL
+    if event == "confirm":
+        return COMPLETE
+    raise ValueError(f"Unknown page progress event {event!r}")
+
+
+def counter_contribution(progress, required, is_confirmation_page):
+    return {
+        "pages_locked": int(progress == LOCKED),
+        "required_remaining": int(
+            bool(required) and not is_confirmation_page and progress not in (LOCKED, COMPLETE)
+        ),
+        "optional_started": int(progress == STARTED_OPTIONAL),
+        "pages_complete": int(progress == COMPLETE),
+    }
+
+
+def initial_counters(site_pages):
+    """Counters of a freshly built list of SitePages."""
+    totals = dict.fromkeys(COUNTERS, 0)
+    for site_page in site_pages:
+        contribution = counter_contribution(
+            site_page.progress, site_page.required, site_page.is_confirmation_page
+        )
+        for counter, value in contribution.items():
+            totals[counter] += value
+    return totals
+
+
+def _add_to_counters(site_assessment_id, deltas):
+    deltas = {counter: delta for counter, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    db.session.execute(
+        update(SiteAssessment)
+        .where(SiteAssessment.id == site_assessment_id)
+        .values({counter: getattr(SiteAssessment, counter) + d for counter, d in deltas.items()})
+        .execution_options(synchronize_session=False)
+    )
+
+
+def change_page(site_page, progress=None, required=None):
+    """Set the progress and/or required flag of ``site_page`` and update its counters."""
+    before = counter_contribution(
+        site_page.progress, site_page.required, site_page.is_confirmation_page
+    )
+    if progress is not None:
+        site_page.progress = progress
+    if required is not None:
+        site_page.required = required
+    after = counter_contribution(
+        site_page.progress, site_page.required, site_page.is_confirmation_page
+    )
+    _add_to_counters(site_page.site_assessment_id, {c: after[c] - before[c] for c in COUNTERS})
+    _expire_counters(site_page.site_assessment_id)
+
+
+def apply_event(site_page, event):
+    change_page(
+        site_page,
+        progress=next_progress(
+            site_page.progress, event, site_page.required, site_page.is_confirmation_page
+        ),
+    )
+
+
+def _expire_counters(site_assessment_id):
+    site_assessment = db.session.identity_map.get(
+        db.session.identity_key(SiteAssessment, site_assessment_id)
+    )
+    if site_assessment is not None:
+        db.session.expire(site_assessment, list(COUNTERS))
+
+
+def unlock_remaining_pages(site_assessment):
+    """Unlock the LOCKED pages once no unlocked required page is left. Does not commit.
+
+    Two set-based UPDATEs: one moves the counters, one the pages. Returns whether
+    anything was unlocked.
+    """
+    if site_assessment.required_remaining or not site_assessment.pages_locked:
+        return False
+
+    locked = and_(SitePage.site_assessment_id == site_assessment.id, SitePage.progress == LOCKED)
+    newly_required = (
+        select(func.count(SitePage.id))
+        .where(locked, SitePage.required.is_(True), SitePage.is_confirmation_page.isnot(True))
+        .scalar_subquery()
+    )
+    db.session.execute(
+        update(SiteAssessment)
+        .where(SiteAssessment.id == site_assessment.id)
+        .values(
+            required_remaining=SiteAssessment.required_remaining + newly_required,
+            pages_locked=0,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.session.execute(
+        update(SitePage)
+        .where(locked)
+        .values(
+            progress=case(
+                (
+                    or_(SitePage.required.is_(True), SitePage.is_confirmation_page.is_(True)),
+                    UNSTARTED_REQUIRED,
+                ),
+                else_=UNSTARTED_OPTIONAL,
+            )
+        )
+        .execution_options(synchronize_session="fetch")
+    )
+    db.session.expire(site_assessment, list(COUNTERS))
+    return True
+
+
+def recount_values(site_assessment_id_column):
+    """Correlated COUNT subqueries recomputing each counter from the pages."""
+    pages = SitePage.site_assessment_id == site_assessment_id_column
+
+    def count(*criteria):
+        return select(func.count(SitePage.id)).where(pages, *criteria).scalar_subquery()
+
+    return {
+        "pages_locked": count(SitePage.progress == LOCKED),
+        "required_remaining": count(
+            SitePage.required.is_(True),
+            SitePage.is_confirmation_page.isnot(True),
+            SitePage.progress.notin_([LOCKED, COMPLETE]),
+        ),
+        "optional_started": count(SitePage.progress == STARTED_OPTIONAL),
+        "pages_complete": count(SitePage.progress == COMPLETE),
+    }
+
+
+def recount_progress(*criteria):
+    """Recompute the counters of the SiteAssessments matching ``criteria`` from their pages."""
+    db.session.execute(
+        update(SiteAssessment)
+        .where(*criteria)
+        .values(recount_values(SiteAssessment.id))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def require_pages(site_assessment_id, titles):
+    """Mark the assessment's pages titled ``titles`` as required. Does not commit.
+
+    Two set-based UPDATEs however many pages change: the counters first, while the
+    pages still show which of them are about to become required, then the pages.
+    """
+    becoming_required = and_(
+        SitePage.site_assessment_id == site_assessment_id,
+        SitePage.title.in_(titles),
+        SitePage.required.isnot(True),
+    )
+    newly_remaining = (
+        select(func.count(SitePage.id))
+        .where(
+            becoming_required,
+            SitePage.is_confirmation_page.isnot(True),
+            SitePage.progress.notin_([LOCKED, COMPLETE]),
+        )
+        .scalar_subquery()
+    )
+    db.session.execute(
+        update(SiteAssessment)
+        .where(SiteAssessment.id == site_assessment_id)
+        .values(required_remaining=SiteAssessment.required_remaining + newly_remaining)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.execute(update(SitePage).where(becoming_required).values(required=True))
+    _expire_counters(site_assessment_id)
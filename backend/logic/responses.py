@@ -0,0 +1,98 @@
+import logging
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from backend.models import db
+
+# dialects with a native INSERT ... ON CONFLICT DO UPDATE
+UPSERT_DIALECTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+# rows per multi-row INSERT, keeps the statement under the bound-parameter limit
+UPSERT_CHUNK_SIZE = 500
+
+
+def collect_response_values(responses_data):
+    """Map questionId -> value for submitted responses, skipping incomplete ones.
+
+    If a question is submitted more than once the last value wins, which matches what
+    the old row-by-row save loop ended up storing.
+    """
+    values = {}
+    for response in responses_data:
+        question_id = response.get("questionId")
+        if question_id is None:
+            continue
+        values[question_id] = response.get("value")
+    return values
+
+
+def has_owner_unique_constraint(model):
+    """True if the table enforces one row per (owner, question), needed for ON CONFLICT."""
+    wanted = {model.owner_key, "question_id"}
+    table = model.__table__
+    for constraint in table.constraints:
+        if {c.name for c in getattr(constraint, "columns", [])} == wanted:
+            return True
+    return any(
+        index.unique and {c.name for c in index.columns} == wanted for index in table.indexes
+    )
+
+
+def upsert_responses(model, owner_id, responses_data):
+    """Insert or update responses of a ResponseMixin model for one owner in bulk.
+
+    ``model`` is QuestionResponse, OrganizationQuestionResponse or SiteQuestionResponse
+    and ``owner_id`` is the id of the site page, organization or site. Uses a single
+    native upsert statement where the dialect and table allow it; otherwise loads
+    the owner's existing rows with one query and writes one bulk UPDATE and one bulk
+    INSERT. Does not commit.
+    """
+    values = collect_response_values(responses_data)
+    if not values:
+        return 0
+
+    dialect_insert = UPSERT_DIALECTS.get(db.session.get_bind(mapper=model).dialect.name)
+    if dialect_insert and has_owner_unique_constraint(model):
+        _native_upsert(dialect_insert, model, owner_id, values)
+    else:
+        _select_then_write(model, owner_id, values)
+
+    logging.info(f"Upserted {len(values)} {model.__tablename__} rows for owner {owner_id}")
+    return len(values)
+
+
+def _native_upsert(dialect_insert, model, owner_id, values):
+    owner_key = model.owner_key
+    rows = [
+        {owner_key: owner_id, "question_id": question_id, "value": value}
+        for question_id, value in values.items()
+    ]
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        stmt = dialect_insert(model.__table__).values(rows[start : start + UPSERT_CHUNK_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[owner_key, "question_id"],
+            set_={"value": stmt.excluded.value},
+        )
+        db.session.execute(stmt)
+
+
+def _select_then_write(model, owner_id, values):
+    owner_column = getattr(model, model.owner_key)
+    existing = db.session.execute(
+        select(model.question_id, model.id).where(owner_column == owner_id)
+    ).all()
+    existing_ids = {question_id: response_id for question_id, response_id in existing}
+
+    updates = []
+    inserts = []
+    for question_id, value in values.items():
+        if question_id in existing_ids:
+            updates.append({"id": existing_ids[question_id], "value": value})
+        else:
+            inserts.append({model.owner_key: owner_id, "question_id": question_id, "value": value})
+
+    if updates:
+        db.session.execute(update(model), updates)
+    if inserts:
+        db.session.execute(insert(model), inserts)
@@ -0,0 +1,211 @@
+"""Materialized assessment summaries stored in SiteAssessmentResult.data.
+
+The document keeps one section per SitePage, keyed by site page id:
+
+    {"sections": {"12": {"sitePageId": 12, "sitePageTitle": "Food", "order": 19,
+                         "responses": [...], "needs": [{"highlight": ..., "subtext": ...}]}}}
+
+Saving a page rewrites only that page's section. The summary endpoint turns the
+document into the summary/carousel payload; the site name and people served are
+read from the site at that point, so renaming a site needs no rebuild. Sections are
+built from ``summary_rows_query``, which the summary endpoint also uses directly for
+assessments that have no stored result yet.
+"""
+
+import logging
+from datetime import datetime, UTC
+
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+
+from backend.models import (
+    db,
+    Page,
+    Question,
+    QuestionResponse,
+    SiteAssessment,
+    SiteAssessmentResult,
+    SitePage,
+)
+from backend.validation import is_need_question
+
+CARD_BACKGROUND_COLOR = "#082B76"
+
+
+def _display_value(value):
+    """Return (summary value, card highlight) for a stored response value."""
+    str_value = str(value)
+    if str_value[-1] == "|":
+        value = value[:-1]
+    if str_value == "true":
+        value = "Yes"
+    if str_value == "false":
+        value = "No"
+    if isinstance(value, list):
+        str_value = ", ".join(str(v) for v in value if v is not None)
+    return value, str_value
+
+
+def build_page_section(site_page_id, order, title, answers):
+    """Build the result section of one SitePage.
+
+    ``answers`` are (question id, text, subtext, value) tuples in question order.
+    """
+    questions_data = []
+    needs = []
+    for question_id, text, subtext, value in answers:
+        if not value or len(str(value)) == 0:
+            continue
+        value, highlight = _display_value(value)
+        if is_need_question(text):
+            needs.append({"highlight": highlight, "subtext": subtext or ""})
+        questions_data.append(
+            {"questionId": question_id, "questionText": text, "responseValue": value}
+        )
+
+    return {
+        "sitePageId": site_page_id,
+        "sitePageTitle": title,
+        "order": order,
+        "responses": questions_data,
+        "needs": needs,
+    }
+
+
+def summary_rows_query(site_assessment_id):
+    """One joined query over SitePage -> QuestionResponse -> Question -> Page.
+
+    Rows are ordered by page order, then question order, and pages without
+    responses still yield a row (with NULL response columns).
+    """
+    return (
+        select(
+            SitePage.id,
+            SitePage.order,
+            Page.title,
+            Question.id,
+            Question.text,
+            Question.subtext,
+            QuestionResponse.value,
+        )
+        .join(Page, Page.id == SitePage.page_id)
+        .outerjoin(QuestionResponse, QuestionResponse.site_page_id == SitePage.id)
+        .outerjoin(Question, Question.id == QuestionResponse.question_id)
+        .where(SitePage.site_assessment_id == site_assessment_id)
+        .order_by(Page.order, SitePage.id, Question.order, Question.id)
+    )
+
+
+def build_sections(rows):
+    sections = {}
+    answers = {}
+    for site_page_id, order, title, question_id, text, subtext, value in rows:
+        if site_page_id not in sections:
+            sections[site_page_id] = (order, title)
+            answers[site_page_id] = []
+        if question_id is not None:
+            answers[site_page_id].append((question_id, text, subtext, value))
+    return {
+        str(site_page_id): build_page_section(site_page_id, order, title, answers[site_page_id])
+        for site_page_id, (order, title) in sections.items()
+    }
+
+
+def build_result_data(site_assessment_id):
+    """Build the whole result document of a SiteAssessment with one query."""
+    rows = db.session.execute(summary_rows_query(site_assessment_id)).all()
+    return {"sections": build_sections(rows)}
+
+
+def _store(site_assessment_id, result, data):
+    if result is None:
+        result = SiteAssessmentResult(site_assessment_id=site_assessment_id, data=data)
+        db.session.add(result)
+    else:
+        # assign a new object so the JSON column is flagged as changed
+        result.data = data
+    result.updated_at = datetime.now(UTC)
+    return result
+
+
+def get_result(site_assessment_id):
+    return SiteAssessmentResult.query.filter_by(site_assessment_id=site_assessment_id).first()
+
+
+def load_assessment_with_result(site_assessment_id):
+    """Return (SiteAssessment with its site, SiteAssessmentResult or None) in one query."""
+    row = db.session.execute(
+        select(SiteAssessment, SiteAssessmentResult)
+        .options(joinedload(SiteAssessment.site))
+        .outerjoin(
+            SiteAssessmentResult, SiteAssessmentResult.site_assessment_id == SiteAssessment.id
+        )
+        .where(SiteAssessment.id == site_assessment_id)
+    ).first()
+    return (row[0], row[1]) if row else (None, None)
+
+
+def refresh_page_section(site_assessment, site_page):
+    """Rewrite the section of ``site_page`` after it was saved. Does not commit."""
+    result = get_result(site_assessment.id)
+    if result is None:
+        return rebuild_result(site_assessment)
+
+    rows = db.session.execute(
+        summary_rows_query(site_assessment.id).where(SitePage.id == site_page.id)
+    ).all()
+    sections = {**result.data.get("sections", {}), **build_sections(rows)}
+    return _store(site_assessment.id, result, {**result.data, "sections": sections})
+
+
+def rebuild_result(site_assessment):
+    """Regenerate the whole result of a SiteAssessment. Does not commit."""
+    data = build_result_data(site_assessment.id)
+    return _store(site_assessment.id, get_result(site_assessment.id), data)
+
+
+def render_summary(data, site):
+    """Turn a result document into the summary endpoint's payload."""
+    sections = sorted(
+        data.get("sections", {}).values(), key=lambda s: (s["order"], s["sitePageId"])
+    )
+    summary = []
+    cards = []
+    for section in sections:
+        for need in section["needs"]:
+            cards.append(
+                {
+                    "title": f"{site.name} needs {section['sitePageTitle']} items",
+                    "highlight": need["highlight"],
+                    "subtext": need["subtext"],
+                    "backgroundColor": CARD_BACKGROUND_COLOR,
+                }
+            )
+        if section["responses"]:
+            summary.append(
+                {
+                    "sitePageId": section["sitePageId"],
+                    "sitePageTitle": section["sitePageTitle"],
+                    "responses": section["responses"],
+                }
+            )
+
+    return {
+        "summary": summary,
+        "carousel": {
+            "organizationName": site.name,
+            "peopleServed": site.people_served,
+            "cards": cards,
+        },
+    }
+
+
+def rebuild_all_results():
+    """Regenerate the result of every SiteAssessment, e.g. after template changes."""
+    count = 0
+    for site_assessment in SiteAssessment.query.all():
+        rebuild_result(site_assessment)
+        count += 1
+    db.session.commit()
+    logging.info(f"Rebuilt {count} site assessment results")
+    return count
@@ -0,0 +1,100 @@
+"""The write half of the save endpoints, as plain functions of ids and submitted data.
+
+Each function makes its changes in the current session without committing and
+returns ``(payload, status)``, so ``perform_write`` can run it on the request thread
+or hand it to the single-writer queue, which commits several saves at once.
+
+The profile saves can change the user's site or organization, which the access
+token carries as claims, so they return a fresh ``accessToken`` for the client to
+use from then on.
+"""
+
+import logging
+
+from sqlalchemy import select
+
+from backend.catalog import get_assessment_catalog
+from backend.logic import progress
+from backend.logic.manipulate_site_info import (
+    create_or_update_org_from_responses,
+    create_or_update_site_from_responses,
+)
+from backend.logic.profile_page import update_from_profile_page
+from backend.logic.responses import upsert_responses
+from backend.logic.results import refresh_page_section
+from backend.models import (
+    db,
+    OrganizationQuestionResponse,
+    QuestionResponse,
+    Site,
+    SiteAssessment,
+    SitePage,
+    SiteQuestionResponse,
+    User,
+)
+from backend.utils.jwt_utils import generate_jwt_payload
+from backend.utils.utils import bump_site_assessment_revisions
+from backend.validation import validate_responses
+
+
+def save_site_page(site_id, site_assessment_id, site_page_id, responses_data, confirmed):
+    """Validate and store one page of answers; does not require mandatory questions.
+
+    The page must belong to ``site_assessment_id`` and that to ``site_id``, the caller's
+    site; anything else is a 404.
+    """
+    site_page = db.session.get(SitePage, site_page_id)
+    site_assessment = db.session.get(SiteAssessment, site_assessment_id)
+    if (
+        not site_page
+        or not site_assessment
+        or site_page.site_assessment_id != site_assessment.id
+        or site_assessment.site_id != site_id
+    ):
+        logging.error(f"SitePage {site_page_id} not found")
+        return {"error": "SitePage not found"}, 404
+    catalog = get_assessment_catalog(site_assessment.assessment_id)
+    page = catalog.pages_by_id.get(site_page.page_id)
+    if page is None:
+        logging.error(f"Page {site_page.page_id} is not part of assessment {catalog.assessment_id}")
+        return {"error": "SitePage not found"}, 404
+
+    validation_errors = validate_responses(responses_data, catalog.questions)
+    if validation_errors:
+        logging.error(f"Validation errors: {validation_errors}")
+        return {"errors": validation_errors}, 400
+
+    progress.apply_event(site_page, "confirm" if confirmed else "save")
+    if confirmed:
+        progress.unlock_remaining_pages(site_assessment)
+
+    if page.is_profile_page:
+        update_from_profile_page(catalog, site_assessment, responses_data)
+
+    # Save or update responses
+    upsert_responses(QuestionResponse, site_page.id, responses_data)
+    refresh_page_section(site_assessment, site_page)
+    bump_site_assessment_revisions(SiteAssessment.id == site_assessment_id)
+
+    message = "SitePage completed successfully" if confirmed else "SitePage saved successfully"
+    return {"message": message}, 200
+
+
+def save_org_profile(user_id, responses_data):
+    user = db.session.get(User, user_id)
+    org = create_or_update_org_from_responses(user, responses_data)
+    upsert_responses(OrganizationQuestionResponse, org.id, responses_data)
+    bump_site_assessment_revisions(
+        SiteAssessment.site_id.in_(select(Site.id).where(Site.organization_id == org.id))
+    )
+    return {"message": "Organization data saved", "accessToken": generate_jwt_payload(user)}, 200
+
+
+def save_site_profile(user_id, responses_data):
+    user = db.session.get(User, user_id)
+    site = create_or_update_site_from_responses(user, responses_data)
+    if site is None:
+        return {"error": "A site with this name already exists."}, 409
+    upsert_responses(SiteQuestionResponse, site.id, responses_data)
+    bump_site_assessment_revisions(SiteAssessment.site_id == site.id)
+    return {"message": "Organization data saved", "accessToken": generate_jwt_payload(user)}, 200
@@ -0,0 +1,278 @@
+"""Two-phase seeding of an assessment template from questions.csv.
+
+``build_seed_plan`` turns the CSV rows, the response options and the item catalog
+into a ``SeedPlan`` without touching the database. ``write_seed_plan`` then writes
+the plan in one transaction: ids are assigned on the client from the current
+maximum of each table (see ``IdAllocator``), so pages, questions and parent links go
+out as a handful of bulk INSERTs instead of a query and a commit per row. Seeding is
+a CLI command and expects to be the only seeder running.
+
+Organization and site questions are shared by every season; those whose text
+already exists are reused rather than inserted again.
+"""
+
+import csv
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+
+from sqlalchemy import func, insert, select, text
+
+from backend.catalog import bump_catalog_version
+from backend.models import db, Assessment, OrganizationQuestion, Page, Question, SiteQuestion
+
+PROFILE_KINDS = {"Organization": OrganizationQuestion, "Site": SiteQuestion}
+NEEDS_AREAS_QUESTION = "Which of the following areas do you have needs in?"
+NOT_NEEDS_AREAS = {"Preamble", "Confirmation", "Site", "Demographics", "Organization"}
+DEFAULT_PAGE_ORDER = 9999
+
+
+@dataclass
+class PlannedPage:
+    title: str
+    order: int
+    is_confirmation_page: bool
+    is_profile_page: bool
+
+
+@dataclass
+class PlannedQuestion:
+    # "Organization", "Site" or the title of the assessment page
+    page: str
+    text: str
+    subtext: str | None
+    required: bool
+    question_type: str
+    options: list | None
+    order: int
+    allows_additional_input: bool
+    slug: str | None
+    item_id: str | None = None
+    parent_item_id: str | None = None
+
+
+@dataclass
+class SeedPlan:
+    pages: list = field(default_factory=list)
+    questions: list = field(default_factory=list)
+
+    def profile_questions(self, kind):
+        return [q for q in self.questions if q.page == kind]
+
+    def assessment_questions(self):
+        return [q for q in self.questions if q.page not in PROFILE_KINDS]
+
+
+def read_question_rows(filepath):
+    # errors="replace" keeps seeding going on stray encoding issues in the sheet export
+    with open(filepath, mode="r", encoding="utf-8", errors="replace") as file:
+        return list(csv.DictReader(file))
+
+
+def page_order(rows):
+    """Map each page title to the smallest QuestionOrder on it."""
+    orders = {}
+    for row in rows:
+        try:
+            q_order = int(row["QuestionOrder"])
+        except (ValueError, TypeError):
+            continue
+        page = row["Page"]
+        if page and (page not in orders or q_order < orders[page]):
+            orders[page] = q_order
+    return orders
+
+
+def _plan_question(row, orders, choices, response_options):
+    raw_type = row["Type"]
+    allows_additional_input = "WithOther" in raw_type or "With Numeric Entry" in raw_type
+
+    options = []
+    if row["ItemText"] == NEEDS_AREAS_QUESTION:
+        options = sorted(set(orders) - NOT_NEEDS_AREAS)
+    elif "Strapi" in row["ItemText"] or "do you need over the next six months?" in row["ItemText"]:
+        options = list(choices.get(row["Page"], ())) + ["None"]
+        allows_additional_input = True
+    if not options:
+        options = response_options.get(row["ItemText"], None)
+
+    return PlannedQuestion(
+        page=row["Page"],
+        text=row["ItemText"],
+        subtext=row["Subtext"] or None,
+        required=row["Mandatory in Section"] == "Y",
+        question_type=raw_type.replace(" With Numeric Entry", "").replace("WithOther", "").strip(),
+        options=options,
+        order=int(row["QuestionOrder"]),
+        allows_additional_input=allows_additional_input,
+        slug=row.get("Slug", None),
+        item_id=row["ItemID"] or None,
+        parent_item_id=row["ParentItemID"] or None,
+    )
+
+
+def build_seed_plan(rows, response_options, choices):
+    """Phase one: pages and questions to create, deduplicated the way seeding always has been.
+
+    Questions are unique per page by text; a ParentItemID refers to the ItemID of a
+    question on the same page.
+    """
+    orders = page_order(rows)
+    plan = SeedPlan()
+    seen_pages = set()
+    seen_questions = set()
+    for row in rows:
+        title = row["Page"]
+        if title not in PROFILE_KINDS and title not in seen_pages:
+            seen_pages.add(title)
+            plan.pages.append(
+                PlannedPage(
+                    title=title,
+                    order=orders.get(title, DEFAULT_PAGE_ORDER),
+                    is_confirmation_page=title == "Confirmation",
+                    is_profile_page=title == "Basic Info",
+                )
+            )
+        if (title, row["ItemText"]) in seen_questions:
+            continue
+        seen_questions.add((title, row["ItemText"]))
+        plan.questions.append(_plan_question(row, orders, choices, response_options))
+    return plan
+
+
+def read_seed_plan(filepath, options_file, choices):
+    with open(options_file, "r", encoding="utf-8") as f:
+        response_options = json.load(f)
+    return build_seed_plan(read_question_rows(filepath), response_options, choices)
+
+
+class IdAllocator:
+    """Hands out primary keys above the current maximum of a table.
+
+    Seeding and catalog syncs run from the CLI, one at a time, but the app may insert
+    into the same tables meanwhile (a new season's Assessment, say). On PostgreSQL the
+    table is locked against other writers until the transaction ends, so no insert can
+    take an id between reading the maximum and ``bulk_insert`` moving the sequence.
+    SQLite has no table locks; there an id taken meanwhile makes the seed fail on the
+    primary key rather than reuse it.
+    """
+
+    def __init__(self, model):
+        if db.session.get_bind().dialect.name == "postgresql":
+            # conflicts with the ROW EXCLUSIVE lock of INSERTs, but not with reads
+            db.session.execute(
+                text(f"LOCK TABLE {model.__table__.name} IN SHARE ROW EXCLUSIVE MODE")
+            )
+        self.next_id = (db.session.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+    def __call__(self):
+        allocated = self.next_id
+        self.next_id += 1
+        return allocated
+
+
+def question_row(planned, question_id, parent_id):
+    return {
+        "id": question_id,
+        "text": planned.text,
+        "subtext": planned.subtext,
+        "required": planned.required,
+        "question_type": planned.question_type,
+        "options": planned.options,
+        "order": planned.order,
+        "allows_additional_input": planned.allows_additional_input,
+        "parent_question_id": parent_id,
+        "slug": planned.slug,
+    }
+
+
+def _question_rows(model, planned_questions, existing_ids=None, page_ids=None):
+    """Allocate ids for the questions to insert and resolve their parents.
+
+    ``existing_ids`` maps text to the id of a question that is reused instead of
+    inserted. Rows are returned parents first, so the self-referencing foreign key
+    holds on every row of the bulk INSERT.
+    """
+    existing_ids = existing_ids or {}
+    allocate = IdAllocator(model)
+    ids = {}
+    by_item = {}
+    for planned in planned_questions:
+        ids[id(planned)] = existing_ids.get(planned.text) or allocate()
+        if planned.item_id:
+            by_item[(planned.page, planned.item_id)] = ids[id(planned)]
+
+    rows = []
+    for planned in planned_questions:
+        if planned.text in existing_ids:
+            continue
+        parent_id = by_item.get((planned.page, planned.parent_item_id))
+        row = question_row(planned, ids[id(planned)], parent_id)
+        if page_ids is not None:
+            row["page_id"] = page_ids[planned.page]
+        rows.append(row)
+    return sorted(rows, key=lambda row: row["parent_question_id"] is not None)
+
+
+def bulk_insert(model, rows):
+    if not rows:
+        return
+    db.session.execute(insert(model.__table__), rows)
+    if db.session.get_bind().dialect.name == "postgresql":
+        # ids were chosen on the client, so move the serial sequence past them
+        table = model.__table__.name
+        db.session.execute(
+            text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), MAX(id)) FROM {table}")
+        )
+
+
+def write_seed_plan(plan, year, season):
+    """Phase two: create the Assessment and everything in ``plan`` in one transaction."""
+    assessment_id = IdAllocator(Assessment)()
+    bulk_insert(Assessment, [{"id": assessment_id, "year": year, "season": season}])
+
+    allocate_page = IdAllocator(Page)
+    page_ids = {page.title: allocate_page() for page in plan.pages}
+    bulk_insert(
+        Page,
+        [
+            {
+                "id": page_ids[page.title],
+                "title": page.title,
+                "assessment_id": assessment_id,
+                "order": page.order,
+                "is_confirmation_page": page.is_confirmation_page,
+                "is_profile_page": page.is_profile_page,
+            }
+            for page in plan.pages
+        ],
+    )
+    bulk_insert(
+        Question,
+        _question_rows(Question, plan.assessment_questions(), page_ids=page_ids),
+    )
+
+    for kind, model in PROFILE_KINDS.items():
+        existing = dict(db.session.execute(select(model.text, model.id)).all())
+        bulk_insert(model, _question_rows(model, plan.profile_questions(kind), existing))
+
+    bump_catalog_version()
+    db.session.commit()
+    return db.session.get(Assessment, assessment_id)
+
+
+def seed_assessment(year, season, filepath, options_file, choices):
+    """Run both phases and log how long each took. Returns (assessment, timings)."""
+    start = time.perf_counter()
+    plan = read_seed_plan(filepath, options_file, choices)
+    planned = time.perf_counter()
+    assessment = write_seed_plan(plan, year, season)
+    written = time.perf_counter()
+
+    timings = {"plan_ms": (planned - start) * 1000, "write_ms": (written - planned) * 1000}
+    logging.info(
+        f"Seeded {season} {year}: {len(plan.pages)} pages, {len(plan.questions)} questions "
+        f"(plan {timings['plan_ms']:.1f} ms, write {timings['write_ms']:.1f} ms)"
+    )
+    return assessment, timings
@@ -0,0 +1,194 @@
+"""Coordinate writes so SQLite lock contention does not surface as 500s.
+
+``perform_write(fn, *args)`` runs a save function from backend/logic/saves.py and
+commits it. Lock errors ("database is locked") are retried a bounded number of
+times with full-jitter exponential backoff.
+
+With ``WRITE_QUEUE_ENABLED`` the saves are not run on the request thread at all:
+they go to one writer thread, which takes whatever saves are waiting (up to
+``WRITE_QUEUE_BATCH_SIZE``, lingering ``WRITE_QUEUE_LINGER_MS`` for more) and
+commits them in a single transaction. With a single writer there is nobody to
+contend with inside the process, and one fsync covers the whole batch. The request
+thread blocks until its batch is committed, so the save is visible to the client's
+next request. If one save in a batch fails, the others are retried one by one so
+a bad request cannot fail its neighbours. A save still waiting after ``timeout``
+seconds is cancelled if the writer has not taken it yet, and ``WriteBusyError``
+tells the client to retry.
+"""
+
+import logging
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+
+from flask import current_app
+from sqlalchemy.exc import OperationalError
+
+from backend.models import db
+
+LOCK_ERRORS = ("database is locked", "database table is locked")
+
+
+class WriteBusyError(Exception):
+    pass
+
+
+def is_lock_error(error):
+    return isinstance(error, OperationalError) and any(
+        message in str(error.orig).lower() for message in LOCK_ERRORS
+    )
+
+
+def backoff_seconds(attempt, base_ms, cap_ms=1000):
+    """Full jitter: uniform between 0 and the exponential step for ``attempt``."""
+    return random.uniform(0, min(cap_ms, base_ms * 2**attempt)) / 1000
+
+
+def run_with_retry(work, attempts, base_ms, on_retry=None):
+    """Call ``work`` (which commits) until it gets past lock errors or runs out of attempts."""
+    for attempt in range(attempts):
+        try:
+            return work()
+        except OperationalError as error:
+            db.session.rollback()
+            if not is_lock_error(error) or attempt == attempts - 1:
+                raise
+            if on_retry:
+                on_retry()
+            delay = backoff_seconds(attempt, base_ms)
+            logging.warning(f"Database locked, retry {attempt + 1} in {delay * 1000:.0f} ms")
+            time.sleep(delay)
+
+
+class _Job:
+    def __init__(self, fn, args):
+        self.fn = fn
+        self.args = args
+        self.future = Future()
+
+
+class WriteQueue:
+    """One writer thread committing batches of saves. Started by the first ``submit``."""
+
+    def __init__(self, app, batch_size=32, linger_ms=2, attempts=5, base_ms=10):
+        self.app = app
+        self.batch_size = batch_size
+        self.linger = linger_ms / 1000
+        self.attempts = attempts
+        self.base_ms = base_ms
+        self._jobs = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.saves = 0
+        self.retries = 0
+        self.largest_batch = 0
+
+    def submit(self, fn, *args, timeout=30):
+        """Run ``fn(*args)`` on the writer thread; returns its result once committed."""
+        self._start()
+        job = _Job(fn, args)
+        self._jobs.put(job)
+        try:
+            return job.future.result(timeout=timeout)
+        except TimeoutError:
+            # a job the writer already took may still commit; saves are upserts, so a
+            # retry of it is harmless
+            job.future.cancel()
+            raise WriteBusyError("Too many saves in progress, try again shortly") from None
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="write-queue", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._jobs.put(None)
+            thread.join()
+
+    def _take_batch(self):
+        first = self._jobs.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.linger
+        while len(batch) < self.batch_size:
+            try:
+                job = self._jobs.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if job is None:
+                # finish this batch, then stop
+                self._jobs.put(None)
+                break
+            batch.append(job)
+        # skip the jobs whose request gave up waiting
+        return [job for job in batch if job.future.set_running_or_notify_cancel()]
+
+    def _loop(self):
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            if not batch:
+                continue
+            with self.app.app_context():
+                self._commit(batch)
+
+    def _retried(self):
+        self.retries += 1
+
+    def _commit(self, batch):
+        def work():
+            results = [job.fn(*job.args) for job in batch]
+            db.session.commit()
+            return results
+
+        try:
+            results = run_with_retry(work, self.attempts, self.base_ms, self._retried)
+        except Exception as error:
+            db.session.rollback()
+            if len(batch) == 1:
+                batch[0].future.set_exception(error)
+                return
+            logging.warning(f"Batch of {len(batch)} saves failed ({error}), retrying one by one")
+            for job in batch:
+                self._commit([job])
+            return
+
+        self.batches += 1
+        self.saves += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        for job, result in zip(batch, results):
+            job.future.set_result(result)
+
+    def stats(self):
+        return {
+            "pending": self._jobs.qsize(),
+            "batches": self.batches,
+            "saves": self.saves,
+            "retries": self.retries,
+            "largestBatch": self.largest_batch,
+        }
+
+
+def perform_write(fn, *args):
+    """Run save function ``fn`` and commit it, through the write queue when enabled."""
+    write_queue = current_app.extensions.get("write_queue")
+    if write_queue is not None:
+        return write_queue.submit(fn, *args)
+
+    def work():
+        result = fn(*args)
+        db.session.commit()
+        return result
+
+    return run_with_retry(
+        work, current_app.config["WRITE_RETRY_ATTEMPTS"], current_app.config["WRITE_RETRY_BASE_MS"]
+    )
@@ -2,9 +2,11 @@ from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime, UTC
 from sqlalchemy.dialects.mysql import JSON
 from sqlalchemy.ext.declarative import declared_attr
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Index
 
-db = SQLAlchemy()
+from backend.utils.db_routing import RoutingSession
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 
 class User(db.Model):
@@ -38,6 +40,8 @@ class Assessment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     year = db.Column(db.Integer, nullable=False)
     season = db.Column(db.String(10), nullable=False)
+    # the assessment whose pages and questions this season uses; None when it owns them
+    template_id = db.Column(db.Integer, db.ForeignKey("assessment.id"), nullable=True)
     pages = db.relationship("Page", backref="assessment", lazy=True)
 
 
@@ -49,6 +53,10 @@ class Page(db.Model):
     order = db.Column(db.Integer, nullable=False)
     is_confirmation_page = db.Column(db.Boolean, default=False)
     is_profile_page = db.Column(db.Boolean, default=False)
+    # dropped from questions.csv; kept so earlier answers still resolve
+    retired = db.Column(db.Boolean, nullable=False, default=False)
+
+    __table_args__ = (Index("ix_page_assessment_id_order", "assessment_id", "order"),)
 
 
 class QuestionMixin:
@@ -62,7 +70,8 @@ class QuestionMixin:
     options = Column(JSON, nullable=True)
     order = Column(Integer, nullable=False)
     allows_additional_input = Column(Boolean, default=False)
-    slug = Column(String(255), nullable=True)
+    slug = Column(String(255), nullable=True, index=True)
+    retired = Column(Boolean, nullable=False, default=False)
 
     @declared_attr
     def parent_question_id(cls):
@@ -75,6 +84,8 @@ class Question(QuestionMixin, db.Model):
 
     page_id = Column(Integer, ForeignKey("page.id"), nullable=False)
 
+    __table_args__ = (Index("ix_question_page_id_order", "page_id", "order"),)
+
 
 class OrganizationQuestion(QuestionMixin, db.Model):
     __tablename__ = "organization_question"
@@ -84,6 +95,13 @@ class SiteQuestion(QuestionMixin, db.Model):
     __tablename__ = "site_question"
 
 
+class CatalogVersion(db.Model):
+    """Single-row counter bumped whenever question definitions change."""
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+
 class SiteAssessment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     site_id = db.Column(db.Integer, db.ForeignKey("site.id"), nullable=False)
@@ -91,16 +109,35 @@ class SiteAssessment(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.now(UTC))
     site_pages = db.relationship("SitePage", backref="site_assessment", lazy=True)
     confirmed = db.Column(db.Boolean, default=False)
+    # incremented by every save that changes what the assessment endpoints return
+    revision = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    # page progress counters, kept in step with the site pages by backend/logic/progress.py
+    pages_locked = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    required_remaining = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    optional_started = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    pages_complete = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    @property
+    def ready_to_confirm(self):
+        return not self.pages_locked and not self.required_remaining
+
+    # one assessment per site and season
+    __table_args__ = (
+        Index("uq_site_assessment_site_id_assessment_id", "site_id", "assessment_id", unique=True),
+    )
 
 
 class SitePage(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    site_assessment_id = db.Column(db.Integer, db.ForeignKey("site_assessment.id"), nullable=False)
+    site_assessment_id = db.Column(
+        db.Integer, db.ForeignKey("site_assessment.id"), nullable=False, index=True
+    )
     page_id = db.Column(db.Integer, db.ForeignKey("page.id"), nullable=False)
     order = db.Column(db.Integer, nullable=False)
     state = db.Column(db.String(10), default="required")
     required = db.Column(db.Boolean, default=False)
     progress = db.Column(db.String(20), default="LOCKED")
+    page = db.relationship("Page")
     responses = db.relationship("QuestionResponse", back_populates="site_page", lazy=True)
     is_confirmation_page = db.Column(db.Boolean, default=False)
     title = db.Column(db.String(255), nullable=False)
@@ -109,6 +146,9 @@ class SitePage(db.Model):
 class ResponseMixin:
     __abstract__ = True
 
+    # name of the column identifying who the response belongs to (site page, org or site)
+    owner_key = None
+
     id = Column(Integer, primary_key=True)
     value = Column(JSON, nullable=True)
 
@@ -119,9 +159,16 @@ class ResponseMixin:
         base = cls.__tablename__.replace("_response", "")
         return Column(Integer, ForeignKey(f"{base}.id"), nullable=False)
 
+    @declared_attr
+    def __table_args__(cls):
+        # one response per owner and question; also what the native upsert conflicts on
+        name = f"uq_{cls.__tablename__}_{cls.owner_key}_question_id"
+        return (Index(name, cls.owner_key, "question_id", unique=True),)
+
 
 class QuestionResponse(ResponseMixin, db.Model):
     __tablename__ = "question_response"
+    owner_key = "site_page_id"
 
     site_page_id = Column(Integer, ForeignKey("site_page.id"), nullable=False)
 
@@ -133,6 +180,7 @@ class QuestionResponse(ResponseMixin, db.Model):
 # your existing org + site response classes now simply inherit:
 class OrganizationQuestionResponse(ResponseMixin, db.Model):
     __tablename__ = "organization_question_response"
+    owner_key = "organization_id"
 
     organization_id = Column(Integer, ForeignKey("organization.id"), nullable=False)
     organization = db.relationship("Organization", back_populates="question_responses")
@@ -141,6 +189,7 @@ class OrganizationQuestionResponse(ResponseMixin, db.Model):
 
 class SiteQuestionResponse(ResponseMixin, db.Model):
     __tablename__ = "site_question_response"
+    owner_key = "site_id"
 
     site_id = Column(Integer, ForeignKey("site.id"), nullable=False)
     site = db.relationship("Site", back_populates="question_responses")
@@ -1,7 +1,7 @@
 import logging
-import bcrypt
+from datetime import datetime, UTC
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from sqlalchemy.orm import joinedload
 
 from backend.models import (
@@ -10,7 +10,6 @@ from backend.models import (
     SiteAssessment,
     Page,
     SitePage,
-    QuestionResponse,
     Question,
     Site,
     Organization,
@@ -19,11 +18,17 @@ from backend.models import (
     SiteQuestion,
     SiteQuestionResponse,
 )
-from backend.validation import validate_responses
+from backend.catalog import (
+    catalog_stats,
+    get_assessment_catalog,
+    get_catalog_version,
+    get_profile_catalog,
+)
 from backend.utils.utils import (
+    bump_site_assessment_revisions,
     ensure_assessment_exists,
-    unlock_remaining_pages,
-    update_from_profile_page,
+    get_current_season,
+    site_assessment_tree_query,
 )
 from backend.serialize.serialize import (
     serialize_question,
@@ -33,11 +38,26 @@ from backend.serialize.serialize import (
     serialize_site,
     serialize_user,
 )
-from backend.utils.jwt_utils import generate_jwt_payload, get_current_user, JWTError
-from backend.logic.manipulate_site_info import (
-    create_or_update_site_from_responses,
-    create_or_update_org_from_responses,
-    update_org_and_responses,
+from backend.utils.db_routing import use_read_engine
+from backend.utils.http_cache import etag_response, site_assessment_etag
+from backend.utils.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, metrics
+from backend.utils.passwords import HashingBusyError, password_hasher
+from backend.utils.season_export import EXPORT_FORMATS, iter_season_export
+from backend.utils.jwt_utils import (
+    generate_jwt_payload,
+    get_current_admin,
+    get_current_principal,
+    get_current_user,
+    AdminRequiredError,
+    JWTError,
+)
+from backend.logic import saves
+from backend.logic.manipulate_site_info import update_org_and_responses
+from backend.logic.write_queue import WriteBusyError, perform_write
+from backend.logic.results import (
+    build_result_data,
+    load_assessment_with_result,
+    render_summary,
 )
 
 api_bp = Blueprint("api", __name__)
@@ -48,13 +68,61 @@ def status():
     return jsonify({"status": "API is running"}), 200
 
 
+@api_bp.route("/api/catalog/stats", methods=["GET"])
+def get_catalog_stats():
+    try:
+        get_current_admin()
+    except JWTError as e:
+        return jsonify({"error": str(e)}), 401
+    except AdminRequiredError as e:
+        return jsonify({"error": str(e)}), 403
+    return jsonify(catalog_stats()), 200
+
+
+@api_bp.route("/api/auth/stats", methods=["GET"])
+def get_auth_stats():
+    try:
+        get_current_admin()
+    except JWTError as e:
+        return jsonify({"error": str(e)}), 401
+    except AdminRequiredError as e:
+        return jsonify({"error": str(e)}), 403
+    return jsonify(password_hasher.stats()), 200
+
+
+@api_bp.route("/api/metrics", methods=["GET"])
+def get_metrics():
+    try:
+        get_current_admin()
+    except JWTError as e:
+        return jsonify({"error": str(e)}), 401
+    except AdminRequiredError as e:
+        return jsonify({"error": str(e)}), 403
+    return Response(metrics.render(), content_type=METRICS_CONTENT_TYPE)
+
+
+def busy_response(error):
+    response = jsonify({"error": str(error)})
+    response.headers["Retry-After"] = "1"
+    return response, 503
+
+
 @api_bp.route("/api/login", methods=["POST"])
 def login():
-    data = request.get_json()
+    data = request.get_json() or {}
     email = data.get("email")
+    password = data.get("password")
+    if not email or not password:
+        return jsonify({"error": "Email and password are required."}), 400
     user = User.query.filter_by(email=email).first()
     if not user:
         return jsonify({"error": "User not found"}), 404
+    try:
+        verified = password_hasher.verify(password, user.hashed_password)
+    except HashingBusyError as e:
+        return busy_response(e)
+    if not verified:
+        return jsonify({"error": "Invalid email or password."}), 401
 
     token = generate_jwt_payload(user)
     result = {"message": "Login successful", "user": serialize_user(user), "accessToken": token}
@@ -68,49 +136,61 @@ def login():
 
 
 @api_bp.route("/api/site-assessment", methods=["GET"])
+@use_read_engine
 def get_site_assessment():
     try:
-        user = get_current_user()
+        principal = get_current_principal()
     except JWTError as e:
         logging.error(f"JWT Error: {e}")
         return jsonify({"error": str(e)}), 401
 
     # Look up SiteAssessment instance for the user's site.
-    site_assessment = SiteAssessment.query.filter_by(site_id=user.site_id).first()
+    site_assessment = site_assessment_tree_query().filter_by(site_id=principal.site_id).first()
     if not site_assessment:
         # see if the user has a site. if they have a site, create a new assessment
         # otherwise, return something reflecting that they need to create a site
-        site = Site.query.filter_by(id=user.site_id).first()
+        site = Site.query.filter_by(id=principal.site_id).first()
         if site:
             # Create a new SiteAssessment instance
             ensure_assessment_exists(site.id)
-            site_assessment = SiteAssessment.query.filter_by(site_id=user.site_id).first()
+            site_assessment = (
+                site_assessment_tree_query().filter_by(site_id=principal.site_id).first()
+            )
         else:
             return (
                 jsonify({"error": "No SiteAssessment found and no site associated with user."}),
                 404,
             )
 
-    response = serialize_site_assessment(site_assessment)
-    return jsonify(response)
+    catalog = get_assessment_catalog(site_assessment.assessment_id)
+    return etag_response(
+        site_assessment_etag(site_assessment, catalog.version),
+        lambda: serialize_site_assessment(site_assessment, catalog),
+    )
 
 
 @api_bp.route("/api/site-assessment/<int:site_assessment_id>", methods=["GET"])
+@use_read_engine
 def get_site_assessment_by_id(site_assessment_id):
     try:
-        user = get_current_user()
+        principal = get_current_principal()
     except JWTError as e:
         logging.error(f"JWT Error: {e}")
         return jsonify({"error": str(e)}), 401
 
-    site_assessment = SiteAssessment.query.filter_by(
-        id=site_assessment_id, site_id=user.site_id
-    ).first()
+    site_assessment = (
+        site_assessment_tree_query()
+        .filter_by(id=site_assessment_id, site_id=principal.site_id)
+        .first()
+    )
     if not site_assessment:
         return jsonify({"error": "SiteAssessment not found"}), 404
 
-    response = serialize_site_assessment(site_assessment)
-    return jsonify(response)
+    catalog = get_assessment_catalog(site_assessment.assessment_id)
+    return etag_response(
+        site_assessment_etag(site_assessment, catalog.version),
+        lambda: serialize_site_assessment(site_assessment, catalog),
+    )
 
 
 @api_bp.route(
@@ -120,102 +200,66 @@ def get_site_assessment_by_id(site_assessment_id):
 def save_site_page(site_assessment_id, site_page_id):
     """Save a SitePage with validation, but do not require mandatory questions."""
     logging.info(f"Saving SitePage {site_page_id} for assessment {site_assessment_id}")
-    data = request.get_json()
-
-    site_page = db.session.get(SitePage, site_page_id)
-    site_assessment = db.session.get(SiteAssessment, site_assessment_id)
-    page = db.session.get(Page, site_page.page_id)
-    if not site_page:
-        logging.error(f"SitePage {site_page_id} not found")
-        return jsonify({"error": "SitePage not found"}), 404
-
-    responses_data = data.get("responses", [])
-    validation_errors = validate_responses(responses_data)
-    if validation_errors:
-        logging.error(f"Validation errors: {validation_errors}")
-        return jsonify({"errors": validation_errors}), 400
-
-    # Update progress
-    if data.get("confirmed"):
-        site_page.progress = "COMPLETE"
-        unlock_remaining_pages(site_assessment_id)
-    else:
-        if site_page.required:
-            site_page.progress = "STARTEDREQUIRED"
-        else:
-            site_page.progress = "STARTEDOPTIONAL"
-    db.session.commit()
-
-    if page.is_profile_page:
-        update_from_profile_page(page, site_assessment, responses_data)
-
-    # Save or update responses
-    for response in responses_data:
-        question_id = response.get("questionId")
-        value = response.get("value")
-
-        if question_id is None:
-            continue  # skip incomplete response
-
-        existing = QuestionResponse.query.filter_by(
-            site_page_id=site_page.id, question_id=question_id
-        ).first()
-
-        if existing:
-            existing.value = value
-        else:
-            db.session.add(
-                QuestionResponse(site_page_id=site_page.id, question_id=question_id, value=value)
-            )
-
-        logging.info(f"Saved: Question {question_id} -> {value}")
-
-    db.session.commit()
+    try:
+        principal = get_current_principal()
+    except JWTError as e:
+        logging.error(f"JWT Error: {e}")
+        return jsonify({"error": str(e)}), 401
 
-    return jsonify(
-        {
-            "message": (
-                "SitePage completed successfully"
-                if data.get("confirmed")
-                else "SitePage saved successfully"
-            )
-        }
-    )
+    data = request.get_json()
+    try:
+        body, status = perform_write(
+            saves.save_site_page,
+            principal.site_id,
+            site_assessment_id,
+            site_page_id,
+            data.get("responses", []),
+            bool(data.get("confirmed")),
+        )
+    except WriteBusyError as e:
+        return busy_response(e)
+    return jsonify(body), status
 
 
 @api_bp.route(
     "/api/site-assessment/<int:site_assessment_id>/site-page/<int:site_page_id>", methods=["GET"]
 )
+@use_read_engine
 def get_assessment_page(site_assessment_id, site_page_id):
     try:
-        user = get_current_user()
+        principal = get_current_principal()
     except JWTError as e:
         logging.error(f"JWT Error: {e}")
         return jsonify({"error": str(e)}), 401
 
     # Look up the SitePage
-    site_page = SitePage.query.get(site_page_id)
-    if not site_page:
+    site_page = db.session.get(
+        SitePage, site_page_id, options=[joinedload(SitePage.site_assessment)]
+    )
+    if not site_page or site_page.site_assessment_id != site_assessment_id:
         return jsonify({"error": "SitePage not found"}), 404
 
-    page = Page.query.get(site_page.page_id)
+    site_assessment = site_page.site_assessment
+    if site_assessment.site_id != principal.site_id:
+        return jsonify({"error": "SitePage belongs to another site"}), 403
+    catalog = get_assessment_catalog(site_assessment.assessment_id)
+    page = catalog.pages_by_id[site_page.page_id]
 
-    responses = []
-    if site_page:
+    def build():
         responses = [serialize_question_response(r) for r in site_page.responses]
-
-    questions = [serialize_question(q) for q in page.questions]
-    site = Site.query.get(user.site_id)
-
-    return jsonify(
-        {
+        site = db.session.get(Site, principal.site_id)
+        return {
             "title": page.title,
-            "questions": questions,
+            "questions": page.serialized["questions"],
             "responses": responses,
             "isConfirmationPage": page.is_confirmation_page,
             "site": serialize_site(site),
         }
+
+    etag = f"site-page-{site_page.id}-{principal.site_id}-" + site_assessment_etag(
+        site_assessment, catalog.version
     )
+    return etag_response(etag, build)
 
 
 @api_bp.route("/api/register", methods=["POST"])
@@ -243,6 +287,12 @@ def register():
     if existing_user:
         return jsonify({"error": "User with this email already exists."}), 409
 
+    # hash before writing anything, so a busy hashing pool leaves no orphaned organization
+    try:
+        hashed_password = password_hasher.hash(password)
+    except HashingBusyError as e:
+        return busy_response(e)
+
     try:
         org = Organization(name=org_name)
         db.session.add(org)
@@ -250,11 +300,7 @@ def register():
         org = Organization.query.filter_by(name=org_name).first()
         update_org_and_responses(org, org_name)
 
-        # Hash the password before storing it
-        hashed_password = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
-        new_user = User(
-            email=email, hashed_password=hashed_password.decode("utf-8"), organization_id=org.id
-        )
+        new_user = User(email=email, hashed_password=hashed_password, organization_id=org.id)
         db.session.add(new_user)
         db.session.commit()
 
@@ -274,74 +320,48 @@ def register():
 
 
 @api_bp.route("/api/site-assessment/<int:site_assessment_id>/summary", methods=["GET"])
+@use_read_engine
 def get_site_assessment_summary(site_assessment_id):
-    site_assessment = SiteAssessment.query.get(site_assessment_id)
-    # set the site assessment to complete
+    """Summary and carousel of an assessment. A pure read: confirming is a separate POST."""
+    try:
+        principal = get_current_principal()
+    except JWTError as e:
+        logging.error(f"JWT Error: {e}")
+        return jsonify({"error": str(e)}), 401
+
+    site_assessment, result = load_assessment_with_result(site_assessment_id)
+    if not site_assessment or site_assessment.site_id != principal.site_id:
+        return jsonify({"error": "SiteAssessment not found"}), 404
+
+    def build():
+        if result is not None:
+            return render_summary(result.data, site_assessment.site)
+        # assessments saved before results were materialized
+        return render_summary(build_result_data(site_assessment_id), site_assessment.site)
+
+    etag = "summary-" + site_assessment_etag(site_assessment, get_catalog_version())
+    return etag_response(etag, build)
+
+
+@api_bp.route("/api/site-assessment/<int:site_assessment_id>/confirm", methods=["POST"])
+def confirm_site_assessment(site_assessment_id):
+    try:
+        principal = get_current_principal()
+    except JWTError as e:
+        logging.error(f"JWT Error: {e}")
+        return jsonify({"error": str(e)}), 401
 
+    site_assessment = SiteAssessment.query.filter_by(
+        id=site_assessment_id, site_id=principal.site_id
+    ).first()
     if not site_assessment:
         return jsonify({"error": "SiteAssessment not found"}), 404
-    if site_assessment:
+
+    if not site_assessment.confirmed:
         site_assessment.confirmed = True
+        bump_site_assessment_revisions(SiteAssessment.id == site_assessment_id)
         db.session.commit()
-    summary = []
-    top_needs = []
-    cards = []
-    for site_page in site_assessment.site_pages:
-        page = Page.query.get(site_page.page_id)
-        questions_data = []
-        for response in site_page.responses:
-            if not response.value or len(str(response.value)) == 0:
-                continue
-            question = Question.query.get(response.question_id)
-            value = response.value
-            str_value = str(response.value)
-            if str_value[-1] == "|":
-                value = value[:-1]
-            if str_value == "true":
-                value = "Yes"
-            if str_value == "false":
-                value = "No"
-
-            if "need" in question.text.lower():
-                top_needs.append(str_value)
-                if type(value) == list:
-                    str_value = ", ".join(value)
-
-                cards.append(
-                    {
-                        "title": f"{site_assessment.site.name} needs {page.title} items",
-                        "highlight": str_value,
-                        "subtext": question.subtext if question.subtext else "",
-                        "backgroundColor": "#082B76",
-                    }
-                )
-
-            questions_data.append(
-                {
-                    "questionId": question.id,
-                    "questionText": question.text,
-                    "responseValue": value,
-                }
-            )
-        if questions_data:
-            summary.append(
-                {
-                    "sitePageId": site_page.id,
-                    "sitePageTitle": page.title,
-                    "responses": questions_data,
-                }
-            )
-
-    return jsonify(
-        {
-            "summary": summary,
-            "carousel": {
-                "organizationName": site_assessment.site.name,
-                "peopleServed": site_assessment.site.people_served,
-                "cards": cards,
-            },
-        }
-    )
+    return jsonify({"message": "SiteAssessment confirmed", "confirmed": True})
 
 
 @api_bp.route("/api/check-email", methods=["POST"])
@@ -367,82 +387,111 @@ def get_current_user_profile():
 
 
 @api_bp.route("/api/organization/questions", methods=["GET"])
+@use_read_engine
 def get_org_questions():
-    qs = OrganizationQuestion.query.order_by(OrganizationQuestion.order).all()
-    return jsonify([serialize_question(q) for q in qs]), 200
+    profile = get_profile_catalog()
+    return etag_response(
+        f"organization-questions-{profile.version}", lambda: list(profile.organization_questions)
+    )
 
 
 @api_bp.route("/api/organization/responses", methods=["GET"])
+@use_read_engine
 def get_org_responses():
-    user = get_current_user()
-    org_id = user.organization_id
+    try:
+        principal = get_current_principal()
+    except JWTError as e:
+        return jsonify({"error": str(e)}), 401
+    org_id = principal.organization_id
     resps = OrganizationQuestionResponse.query.filter_by(organization_id=org_id).all()
     return jsonify([serialize_question_response(r) for r in resps]), 200
 
 
 @api_bp.route("/api/organization/save", methods=["POST"])
 def save_org_responses():
-    user = get_current_user()
+    try:
+        user = get_current_user()
+    except JWTError as e:
+        return jsonify({"error": str(e)}), 401
     data = request.get_json() or {}
-    responses_data = data.get("responses", [])
-    org = create_or_update_org_from_responses(user, responses_data)
-
-    for resp in responses_data:
-        qid = resp.get("questionId")
-        val = resp.get("value")
-
-        if qid is None:
-            continue
-
-        existing = OrganizationQuestionResponse.query.filter_by(
-            organization_id=org.id, question_id=qid
-        ).first()
-
-        if existing:
-            existing.value = val
-        else:
-            db.session.add(
-                OrganizationQuestionResponse(organization_id=org.id, question_id=qid, value=val)
-            )
-
-    db.session.commit()
-    return jsonify({"message": "Organization data saved"}), 200
+    try:
+        body, status = perform_write(saves.save_org_profile, user.id, data.get("responses", []))
+    except WriteBusyError as e:
+        return busy_response(e)
+    return jsonify(body), status
 
 
 @api_bp.route("/api/site/questions", methods=["GET"])
+@use_read_engine
 def get_site_questions():
-    qs = SiteQuestion.query.order_by(SiteQuestion.order).all()
-    return jsonify([serialize_question(q) for q in qs]), 200
+    profile = get_profile_catalog()
+    return etag_response(f"site-questions-{profile.version}", lambda: list(profile.site_questions))
 
 
 @api_bp.route("/api/site/responses", methods=["GET"])
+@use_read_engine
 def get_site_responses():
-    user = get_current_user()
-    site_id = user.site_id
+    try:
+        principal = get_current_principal()
+    except JWTError as e:
+        return jsonify({"error": str(e)}), 401
+    site_id = principal.site_id
     resps = SiteQuestionResponse.query.filter_by(site_id=site_id).all()
     return jsonify([serialize_question_response(r) for r in resps]), 200
 
 
 @api_bp.route("/api/site/save", methods=["POST"])
 def save_site_responses():
-    user = get_current_user()
+    try:
+        user = get_current_user()
+    except JWTError as e:
+        return jsonify({"error": str(e)}), 401
     data = request.get_json() or {}
-    responses_data = data.get("responses", [])
-    site = create_or_update_site_from_responses(user, responses_data)
-    site_id = site.id
-    for resp in responses_data:
-        qid = resp.get("questionId")
-        val = resp.get("value")
+    try:
+        body, status = perform_write(saves.save_site_profile, user.id, data.get("responses", []))
+    except WriteBusyError as e:
+        return busy_response(e)
+    return jsonify(body), status
 
-        if qid is None:
-            continue
 
-        existing = SiteQuestionResponse.query.filter_by(site_id=site_id, question_id=qid).first()
+@api_bp.route("/api/admin/analytics/needs", methods=["GET"])
+def get_needs_analytics():
+    """Needs aggregated across every site for a season (defaults to the current one)."""
+    try:
+        get_current_admin()
+    except JWTError as e:
+        return jsonify({"error": str(e)}), 401
+    except AdminRequiredError as e:
+        return jsonify({"error": str(e)}), 403
 
-        if existing:
-            existing.value = val
-        else:
-            db.session.add(SiteQuestionResponse(site_id=site_id, question_id=qid, value=val))
+    # pandas is only imported once analytics are asked for
+    from backend.logic.analytics import compute_needs_analytics
+
+    year = request.args.get("year", datetime.now(UTC).year, type=int)
+    season = request.args.get("season", get_current_season())
+    return jsonify(compute_needs_analytics(year, season)), 200
 
-    db.session.commit()
-    return jsonify({"message": "Organization data saved"}), 200
+
+@api_bp.route("/api/admin/export/season", methods=["GET"])
+def export_season():
+    """Download a season's sites, organizations and answers as NDJSON or CSV."""
+    try:
+        get_current_admin()
+    except JWTError as e:
+        return jsonify({"error": str(e)}), 401
+    except AdminRequiredError as e:
+        return jsonify({"error": str(e)}), 403
+
+    year = request.args.get("year", datetime.now(UTC).year, type=int)
+    season = request.args.get("season", get_current_season())
+    export_format = request.args.get("format", "ndjson")
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": f"format must be one of {sorted(EXPORT_FORMATS)}"}), 400
+
+    chunks = iter_season_export(year, season, export_format)
+    filename = f"{season.lower()}-{year}.{export_format}"
+    return Response(
+        stream_with_context(chunks),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
@@ -11,7 +11,6 @@ from backend.models import (
     Site,
     Organization,
 )
-from sqlalchemy.orm import joinedload
 
 
 def serialize_question(q: Question) -> dict:
@@ -55,9 +54,8 @@ def serialize_user(user: User) -> dict:
     }
 
 
-def serialize_site_page(site_page: SitePage) -> dict:
-    page = Page.query.options(joinedload(Page.questions)).filter_by(id=site_page.page_id).first()
-    site = Site.query.filter_by(id=site_page.site_assessment.site_id).first()
+def serialize_site_page(site_page: SitePage, page: dict, site: dict) -> dict:
+    """Serialize a SitePage given its already serialized catalog page and site."""
     return {
         "id": site_page.id,
         "pageId": site_page.page_id,
@@ -65,19 +63,20 @@ def serialize_site_page(site_page: SitePage) -> dict:
         "required": site_page.required,
         "state": site_page.state,
         "siteAssessmentId": site_page.site_assessment_id,
-        "page": {
-            "id": page.id,
-            "title": page.title,
-            "questions": [serialize_question(q) for q in page.questions],
-        },
+        "page": page,
         "isConfirmationPage": site_page.is_confirmation_page,
-        "site": serialize_site(site),
+        "site": site,
     }
 
 
-def serialize_site_assessment(assessment: SiteAssessment) -> dict:
-    site = Site.query.filter_by(id=assessment.site_id).first()
-    serialized_site_pages = [serialize_site_page(sp) for sp in assessment.site_pages]
+def serialize_site_assessment(assessment: SiteAssessment, catalog) -> dict:
+    """Serialize a SiteAssessment; ``catalog`` is the AssessmentCatalog of its assessment."""
+    site = serialize_site(assessment.site)
+    serialized_site_pages = [
+        serialize_site_page(sp, catalog.pages_by_id[sp.page_id].serialized, site)
+        for sp in assessment.site_pages
+        if not catalog.pages_by_id[sp.page_id].retired
+    ]
     return {
         "id": assessment.id,
         "siteId": assessment.site_id,
@@ -85,7 +84,14 @@ def serialize_site_assessment(assessment: SiteAssessment) -> dict:
         "createdAt": assessment.created_at.isoformat(),
         "sitePages": serialized_site_pages,
         "confirmed": assessment.confirmed,
-        "site": serialize_site(site),
+        "site": site,
+        "pageCounts": {
+            "pagesLocked": assessment.pages_locked,
+            "requiredRemaining": assessment.required_remaining,
+            "optionalStarted": assessment.optional_started,
+            "pagesComplete": assessment.pages_complete,
+        },
+        "readyToConfirm": assessment.ready_to_confirm,
     }
 
 
@@ -1,30 +1,89 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+
 import pytest
-from backend.app import app
-from backend.models import db, User
-from backend.seed import seed_database
+from sqlalchemy import event
+
+from backend.app import create_app
+from backend.catalog import bump_catalog_version
+from backend.models import db, SiteAssessment, User
+from backend.seed import seed_current_season
 from backend.utils.import_data import load_seed_data
 from backend.utils.jwt_utils import generate_jwt_payload
+from backend.utils.principals import principal_cache
 
 
-@pytest.fixture
-def client():
-    app.config["TESTING"] = True
-    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
-    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {"connect_args": {"check_same_thread": False}}
+def _seed_fresh_database():
+    db.drop_all()
+    db.create_all()
+    load_seed_data(db)
+    # the seed file holds an earlier season; share its template with today's
+    seed_current_season()
+
+
+def _driver_connection(connection):
+    return connection.connection.driver_connection
+
+
+@pytest.fixture(scope="session")
+def app():
+    # an in-memory database unless TEST_DATABASE_URL points somewhere else
+    return create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": os.environ.get("TEST_DATABASE_URL", "sqlite://"),
+            # the cheapest bcrypt cost keeps register/login tests fast
+            "PASSWORD_HASH_ROUNDS": 4,
+            "PASSWORD_HASH_WORKERS": 1,
+        }
+    )
 
+
+@pytest.fixture(scope="session")
+def seeded_database(app):
+    """The schema plus test_seed.json, built once per test session.
+
+    On SQLite the seeded database is kept in a separate in-memory connection and
+    copied into the app's database before each test with the SQLite backup API.
+    Other databases are reseeded for every test; this fixture yields None for them.
+    """
     with app.app_context():
-        db.drop_all()
-        db.create_all()
-        load_seed_data(db)
+        if db.engine.dialect.name != "sqlite":
+            yield None
+            return
+        _seed_fresh_database()
+        db.session.remove()
+        snapshot = sqlite3.connect(":memory:", check_same_thread=False)
+        with db.engine.connect() as connection:
+            _driver_connection(connection).backup(snapshot)
+    yield snapshot
+    snapshot.close()
+
+
+@pytest.fixture
+def client(app, seeded_database):
+    with app.app_context():
+        if seeded_database is None:
+            _seed_fresh_database()
+        else:
+            db.session.remove()
+            with db.engine.connect() as connection:
+                seeded_database.backup(_driver_connection(connection))
+            # the catalog cache may hold definitions of the previous test's database
+            bump_catalog_version()
+            db.session.commit()
+        # principals cached by the previous test may point at sites it created
+        principal_cache.clear()
 
         with app.test_client() as client:
             yield client
 
-        db.drop_all()
+        db.session.remove()
 
 
 @pytest.fixture
-def auth_header():
+def auth_header(app):
     """Fixture to generate an Authorization header with a valid JWT token."""
     with app.app_context():
         user = User.query.filter_by(email="testuser@example.com").first()
@@ -32,3 +91,39 @@ def auth_header():
             pytest.skip("No user exists for testing JWT")
         token = generate_jwt_payload(user)
         return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def load_site_assessment(client, auth_header):
+    """Fixture returning a function that loads the test user's SiteAssessment.
+
+    The first GET /api/site-assessment creates it. Call the function inside the test's
+    app context, so the assessment belongs to the session the test uses.
+    """
+
+    def _load_site_assessment():
+        client.get("/api/site-assessment", headers=auth_header)
+        user = User.query.filter_by(email="testuser@example.com").first()
+        return SiteAssessment.query.filter_by(site_id=user.site_id).first()
+
+    return _load_site_assessment
+
+
+@pytest.fixture
+def count_queries():
+    """Fixture returning a context manager that records every SQL statement executed."""
+
+    @contextmanager
+    def _count_queries():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+    return _count_queries
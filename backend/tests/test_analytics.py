@@ -0,0 +1,109 @@
+import json
+
+from backend.commands import needs_analytics_command
+from backend.models import (
+    db,
+    Assessment,
+    OrganizationQuestion,
+    OrganizationQuestionResponse,
+    Site,
+)
+
+
+def _answer_needs(client, auth_header, site_assessment):
+    """Save two needs on the first needs page of the test user's assessment."""
+    site_page, question = next(
+        (sp, q)
+        for sp in site_assessment.site_pages
+        for q in sp.page.questions
+        if "need" in q.text.lower() and q.question_type == "MultiSelect"
+    )
+    value = question.options[:2]
+    client.post(
+        f"/api/site-assessment/{site_assessment.id}/site-page/{site_page.id}/save",
+        json={"responses": [{"questionId": question.id, "value": value}]},
+        headers=auth_header,
+    )
+
+    region = OrganizationQuestion(
+        text="What region do you operate in?",
+        question_type="MultiSelectWithOther",
+        order=1,
+        slug="orgregion",
+    )
+    db.session.add(region)
+    db.session.flush()
+    site = db.session.get(Site, site_assessment.site_id)
+    db.session.add(
+        OrganizationQuestionResponse(
+            organization_id=site.organization_id, question_id=region.id, value=["North"]
+        )
+    )
+    db.session.commit()
+    return site_assessment, site_page, value
+
+
+def test_needs_analytics_endpoint(app, client, auth_header, load_site_assessment):
+    with app.app_context():
+        site_assessment, site_page, value = _answer_needs(
+            client, auth_header, load_site_assessment()
+        )
+        assessment = db.session.get(Assessment, site_assessment.assessment_id)
+        url = f"/api/admin/analytics/needs?year={assessment.year}&season={assessment.season}"
+
+        app.config["ADMIN_EMAILS"] = []
+        assert client.get(url, headers=auth_header).status_code == 403
+
+        app.config["ADMIN_EMAILS"] = ["testuser@example.com"]
+        try:
+            response = client.get(url, headers=auth_header)
+        finally:
+            app.config["ADMIN_EMAILS"] = []
+        assert response.status_code == 200
+
+        data = response.json
+        category = site_page.page.title
+        assert data["respondingSites"] == 1
+        assert sorted(i["item"] for i in data["items"]) == sorted(value)
+        assert all(i["sites"] == 1 and i["category"] == category for i in data["items"])
+        assert data["categories"] == [
+            {
+                "category": category,
+                "sites": 1,
+                "itemNeeds": len(value),
+                "peopleServed": site_assessment.site.people_served or 0,
+            }
+        ]
+        assert {(r["region"], r["category"]) for r in data["regions"]} == {("North", category)}
+
+
+def test_needs_analytics_of_an_empty_season(app, client, auth_header):
+    with app.app_context():
+        app.config["ADMIN_EMAILS"] = ["testuser@example.com"]
+        try:
+            data = client.get(
+                "/api/admin/analytics/needs?year=1999&season=Spring", headers=auth_header
+            ).json
+        finally:
+            app.config["ADMIN_EMAILS"] = []
+        assert data == {
+            "year": 1999,
+            "season": "Spring",
+            "respondingSites": 0,
+            "items": [],
+            "categories": [],
+            "regions": [],
+        }
+
+
+def test_needs_analytics_command(app, client, auth_header, load_site_assessment):
+    with app.app_context():
+        site_assessment, _, value = _answer_needs(client, auth_header, load_site_assessment())
+        assessment = db.session.get(Assessment, site_assessment.assessment_id)
+
+        result = app.test_cli_runner().invoke(
+            needs_analytics_command,
+            ["--year", str(assessment.year), "--season", assessment.season],
+        )
+        assert result.exit_code == 0, result.output
+        assert len(json.loads(result.output)["items"]) == len(value)
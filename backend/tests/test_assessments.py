@@ -1,11 +1,12 @@
-from backend.app import app
 from backend.models import Site, SiteAssessment
 
 
-def test_user_login_creates_assessment(client):
+def test_user_login_creates_assessment(app, client):
     """Ensure a new SiteAssessment is created when a user logs in and none exists for the current season."""
     with app.app_context():
-        response = client.post("/api/login", json={"email": "testuser@example.com"})
+        response = client.post(
+            "/api/login", json={"email": "testuser@example.com", "password": "password123"}
+        )
         assert response.status_code == 200
         assert response.json["message"] == "Login successful"
 
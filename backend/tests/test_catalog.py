@@ -0,0 +1,68 @@
+from backend.catalog import bump_catalog_version, catalog_stats, get_assessment_catalog
+from backend.models import db, Assessment, Page, Question
+
+
+def test_catalog_builds_with_one_query_and_then_serves_from_memory(app, client, count_queries):
+    with app.app_context():
+        assessment = Assessment.query.first()
+
+        with count_queries() as cold:
+            catalog = get_assessment_catalog(assessment.id)
+        with count_queries() as warm:
+            assert get_assessment_catalog(assessment.id) is catalog
+
+        assert len(cold) == 1
+        assert len(warm) == 0
+        assert [p.title for p in catalog.pages] == [
+            p.title for p in Page.query.filter_by(assessment_id=assessment.id).order_by(Page.order)
+        ]
+        assert set(catalog.questions) == {q.id for q in Question.query}
+
+
+def test_catalog_maps_and_links(app, client):
+    with app.app_context():
+        catalog = get_assessment_catalog(Assessment.query.first().id)
+        needs = catalog.by_text["Which of the following do you need over the next six months?"]
+
+        assert len(needs) > 1
+        for page in catalog.pages:
+            assert catalog.pages_by_title[page.title] is page
+            for question_id in page.question_ids:
+                parent_id = catalog.questions[question_id].parent_question_id
+                if parent_id:
+                    assert question_id in catalog.children[parent_id]
+
+
+def test_version_bump_replaces_catalog(app, client):
+    with app.app_context():
+        assessment = Assessment.query.first()
+        before = get_assessment_catalog(assessment.id)
+        rebuilds = catalog_stats()["rebuilds"]
+
+        question = Question.query.first()
+        question.text = "Changed text"
+        bump_catalog_version()
+        db.session.commit()
+
+        after = get_assessment_catalog(assessment.id)
+        assert after is not before
+        assert after.version == before.version + 1
+        assert after.questions[question.id].text == "Changed text"
+        assert catalog_stats()["rebuilds"] == rebuilds + 1
+
+
+def test_catalog_stats_endpoint(app, client, auth_header):
+    with app.app_context():
+        client.get("/api/organization/questions")
+        client.get("/api/organization/questions")
+
+        assert client.get("/api/catalog/stats").status_code == 401
+        assert client.get("/api/catalog/stats", headers=auth_header).status_code == 403
+        app.config["ADMIN_EMAILS"] = ["testuser@example.com"]
+        try:
+            stats = client.get("/api/catalog/stats", headers=auth_header).json
+        finally:
+            app.config["ADMIN_EMAILS"] = []
+        assert stats["hits"] >= 1
+        assert stats["misses"] >= 1
+        assert set(stats) == {"version", "assessments", "hits", "misses", "rebuilds"}
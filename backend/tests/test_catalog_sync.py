@@ -0,0 +1,168 @@
+import csv
+import json
+
+from backend.catalog import get_assessment_catalog
+from backend.commands import sync_catalog_command
+from backend.models import (
+    db,
+    Assessment,
+    Page,
+    Question,
+    QuestionResponse,
+    Site,
+    SitePage,
+    SiteQuestion,
+)
+from backend.seed import sync_catalog_from_csv
+from backend.utils.utils import create_site_assessment
+
+QUESTIONS_CSV = "data/questions.csv"
+OPTIONS_JSON = "data/response_options.json"
+
+
+def _edited_csv(tmp_path):
+    """questions.csv with one question dropped, one reworded and one added."""
+    with open(QUESTIONS_CSV, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    fields = list(rows[0].keys())
+    rows = [r for r in rows if r["ItemText"] != "How often do you support the same individuals?"]
+    for row in rows:
+        if row["Slug"] == "sitenumserved":
+            row["ItemText"] = "How many people do you support each month?"
+    rows.append({**rows[-1], "ItemText": "Anything else we should know?", "Type": "Long Response"})
+
+    path = tmp_path / "questions.csv"
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+    return str(path)
+
+
+def test_new_season_reuses_the_template(app, client):
+    with app.app_context():
+        first, _ = sync_catalog_from_csv(2098, "Spring")
+        template_id = first.template_id or first.id
+        pages = Page.query.count()
+        questions = Question.query.count()
+
+        assessment, diff = sync_catalog_from_csv(2099, "Spring")
+        assert diff.is_empty()
+        assert assessment.template_id == template_id
+        assert Page.query.count() == pages and Question.query.count() == questions
+
+        catalog = get_assessment_catalog(assessment.id)
+        assert [p.id for p in catalog.pages] == [
+            p.id for p in get_assessment_catalog(first.id).pages
+        ]
+
+
+def test_sync_applies_only_the_changes(app, client, tmp_path):
+    with app.app_context():
+        assessment, _ = sync_catalog_from_csv(2098, "Spring")
+        filepath = _edited_csv(tmp_path)
+
+        _, preview = sync_catalog_from_csv(2098, "Spring", filepath, dry_run=True)
+        assert not preview.is_empty()
+        assert Question.query.filter_by(retired=True).count() == 0
+
+        _, diff = sync_catalog_from_csv(2098, "Spring", filepath)
+        assert diff.counts()["question"] == {"inserted": 1, "updated": 0, "retired": 1}
+        assert diff.counts()["site_question"] == {"inserted": 0, "updated": 1, "retired": 0}
+        # the dropped question was the first of its page, so the page order moves too
+        assert diff.counts()["page"] == {"inserted": 0, "updated": 1, "retired": 0}
+
+        retired = Question.query.filter_by(retired=True).one()
+        assert retired.text == "How often do you support the same individuals?"
+        catalog = get_assessment_catalog(assessment.id)
+        # still resolvable for earlier answers, but no page offers it
+        assert retired.id in catalog.questions
+        assert all(retired.id not in page.question_ids for page in catalog.pages)
+        assert any(q.text == "Anything else we should know?" for q in catalog.questions.values())
+        people_served = SiteQuestion.query.filter_by(slug="sitenumserved").one()
+        assert people_served.text == "How many people do you support each month?"
+
+        # syncing the original CSV again brings the retired question back
+        _, diff = sync_catalog_from_csv(2098, "Spring")
+        assert diff.counts()["question"] == {"inserted": 0, "updated": 1, "retired": 1}
+        assert db.session.get(Question, retired.id).retired is False
+
+
+def test_sync_catalog_command(app, client):
+    with app.app_context():
+        runner = app.test_cli_runner()
+        result = runner.invoke(sync_catalog_command, ["--year", "2098", "--season", "Fall"])
+        assert result.exit_code == 0, result.output
+        assert Assessment.query.filter_by(year=2098, season="Fall").one()
+
+        result = runner.invoke(
+            sync_catalog_command, ["--year", "2098", "--season", "Fall", "--dry-run"]
+        )
+        assert "question: 0 inserted, 0 updated, 0 retired" in result.output
+
+
+def _definitions(assessment_id):
+    catalog = get_assessment_catalog(assessment_id)
+    # the live questions; retired ones stay in catalog.questions for earlier answers
+    return {
+        (qid, catalog.questions[qid].text) for page in catalog.pages for qid in page.question_ids
+    }
+
+
+def test_changes_never_reach_other_seasons_on_the_template(app, client, tmp_path):
+    with app.app_context():
+        spring, _ = sync_catalog_from_csv(2090, "Spring")
+        fall, _ = sync_catalog_from_csv(2090, "Fall")
+        template_id = spring.template_id
+        assert fall.template_id == template_id
+        before = _definitions(template_id)
+
+        site_assessment = create_site_assessment(Site.query.first().id, fall.id)
+        site_page = next(
+            sp
+            for sp in site_assessment.site_pages
+            if any(
+                q.text == "How often do you support the same individuals?"
+                for q in sp.page.questions
+            )
+        )
+        question = next(
+            q
+            for q in site_page.page.questions
+            if q.text == "How often do you support the same individuals?"
+        )
+        db.session.add(
+            QuestionResponse(site_page_id=site_page.id, question_id=question.id, value="x")
+        )
+        db.session.commit()
+
+        # editing Fall copies the template instead of changing it
+        filepath = _edited_csv(tmp_path)
+        _, diff = sync_catalog_from_csv(2090, "Fall", filepath)
+        assert diff.counts()["question"] == {"inserted": 1, "updated": 0, "retired": 1}
+        assert fall.template_id is None
+        assert spring.template_id == template_id
+        assert _definitions(template_id) == before
+        assert not Question.query.filter(
+            Question.page_id.in_(p.id for p in get_assessment_catalog(template_id).pages),
+            Question.retired.is_(True),
+        ).count()
+
+        # Fall's site pages and answers moved to its copy, and kept the retired question
+        fall_pages = {p.id for p in get_assessment_catalog(fall.id).pages}
+        assert {
+            sp.page_id for sp in SitePage.query.filter_by(site_assessment_id=site_assessment.id)
+        } <= fall_pages
+        answer = QuestionResponse.query.filter_by(site_page_id=site_page.id).one()
+        copied = db.session.get(Question, answer.question_id)
+        assert copied.id != question.id and copied.text == question.text and copied.retired
+
+        # a season that is itself shared hands the old questions to the seasons sharing it
+        later, _ = sync_catalog_from_csv(2091, "Spring", filepath)
+        assert later.template_id == fall.id
+        edited = _definitions(fall.id)
+        sync_catalog_from_csv(2090, "Fall")
+        assert later.template_id is None
+        assert {text for _, text in _definitions(later.id)} == {text for _, text in edited}
+        assert "Anything else we should know?" not in {text for _, text in _definitions(fall.id)}
+        sync_catalog_from_csv(2091, "Spring")
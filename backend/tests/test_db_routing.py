@@ -0,0 +1,109 @@
+"""Read routing with two SQLite connections to one WAL database file."""
+
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+
+from backend.app import create_app
+from backend.models import db, User
+from backend.seed import seed_current_season
+from backend.utils.db_routing import get_read_engine
+from backend.utils.import_data import load_seed_data
+from backend.utils.jwt_utils import generate_jwt_payload
+
+
+@pytest.fixture
+def routed_app(tmp_path):
+    path = tmp_path / "primary.db"
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+            "SQLALCHEMY_READ_DATABASE_URI": f"sqlite:///file:{path}?mode=ro&uri=true",
+            "PASSWORD_HASH_ROUNDS": 4,
+            "PASSWORD_HASH_WORKERS": 1,
+        }
+    )
+    with app.app_context():
+        db.create_all()
+        load_seed_data(db)
+        seed_current_season()
+        user = User.query.filter_by(email="testuser@example.com").first()
+        app.config["TEST_AUTH"] = {"Authorization": f"Bearer {generate_jwt_payload(user)}"}
+        db.session.remove()
+    yield app
+    with app.app_context():
+        get_read_engine().dispose()
+        db.engine.dispose()
+
+
+@contextmanager
+def statements_by_engine():
+    seen = {"primary": [], "read": []}
+    listeners = []
+    for engine, name in ((db.engine, "primary"), (get_read_engine(), "read")):
+
+        def record(conn, cursor, statement, *args, _name=name):
+            seen[_name].append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        listeners.append((engine, record))
+    try:
+        yield seen
+    finally:
+        for engine, record in listeners:
+            event.remove(engine, "before_cursor_execute", record)
+
+
+def _writes(statements):
+    return [s for s in statements if s.split()[0] in ("INSERT", "UPDATE", "DELETE")]
+
+
+def test_read_engine_cannot_write(routed_app):
+    with routed_app.app_context():
+        with pytest.raises(OperationalError, match="readonly"):
+            with get_read_engine().begin() as connection:
+                connection.execute(text("UPDATE site SET people_served = 1"))
+
+
+def test_get_endpoints_read_from_the_read_engine(routed_app):
+    client = routed_app.test_client()
+    headers = routed_app.config["TEST_AUTH"]
+    with routed_app.app_context():
+        client.get("/api/site-assessment", headers=headers)
+        with statements_by_engine() as seen:
+            for url in ("/api/site-assessment", "/api/site/responses", "/api/site/questions"):
+                assert client.get(url, headers=headers).status_code == 200
+    assert seen["read"]
+    assert seen["primary"] == []
+
+
+def test_request_reads_its_own_writes(routed_app):
+    client = routed_app.test_client()
+    headers = routed_app.config["TEST_AUTH"]
+    with routed_app.app_context():
+        # the first GET creates the site assessment, then serializes it
+        with statements_by_engine() as seen:
+            response = client.get("/api/site-assessment", headers=headers)
+    assert response.status_code == 200
+    assert response.json["sitePages"]
+    assert not _writes(seen["read"])
+    assert _writes(seen["primary"])
+    # the assessment is read back from the primary after it was written
+    last_write = max(i for i, s in enumerate(seen["primary"]) if s in _writes(seen["primary"]))
+    assert any(s.startswith("SELECT") for s in seen["primary"][last_write:])
+
+
+def test_saves_stay_on_the_primary(routed_app):
+    client = routed_app.test_client()
+    headers = routed_app.config["TEST_AUTH"]
+    with routed_app.app_context():
+        assessment = client.get("/api/site-assessment", headers=headers).json
+        site_page = assessment["sitePages"][0]
+        url = f"/api/site-assessment/{assessment['id']}/site-page/{site_page['id']}/save"
+        with statements_by_engine() as seen:
+            assert client.post(url, json={"responses": []}, headers=headers).status_code == 200
+    assert seen["read"] == []
+    assert _writes(seen["primary"])
@@ -0,0 +1,54 @@
+import pytest
+from sqlalchemy import text
+
+from backend.app import create_app, default_config
+from backend.models import db
+from backend.utils.engine_profiles import engine_options, resolve_profile
+
+
+def _config(**overrides):
+    return {**default_config(), **overrides}
+
+
+def test_auto_profile_follows_the_database_url():
+    assert resolve_profile(_config(SQLALCHEMY_DATABASE_URI="sqlite:///x.db")) == "sqlite"
+    assert resolve_profile(_config(SQLALCHEMY_DATABASE_URI="postgresql://db/app")) == "server"
+    with pytest.raises(ValueError):
+        resolve_profile(_config(DB_ENGINE_PROFILE="turbo"))
+
+
+def test_server_profile_sizes_the_pool():
+    options = engine_options(
+        _config(SQLALCHEMY_DATABASE_URI="postgresql://db/app", DB_POOL_SIZE=5, DB_MAX_OVERFLOW=2)
+    )
+    assert options == {
+        "pool_size": 5,
+        "max_overflow": 2,
+        "pool_pre_ping": True,
+        "pool_recycle": 1800,
+    }
+    assert engine_options(_config(DB_ENGINE_PROFILE="default")) == {}
+
+
+@pytest.mark.parametrize("profile, journal_mode", [("sqlite", "wal"), ("default", "delete")])
+def test_sqlite_profile_sets_pragmas_on_connect(tmp_path, profile, journal_mode):
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'app.db'}",
+            "DB_ENGINE_PROFILE": profile,
+            "PASSWORD_HASH_ROUNDS": 4,
+            "PASSWORD_HASH_WORKERS": 1,
+        }
+    )
+    with app.app_context():
+        with db.engine.connect() as connection:
+
+            def pragma(name):
+                return connection.execute(text(f"PRAGMA {name}")).scalar()
+
+            assert pragma("journal_mode") == journal_mode
+            if profile == "sqlite":
+                assert pragma("synchronous") == 1  # NORMAL
+                assert pragma("busy_timeout") == app.config["SQLITE_BUSY_TIMEOUT_MS"]
+                assert pragma("cache_size") == -app.config["SQLITE_CACHE_SIZE_KB"]
+        db.engine.dispose()
@@ -0,0 +1,45 @@
+from backend.models import SitePage
+
+
+def _site_page(site_assessment):
+    return SitePage.query.filter_by(site_assessment_id=site_assessment.id).first()
+
+
+def test_site_assessment_not_modified_until_saved(app, client, auth_header, load_site_assessment):
+    with app.app_context():
+        site_page = _site_page(load_site_assessment())
+
+        first = client.get("/api/site-assessment", headers=auth_header)
+        etag = first.headers["ETag"]
+        cached = client.get("/api/site-assessment", headers={**auth_header, "If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.data == b""
+
+        client.post(
+            f"/api/site-assessment/{site_page.site_assessment_id}/site-page/{site_page.id}/save",
+            json={"responses": []},
+            headers=auth_header,
+        )
+        changed = client.get("/api/site-assessment", headers={**auth_header, "If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["ETag"] != etag
+
+
+def test_site_page_get_honours_etag(app, client, auth_header, load_site_assessment):
+    with app.app_context():
+        site_page = _site_page(load_site_assessment())
+        url = f"/api/site-assessment/{site_page.site_assessment_id}/site-page/{site_page.id}"
+
+        etag = client.get(url, headers=auth_header).headers["ETag"]
+        cached = client.get(url, headers={**auth_header, "If-None-Match": etag})
+        assert cached.status_code == 304
+
+        by_id = f"/api/site-assessment/{site_page.site_assessment_id}"
+        assert client.get(by_id, headers=auth_header).headers["ETag"] != etag
+
+
+def test_question_listings_not_modified(app, client):
+    with app.app_context():
+        for url in ("/api/organization/questions", "/api/site/questions"):
+            etag = client.get(url).headers["ETag"]
+            assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
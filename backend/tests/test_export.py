@@ -0,0 +1,84 @@
+import csv
+import io
+import json
+
+from backend.commands import export_season_command
+from backend.models import db, Assessment
+
+
+def _answered_season(client, auth_header, site_assessment):
+    """Save one answer for the test user and return the season's (year, season, question)."""
+    site_page, question = next(
+        (sp, q)
+        for sp in site_assessment.site_pages
+        for q in sp.page.questions
+        if q.question_type == "MultiSelect"
+    )
+    client.post(
+        f"/api/site-assessment/{site_assessment.id}/site-page/{site_page.id}/save",
+        json={"responses": [{"questionId": question.id, "value": question.options[:1]}]},
+        headers=auth_header,
+    )
+    assessment = db.session.get(Assessment, site_assessment.assessment_id)
+    return assessment.year, assessment.season, question
+
+
+def test_season_export_streams_ndjson(app, client, auth_header, load_site_assessment):
+    with app.app_context():
+        year, season, question = _answered_season(client, auth_header, load_site_assessment())
+        url = f"/api/admin/export/season?year={year}&season={season}"
+
+        app.config["ADMIN_EMAILS"] = []
+        assert client.get(url, headers=auth_header).status_code == 403
+
+        app.config["ADMIN_EMAILS"] = ["testuser@example.com"]
+        try:
+            response = client.get(url, headers=auth_header)
+        finally:
+            app.config["ADMIN_EMAILS"] = []
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.mimetype == "application/x-ndjson"
+
+        records = [json.loads(line) for line in response.data.decode().splitlines()]
+        # the test seed has no organizations, so the export starts with the site
+        site = records[0]
+        assert site["record_type"] == "site"
+        answers = [r for r in records if r["record_type"] == "question_response"]
+        assert answers == [
+            {
+                "record_type": "question_response",
+                "site_id": site["site_id"],
+                "page_title": question.page.title,
+                "question_id": question.id,
+                "question_slug": question.slug,
+                "question_text": question.text,
+                "question_type": "MultiSelect",
+                "value": question.options[:1],
+            }
+        ]
+
+
+def test_season_export_rejects_unknown_format(app, client, auth_header):
+    with app.app_context():
+        app.config["ADMIN_EMAILS"] = ["testuser@example.com"]
+        try:
+            response = client.get("/api/admin/export/season?format=xml", headers=auth_header)
+        finally:
+            app.config["ADMIN_EMAILS"] = []
+        assert response.status_code == 400
+
+
+def test_export_season_command_writes_csv(app, client, auth_header, load_site_assessment):
+    with app.app_context():
+        year, season, question = _answered_season(client, auth_header, load_site_assessment())
+
+        result = app.test_cli_runner().invoke(
+            export_season_command, ["--year", str(year), "--season", season, "--format", "csv"]
+        )
+        assert result.exit_code == 0, result.output
+
+        rows = list(csv.DictReader(io.StringIO(result.output)))
+        answer = next(r for r in rows if r["record_type"] == "question_response")
+        assert answer["question_id"] == str(question.id)
+        assert json.loads(answer["value"]) == question.options[:1]
@@ -0,0 +1,115 @@
+"""Every hot lookup must be served by an index, and the migration must add them."""
+
+import pytest
+from flask_migrate import upgrade
+from sqlalchemy import inspect, select, text
+
+from backend.app import create_app
+from backend.models import (
+    db,
+    OrganizationQuestion,
+    OrganizationQuestionResponse,
+    Page,
+    Question,
+    QuestionResponse,
+    SiteAssessment,
+    SitePage,
+    SiteQuestion,
+    SiteQuestionResponse,
+)
+
+HOT_QUERIES = {
+    "question_response": select(QuestionResponse).where(
+        QuestionResponse.site_page_id == 1, QuestionResponse.question_id == 1
+    ),
+    "organization_responses": select(OrganizationQuestionResponse).where(
+        OrganizationQuestionResponse.organization_id == 1
+    ),
+    "site_responses": select(SiteQuestionResponse).where(SiteQuestionResponse.site_id == 1),
+    "site_assessment": select(SiteAssessment).where(
+        SiteAssessment.site_id == 1, SiteAssessment.assessment_id == 1
+    ),
+    "site_pages": select(SitePage).where(SitePage.site_assessment_id == 1),
+    "pages": select(Page).where(Page.assessment_id == 1).order_by(Page.order),
+    "questions": select(Question).where(Question.page_id == 1).order_by(Question.order),
+    "question_slug": select(Question).where(Question.slug == "x"),
+    "organization_question_slug": select(OrganizationQuestion).where(
+        OrganizationQuestion.slug == "orgname"
+    ),
+    "site_question_slug": select(SiteQuestion).where(SiteQuestion.slug == "sitename"),
+}
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_an_index(app, client, name):
+    with app.app_context():
+        if db.engine.dialect.name != "sqlite":
+            pytest.skip("EXPLAIN QUERY PLAN is SQLite specific")
+        sql = HOT_QUERIES[name].compile(db.engine, compile_kwargs={"literal_binds": True})
+        plan = [row.detail for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+    assert any("USING" in step and "INDEX" in step for step in plan), plan
+    assert not any(step.startswith("SCAN") and "INDEX" not in step for step in plan), plan
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+
+
+def test_migration_dedupes_and_adds_indexes(tmp_path):
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'old.db'}",
+            "PASSWORD_HASH_ROUNDS": 4,
+            "PASSWORD_HASH_WORKERS": 1,
+        }
+    )
+    with app.app_context():
+        db.create_all()
+        # a database from before the migration: no indexes, duplicate rows
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.drop(db.engine)
+        with db.engine.begin() as connection:
+            connection.execute(
+                text(
+                    "INSERT INTO site_question_response (id, site_id, question_id, value) VALUES "
+                    "(1, 1, 1, '\"old\"'), (2, 1, 1, '\"new\"'), (3, 1, 2, '\"other\"')"
+                )
+            )
+            connection.execute(
+                text(
+                    "INSERT INTO site_assessment (id, site_id, assessment_id, revision) "
+                    "VALUES (1, 1, 1, 0), (2, 1, 1, 0)"
+                )
+            )
+            connection.execute(
+                text(
+                    'INSERT INTO site_page (id, site_assessment_id, page_id, "order", title) '
+                    "VALUES (1, 1, 1, 1, 'Kept'), (2, 2, 1, 1, 'Dropped')"
+                )
+            )
+
+        upgrade()
+
+        with db.engine.connect() as connection:
+            responses = connection.execute(
+                text("SELECT id, value FROM site_question_response ORDER BY id")
+            ).all()
+            assessments = connection.execute(text("SELECT id FROM site_assessment")).scalars()
+            pages = connection.execute(text("SELECT id FROM site_page")).scalars().all()
+            assert [tuple(r) for r in responses] == [(2, '"new"'), (3, '"other"')]
+            assert list(assessments) == [1]
+            assert pages == [1]
+
+        indexes = {
+            index["name"]
+            for table in inspect(db.engine).get_table_names()
+            for index in inspect(db.engine).get_indexes(table)
+        }
+        expected = {index.name for table in db.metadata.sorted_tables for index in table.indexes}
+        assert expected <= indexes
+
+        # a database made by create_all already has them; the migration must skip them
+        with db.engine.begin() as connection:
+            connection.execute(text("DROP TABLE alembic_version"))
+        upgrade()
+        db.engine.dispose()
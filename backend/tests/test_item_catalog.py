@@ -0,0 +1,65 @@
+import json
+
+import pandas as pd
+
+from backend.commands import refresh_item_catalog_command
+from backend.models import Assessment, Question
+from backend.seed import seed_assessment_from_csv
+from backend.utils.item_catalog import load_item_catalog
+
+
+def test_snapshot_covers_every_needs_page():
+    catalog = load_item_catalog()
+    assert catalog.version >= 1
+    assert set(catalog.choices) == {
+        "Clothing",
+        "Food",
+        "Household",
+        "Hygeine",
+        "Infants and Children",
+        "Infrastructure",
+        "Shelter",
+    }
+    assert load_item_catalog() is catalog
+
+
+def test_seeding_never_reads_the_sheet(app, client, monkeypatch):
+    def no_network(*args, **kwargs):
+        raise AssertionError("seeding must not fetch the item catalog")
+
+    monkeypatch.setattr(pd, "read_csv", no_network)
+    with app.app_context():
+        seed_assessment_from_csv(1999, "Spring")
+        assessment = Assessment.query.filter_by(year=1999, season="Spring").one()
+        question = (
+            Question.query.join(Question.page)
+            .filter_by(assessment_id=assessment.id, title="Food")
+            .filter(Question.text.contains("six months"), Question.question_type == "MultiSelect")
+            .one()
+        )
+        assert question.options == list(load_item_catalog().choices["Food"]) + ["None"]
+
+
+def test_refresh_item_catalog_from_local_csv(app, tmp_path):
+    sheet = tmp_path / "sheet.csv"
+    sheet.write_text(
+        "Donations sheet,,\n"
+        "Category,Item,Include in Needs Assessment\n"
+        "Cooking, Pot ,TRUE\n"
+        "Food,Rice,TRUE\n"
+        "Food,Rice,TRUE\n"
+        "Health,Soap,FALSE\n"
+        "Unknown,Widget,TRUE\n"
+    )
+    output = tmp_path / "item_catalog.json"
+
+    runner = app.test_cli_runner()
+    for _ in range(2):
+        result = runner.invoke(refresh_item_catalog_command, [str(sheet), "--output", str(output)])
+        assert result.exit_code == 0, result.output
+
+    snapshot = json.loads(output.read_text())
+    assert snapshot["version"] == 2
+    assert snapshot["source"] == str(sheet)
+    assert snapshot["choices"] == {"Food": ["Pot", "Rice"]}
+    assert load_item_catalog(output).choices == {"Food": ("Pot", "Rice")}
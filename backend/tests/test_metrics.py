@@ -0,0 +1,71 @@
+import re
+
+from backend.utils.metrics import metrics
+
+
+def _samples(text, name):
+    """``{labels: value}`` of metric ``name`` in Prometheus text output."""
+    pattern = re.compile(rf"^{name}\{{(.*)\}} (\S+)$", re.MULTILINE)
+    return {labels: float(value) for labels, value in pattern.findall(text)}
+
+
+def test_metrics_count_requests_queries_and_bytes(app, client, auth_header):
+    metrics.clear()
+    first = client.get("/api/site-assessment", headers=auth_header)
+    second = client.get("/api/site-assessment", headers=auth_header)
+    client.get("/api/no-such-endpoint")
+    client.get("/api/status")
+
+    assert client.get("/api/metrics").status_code == 401
+    assert client.get("/api/metrics", headers=auth_header).status_code == 403
+    app.config["ADMIN_EMAILS"] = ["testuser@example.com"]
+    try:
+        response = client.get("/api/metrics", headers=auth_header)
+    finally:
+        app.config["ADMIN_EMAILS"] = []
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    text = response.get_data(as_text=True)
+
+    labels = 'endpoint="api.get_site_assessment",method="GET"'
+    assert _samples(text, "http_request_duration_seconds_count")[labels] == 2
+    assert _samples(text, "http_request_duration_seconds_bucket")[f'{labels},le="+Inf"'] == 2
+    assert _samples(text, "http_requests_total")[f'{labels},status="200"'] == 2
+    assert _samples(text, "db_queries_total")[labels] > 0
+    assert _samples(text, "db_query_duration_seconds_total")[labels] > 0
+    assert _samples(text, "http_response_bytes_total")[labels] == len(first.data) + len(second.data)
+    # the first request creates the site assessment; reads affect no rows
+    assert _samples(text, "db_rows_returned_total")[labels] > 0
+    assert _samples(text, "db_rows_returned_total")['endpoint="api.status",method="GET"'] == 0
+    assert _samples(text, "db_rows_affected_total")[labels] > 0
+    assert _samples(text, "db_rows_affected_total")['endpoint="api.status",method="GET"'] == 0
+    assert (
+        _samples(text, "http_requests_total")['endpoint="unmatched",method="GET",status="404"'] == 1
+    )
+
+
+def test_histogram_buckets_are_cumulative(app, client):
+    metrics.clear()
+    for _ in range(3):
+        client.get("/api/status")
+    text = metrics.render()
+    buckets = [
+        value
+        for labels, value in _samples(text, "http_request_duration_seconds_bucket").items()
+        if labels.startswith('endpoint="api.status"')
+    ]
+    assert buckets == sorted(buckets)
+    assert buckets[-1] == 3
+
+
+def test_server_timing_header_is_optional(app, client, auth_header):
+    response = client.get("/api/site-assessment", headers=auth_header)
+    assert "Server-Timing" not in response.headers
+
+    app.config["SERVER_TIMING_ENABLED"] = True
+    try:
+        response = client.get("/api/site-assessment", headers=auth_header)
+    finally:
+        app.config["SERVER_TIMING_ENABLED"] = False
+    timing = response.headers["Server-Timing"]
+    assert re.fullmatch(r'db;dur=[\d.]+;desc="\d+ queries", total;dur=[\d.]+', timing), timing
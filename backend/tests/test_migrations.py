@@ -0,0 +1,104 @@
+"""Migrations must bring a database from before a model change up to date."""
+
+from flask_migrate import downgrade, stamp, upgrade
+from sqlalchemy import inspect, text
+
+from backend.app import create_app
+from backend.models import db
+
+
+def _columns(table):
+    return {column["name"] for column in inspect(db.engine).get_columns(table)}
+
+
+def _old_database(tmp_path, revision):
+    """An app on a file database migrated down to ``revision``."""
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'old.db'}",
+            "PASSWORD_HASH_ROUNDS": 4,
+            "PASSWORD_HASH_WORKERS": 1,
+        }
+    )
+    with app.app_context():
+        db.create_all()
+        stamp()
+        downgrade(revision=revision)
+    return app
+
+
+def test_migrations_add_the_catalog_columns(tmp_path):
+    app = _old_database(tmp_path, "b4d2f6a8c0e1")
+    with app.app_context():
+        assert "template_id" not in _columns("assessment")
+        assert "retired" not in _columns("question")
+        with db.engine.begin() as connection:
+            connection.execute(
+                text("INSERT INTO assessment (id, year, season) VALUES (1, 2024, 'Spring')")
+            )
+            connection.execute(
+                text(
+                    'INSERT INTO page (id, title, assessment_id, "order") '
+                    "VALUES (1, 'Food', 1, 1)"
+                )
+            )
+
+        upgrade()
+
+        assert "template_id" in _columns("assessment")
+        for table in ("page", "question", "organization_question", "site_question"):
+            assert "retired" in _columns(table)
+        with db.engine.connect() as connection:
+            assert connection.execute(text("SELECT template_id FROM assessment")).all() == [(None,)]
+            assert connection.execute(text("SELECT retired FROM page")).all() == [(0,)]
+        db.engine.dispose()
+
+
+def test_migration_adds_the_site_assessment_revision(tmp_path):
+    app = _old_database(tmp_path, "c6e8a0b2d4f3")
+    with app.app_context():
+        assert "revision" not in _columns("site_assessment")
+        with db.engine.begin() as connection:
+            connection.execute(
+                text("INSERT INTO site_assessment (id, site_id, assessment_id) VALUES (1, 1, 1)")
+            )
+
+        upgrade()
+
+        with db.engine.connect() as connection:
+            assert connection.execute(text("SELECT revision FROM site_assessment")).all() == [(0,)]
+        db.engine.dispose()
+
+
+def test_migration_creates_the_catalog_version(tmp_path):
+    app = _old_database(tmp_path, "d7f9b1c3e5a4")
+    with app.app_context():
+        assert "catalog_version" not in inspect(db.engine).get_table_names()
+
+        upgrade()
+
+        with db.engine.connect() as connection:
+            assert connection.execute(text("SELECT id, version FROM catalog_version")).all() == [
+                (1, 0)
+            ]
+        # a second run finds the row and leaves it alone
+        with db.engine.begin() as connection:
+            connection.execute(text("DROP TABLE alembic_version"))
+        upgrade()
+        with db.engine.connect() as connection:
+            assert connection.execute(text("SELECT COUNT(*) FROM catalog_version")).scalar() == 1
+        db.engine.dispose()
+
+
+def test_first_migration_downgrades_without_every_table(tmp_path):
+    app = _old_database(tmp_path, "a3c1e5f2b7d9")
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.execute(text("DROP TABLE organization_question_response"))
+
+        downgrade(revision="base")
+
+        indexes = {index["name"] for index in inspect(db.engine).get_indexes("question")}
+        assert "ix_question_slug" not in indexes
+        db.engine.dispose()
@@ -0,0 +1,102 @@
+import os
+import time
+
+import pytest
+
+from backend.utils.passwords import HashingBusyError, PasswordHasher, calibrate_rounds
+
+
+def test_login_verifies_the_password(client):
+    ok = client.post(
+        "/api/login", json={"email": "testuser@example.com", "password": "password123"}
+    )
+    assert ok.status_code == 200
+    assert ok.json["accessToken"]
+
+    wrong = client.post("/api/login", json={"email": "testuser@example.com", "password": "nope"})
+    assert wrong.status_code == 401
+
+    missing = client.post("/api/login", json={"email": "testuser@example.com"})
+    assert missing.status_code == 400
+
+
+def test_registered_user_can_log_in(app, client, auth_header):
+    response = client.post(
+        "/api/register",
+        json={"email": "new@example.com", "orgName": "New Org", "password": "s3cret"},
+    )
+    assert response.status_code == 201
+
+    response = client.post("/api/login", json={"email": "new@example.com", "password": "s3cret"})
+    assert response.status_code == 200
+
+    assert client.get("/api/auth/stats").status_code == 401
+    assert client.get("/api/auth/stats", headers=auth_header).status_code == 403
+    app.config["ADMIN_EMAILS"] = ["testuser@example.com"]
+    try:
+        stats = client.get("/api/auth/stats", headers=auth_header).json
+    finally:
+        app.config["ADMIN_EMAILS"] = []
+    assert stats["hash"]["count"] >= 1
+    assert stats["verify"]["count"] >= 1
+    assert stats["pending"] == 0
+
+
+def test_full_pool_rejects_instead_of_queueing():
+    hasher = PasswordHasher(rounds=4, workers=1, max_pending=1, queue_timeout=0)
+    hasher._slots.acquire()
+    with pytest.raises(HashingBusyError):
+        hasher.hash("password")
+    assert hasher.stats()["rejected"] == 1
+    hasher.shutdown()
+
+
+def test_slow_hash_times_out_as_busy():
+    hasher = PasswordHasher(rounds=4, workers=1, max_pending=1, queue_timeout=0, timeout=0.1)
+    try:
+        with pytest.raises(HashingBusyError):
+            hasher._run("hash", time.sleep, 1)
+        # the sleep still occupies the worker, so it keeps its slot
+        assert hasher.stats()["pending"] == 1
+        with pytest.raises(HashingBusyError):
+            hasher.hash("password")
+        assert hasher.stats()["rejected"] == 1
+
+        deadline = time.monotonic() + 10
+        while hasher.stats()["pending"] and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert hasher.stats()["pending"] == 0
+        assert hasher.hash("password")
+    finally:
+        hasher.shutdown()
+
+
+def test_dead_worker_is_replaced():
+    hasher = PasswordHasher(rounds=4, workers=1)
+    try:
+        with pytest.raises(HashingBusyError):
+            hasher._run("hash", os._exit, 1)
+        hashed = hasher.hash("password")
+        assert hasher.verify("password", hashed)
+    finally:
+        hasher.shutdown()
+
+
+def test_busy_pool_answers_503(client, monkeypatch):
+    from backend.utils.passwords import password_hasher
+
+    def busy(*args):
+        raise HashingBusyError("busy")
+
+    monkeypatch.setattr(password_hasher, "verify", busy)
+    response = client.post(
+        "/api/login", json={"email": "testuser@example.com", "password": "password123"}
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_calibration_stops_at_the_first_cost_over_target():
+    rounds, timings = calibrate_rounds(target_ms=0, max_rounds=6, samples=1)
+    assert rounds == 4
+    assert list(timings) == [4]
@@ -0,0 +1,114 @@
+import jwt
+
+from backend.models import db, SiteQuestion, User
+from backend.utils.jwt_utils import generate_jwt_payload
+from backend.utils.principals import Principal, PrincipalCache, principal_cache
+
+
+def _touches_user_table(statements):
+    return [s for s in statements if 'FROM "user"' in s or "FROM user" in s]
+
+
+def test_token_carries_site_and_org_claims(app, client):
+    with app.app_context():
+        user = User.query.filter_by(email="testuser@example.com").first()
+        payload = jwt.decode(
+            generate_jwt_payload(user), app.config["JWT_SECRET"], algorithms=["HS256"]
+        )
+    assert payload["user_id"] == user.id
+    assert payload["site_id"] == user.site_id
+    assert payload["organization_id"] == user.organization_id
+    assert payload["exp"] - payload["iat"] == app.config["JWT_EXP_DELTA_SECONDS"]
+
+
+def test_read_paths_skip_the_user_lookup(app, client, auth_header, count_queries):
+    with app.app_context():
+        client.get("/api/site-assessment", headers=auth_header)
+        with count_queries() as statements:
+            assert client.get("/api/site-assessment", headers=auth_header).status_code == 200
+            assert client.get("/api/site/responses", headers=auth_header).status_code == 200
+            assert client.get("/api/organization/responses", headers=auth_header).status_code == 200
+        assert not _touches_user_table(statements), statements
+
+
+def test_token_without_claims_falls_back_to_the_database(app, client):
+    with app.app_context():
+        user = User.query.filter_by(email="testuser@example.com").first()
+        token = jwt.encode({"user_id": user.id}, app.config["JWT_SECRET"], algorithm="HS256")
+    response = client.get("/api/site/responses", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+
+
+def test_profile_responses_reject_a_bad_token(client):
+    headers = {"Authorization": "Bearer not-a-token"}
+    for url in ("/api/site/responses", "/api/organization/responses"):
+        assert client.get(url).status_code == 401
+        assert client.get(url, headers=headers).status_code == 401
+    for url in ("/api/site/save", "/api/organization/save"):
+        assert client.post(url, json={"responses": []}).status_code == 401
+        assert client.post(url, json={"responses": []}, headers=headers).status_code == 401
+
+
+def test_site_save_invalidates_cached_principal(app, client):
+    response = client.post(
+        "/api/register",
+        json={"email": "new@example.com", "orgName": "New Org", "password": "secret"},
+    )
+    headers = {"Authorization": f"Bearer {response.json['accessToken']}"}
+    # caches a principal without a site
+    assert client.get("/api/site-assessment", headers=headers).status_code == 404
+
+    with app.app_context():
+        site_name_id = SiteQuestion.query.filter_by(slug="sitename").first().id
+    client.post(
+        "/api/site/save",
+        json={"responses": [{"questionId": site_name_id, "value": "New Site"}]},
+        headers=headers,
+    )
+
+    response = client.get("/api/site-assessment", headers=headers)
+    assert response.status_code == 200
+    with app.app_context():
+        user = User.query.filter_by(email="new@example.com").first()
+        assert response.json["siteId"] == user.site_id
+        db.session.remove()
+
+
+def test_other_workers_see_a_new_site(app, client):
+    response = client.post(
+        "/api/register",
+        json={"email": "new@example.com", "orgName": "New Org", "password": "secret"},
+    )
+    old_token = response.json["accessToken"]
+    with app.app_context():
+        site_name_id = SiteQuestion.query.filter_by(slug="sitename").first().id
+    saved = client.post(
+        "/api/site/save",
+        json={"responses": [{"questionId": site_name_id, "value": "New Site"}]},
+        headers={"Authorization": f"Bearer {old_token}"},
+    )
+    new_token = saved.json["accessToken"]
+    # a worker that never saw the change has no record of it
+    principal_cache.clear()
+
+    with app.app_context():
+        user = User.query.filter_by(email="new@example.com").first()
+        claims = jwt.decode(new_token, app.config["JWT_SECRET"], algorithms=["HS256"])
+        assert claims["site_id"] == user.site_id
+        db.session.remove()
+    for token in (old_token, new_token):
+        response = client.get("/api/site-assessment", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+
+
+def test_principal_cache_evicts_least_recently_used_and_expired():
+    cache = PrincipalCache(ttl=60, max_entries=2)
+    cache.put("a", Principal(1, 1, 1))
+    cache.put("b", Principal(2, 2, 2))
+    cache.get("a")
+    cache.put("c", Principal(3, 3, 3))
+    assert cache.get("b") is None
+    assert cache.get("a") == Principal(1, 1, 1)
+
+    cache.put("expired", Principal(4, 4, 4), expires_at=0)
+    assert cache.get("expired") is None
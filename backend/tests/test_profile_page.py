@@ -0,0 +1,114 @@
+from backend.catalog import bump_catalog_version
+from backend.logic import progress
+from backend.models import db, Page, Question, Site, SiteAssessment, SitePage
+
+
+def _make_profile_page():
+    """Turn Demographics into a profile page carrying the slugged side-effect questions."""
+    page = Page.query.filter_by(title="Demographics").first()
+    page.is_profile_page = True
+    titles = [p.title for p in Page.query.filter_by(assessment_id=page.assessment_id)]
+    questions = {
+        "siteneeds": Question(
+            page_id=page.id,
+            text="Which of the following areas do you have needs in?",
+            question_type="MultiSelect",
+            options=titles,
+            order=100,
+            slug="siteneeds",
+        ),
+        "orgname": Question(
+            page_id=page.id,
+            text="Organization Name",
+            question_type="Short Response",
+            order=101,
+            slug="orgname",
+        ),
+        "sitenumserved": Question(
+            page_id=page.id,
+            text="How many individuals does your organisation support in one month?",
+            question_type="Numeric",
+            order=102,
+            slug="sitenumserved",
+        ),
+    }
+    db.session.add_all(questions.values())
+    bump_catalog_version()
+    db.session.commit()
+    return page, {slug: question.id for slug, question in questions.items()}
+
+
+def _profile_site_page(site_assessment, page):
+    site_page = SitePage.query.filter_by(
+        site_assessment_id=site_assessment.id, page_id=page.id
+    ).first()
+    return site_assessment, site_page
+
+
+def _save(client, auth_header, site_page, responses):
+    return client.post(
+        f"/api/site-assessment/{site_page.site_assessment_id}/site-page/{site_page.id}/save",
+        json={"responses": responses, "confirmed": True},
+        headers=auth_header,
+    )
+
+
+def test_profile_answers_update_pages_and_site(app, client, auth_header, load_site_assessment):
+    with app.app_context():
+        page, question_ids = _make_profile_page()
+        site_assessment, site_page = _profile_site_page(load_site_assessment(), page)
+
+        response = _save(
+            client,
+            auth_header,
+            site_page,
+            [
+                {"questionId": question_ids["siteneeds"], "value": ["Food", "Shelter"]},
+                {"questionId": question_ids["orgname"], "value": "Renamed Site"},
+                {"questionId": question_ids["sitenumserved"], "value": 42},
+            ],
+        )
+        assert response.status_code == 200
+
+        required = {
+            sp.title
+            for sp in SitePage.query.filter_by(site_assessment_id=site_assessment.id, required=True)
+        }
+        assert required == {"Demographics", "Food", "Shelter"}
+        site = db.session.get(Site, site_assessment.site_id)
+        assert site.name == "Renamed Site"
+        assert site.people_served == 42
+
+        db.session.refresh(site_assessment)
+        assert site_assessment.required_remaining == 2
+        counters = {c: getattr(site_assessment, c) for c in progress.COUNTERS}
+        progress.recount_progress(SiteAssessment.id == site_assessment.id)
+        db.session.refresh(site_assessment)
+        assert counters == {c: getattr(site_assessment, c) for c in progress.COUNTERS}
+
+
+def test_profile_save_query_count_does_not_grow_with_answers(
+    app, client, auth_header, count_queries, load_site_assessment
+):
+    with app.app_context():
+        page, question_ids = _make_profile_page()
+        site_assessment, site_page = _profile_site_page(load_site_assessment(), page)
+        _save(client, auth_header, site_page, [])
+
+        def save(needs):
+            with count_queries() as statements:
+                response = _save(
+                    client,
+                    auth_header,
+                    site_page,
+                    [
+                        {"questionId": question_ids["siteneeds"], "value": needs},
+                        {"questionId": question_ids["sitenumserved"], "value": len(needs)},
+                    ],
+                )
+            assert response.status_code == 200
+            return statements
+
+        one = save(["Food"])
+        many = save(["Food", "Hygeine", "Household", "Shelter", "Clothing"])
+        assert len(one) == len(many), (one, many)
@@ -0,0 +1,116 @@
+from backend.logic import progress
+from backend.models import db, SiteAssessment, SitePage
+
+
+def _save(client, auth_header, site_page, confirmed=False):
+    response = client.post(
+        f"/api/site-assessment/{site_page.site_assessment_id}/site-page/{site_page.id}/save",
+        json={"responses": [], "confirmed": confirmed},
+        headers=auth_header,
+    )
+    assert response.status_code == 200
+
+
+def _counters(site_assessment):
+    db.session.refresh(site_assessment)
+    return {counter: getattr(site_assessment, counter) for counter in progress.COUNTERS}
+
+
+def _recounted(site_assessment):
+    progress.recount_progress(SiteAssessment.id == site_assessment.id)
+    return _counters(site_assessment)
+
+
+def test_transitions():
+    assert progress.next_progress("LOCKED", "unlock", False) == "UNSTARTEDOPTIONAL"
+    assert progress.next_progress("LOCKED", "unlock", False, True) == "UNSTARTEDREQUIRED"
+    assert progress.next_progress("STARTEDOPTIONAL", "unlock", False) == "STARTEDOPTIONAL"
+    assert progress.next_progress("COMPLETE", "save", True) == "STARTEDREQUIRED"
+    assert progress.next_progress("UNSTARTEDOPTIONAL", "save", False) == "STARTEDOPTIONAL"
+    assert progress.next_progress("STARTEDREQUIRED", "confirm", True) == "COMPLETE"
+
+
+def test_counters_follow_saves(app, client, auth_header, load_site_assessment):
+    with app.app_context():
+        site_assessment = load_site_assessment()
+        site_pages = sorted(site_assessment.site_pages, key=lambda sp: sp.order)
+        required = [sp for sp in site_pages if sp.required]
+        optional = [sp for sp in site_pages if not sp.required and not sp.is_confirmation_page]
+
+        assert _counters(site_assessment) == {
+            "pages_locked": len(site_pages) - len(required),
+            "required_remaining": len(required),
+            "optional_started": 0,
+            "pages_complete": 0,
+        }
+        assert not site_assessment.ready_to_confirm
+
+        _save(client, auth_header, required[0])
+        for site_page in required:
+            _save(client, auth_header, site_page, confirmed=True)
+        counters = _counters(site_assessment)
+        assert counters["pages_locked"] == 0
+        assert counters["required_remaining"] == 0
+        assert site_assessment.ready_to_confirm
+
+        _save(client, auth_header, optional[0])
+        _save(client, auth_header, optional[1], confirmed=True)
+        _save(client, auth_header, optional[1])
+        _save(client, auth_header, required[0])
+        counters = _counters(site_assessment)
+        assert counters == {
+            "pages_locked": 0,
+            "required_remaining": 1,
+            "optional_started": 2,
+            "pages_complete": len(required) - 1,
+        }
+        assert counters == _recounted(site_assessment)
+
+        data = client.get("/api/site-assessment", headers=auth_header).json
+        assert data["pageCounts"]["requiredRemaining"] == 1
+        assert data["readyToConfirm"] is False
+
+
+def test_marking_a_page_required_updates_the_counters(
+    app, client, auth_header, load_site_assessment
+):
+    with app.app_context():
+        site_assessment = load_site_assessment()
+        for site_page in site_assessment.site_pages:
+            if site_page.required:
+                _save(client, auth_header, site_page, confirmed=True)
+        optional = next(
+            sp
+            for sp in site_assessment.site_pages
+            if not sp.required and not sp.is_confirmation_page
+        )
+        progress.change_page(optional, required=True)
+        db.session.commit()
+
+        assert site_assessment.required_remaining == 1
+        assert _counters(site_assessment) == _recounted(site_assessment)
+
+
+def test_unlock_is_two_statements_whatever_the_page_count(
+    app, client, auth_header, count_queries, load_site_assessment
+):
+    with app.app_context():
+        site_assessment = load_site_assessment()
+        for site_page in site_assessment.site_pages:
+            if site_page.required:
+                progress.apply_event(site_page, "confirm")
+        db.session.flush()
+        assert site_assessment.required_remaining == 0
+
+        with count_queries() as statements:
+            assert progress.unlock_remaining_pages(site_assessment)
+        updates = [s for s in statements if s.lstrip().upper().startswith("UPDATE")]
+        assert len(updates) == 2, statements
+        assert not any(s.lstrip().upper().startswith("SELECT") for s in statements), statements
+        assert not progress.unlock_remaining_pages(site_assessment)
+
+        locked = SitePage.query.filter_by(
+            site_assessment_id=site_assessment.id, progress="LOCKED"
+        ).count()
+        assert locked == 0
+        assert site_assessment.pages_locked == 0
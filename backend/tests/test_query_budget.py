@@ -0,0 +1,40 @@
+"""Per-endpoint query budgets.
+
+Each endpoint listed here must serve a request with at most the given number of SQL
+statements, independent of how many pages or questions the assessment has. A test
+failing here usually means an N+1 query crept back in.
+"""
+
+QUERY_BUDGETS = {
+    "get_site_assessment": 5,
+    "get_site_assessment_by_id": 5,
+}
+
+
+def test_get_site_assessment_query_budget(
+    app, client, auth_header, count_queries, load_site_assessment
+):
+    with app.app_context():
+        # The first request creates the SiteAssessment; budgets cover the steady state.
+        load_site_assessment()
+
+        with count_queries() as statements:
+            response = client.get("/api/site-assessment", headers=auth_header)
+
+        assert response.status_code == 200
+        assert len(response.json["sitePages"]) > 1
+        assert len(statements) <= QUERY_BUDGETS["get_site_assessment"], statements
+
+
+def test_get_site_assessment_by_id_query_budget(
+    app, client, auth_header, count_queries, load_site_assessment
+):
+    with app.app_context():
+        site_assessment = load_site_assessment()
+
+        with count_queries() as statements:
+            response = client.get(f"/api/site-assessment/{site_assessment.id}", headers=auth_header)
+
+        assert response.status_code == 200
+        assert response.json["id"] == site_assessment.id
+        assert len(statements) <= QUERY_BUDGETS["get_site_assessment_by_id"], statements
@@ -0,0 +1,96 @@
+from backend.catalog import bump_catalog_version, get_assessment_catalog
+from backend.logic.responses import upsert_responses
+from backend.models import db, QuestionResponse, SitePage
+
+
+def _site_page(site_assessment):
+    return SitePage.query.filter_by(site_assessment_id=site_assessment.id).first()
+
+
+def test_upsert_responses_inserts_then_updates(app, client, auth_header, load_site_assessment):
+    with app.app_context():
+        site_page = _site_page(load_site_assessment())
+        question_ids = [q.id for q in site_page.page.questions]
+
+        upsert_responses(
+            QuestionResponse,
+            site_page.id,
+            [{"questionId": qid, "value": "first"} for qid in question_ids]
+            + [{"questionId": None, "value": "skipped"}],
+        )
+        db.session.commit()
+        upsert_responses(
+            QuestionResponse, site_page.id, [{"questionId": question_ids[0], "value": "second"}]
+        )
+        db.session.commit()
+
+        rows = QuestionResponse.query.filter_by(site_page_id=site_page.id).all()
+        values = {r.question_id: r.value for r in rows}
+        assert len(rows) == len(question_ids)
+        assert values[question_ids[0]] == "second"
+        assert all(values[qid] == "first" for qid in question_ids[1:])
+
+
+def test_upsert_responses_last_duplicate_wins(app, client, auth_header, load_site_assessment):
+    with app.app_context():
+        site_page = _site_page(load_site_assessment())
+        question_id = site_page.page.questions[0].id
+
+        upsert_responses(
+            QuestionResponse,
+            site_page.id,
+            [{"questionId": question_id, "value": "a"}, {"questionId": question_id, "value": "b"}],
+        )
+        db.session.commit()
+
+        rows = QuestionResponse.query.filter_by(site_page_id=site_page.id).all()
+        assert [r.value for r in rows] == ["b"]
+
+
+def _valid_value(question):
+    return {"Numeric": "1", "MultiSelect": [], "DemoGrid": "", "SizingGrid": ""}.get(
+        question.question_type, "Yes"
+    )
+
+
+def test_save_site_page_query_count_independent_of_responses(
+    app, client, auth_header, count_queries, load_site_assessment
+):
+    with app.app_context():
+        site_page = _site_page(load_site_assessment())
+        url = f"/api/site-assessment/{site_page.site_assessment_id}/site-page/{site_page.id}/save"
+        questions = site_page.page.questions
+
+        counts = []
+        for size in (1, len(questions)):
+            responses = [{"questionId": q.id, "value": _valid_value(q)} for q in questions[:size]]
+            client.post(url, json={"responses": responses}, headers=auth_header)
+            with count_queries() as statements:
+                response = client.post(url, json={"responses": responses}, headers=auth_header)
+            assert response.status_code == 200
+            counts.append(len(statements))
+
+        assert counts[0] == counts[1]
+
+
+def test_answers_to_retired_questions_can_be_saved_again(
+    app, client, auth_header, load_site_assessment
+):
+    with app.app_context():
+        site_page = _site_page(load_site_assessment())
+        url = f"/api/site-assessment/{site_page.site_assessment_id}/site-page/{site_page.id}/save"
+        question = site_page.page.questions[0]
+        responses = [{"questionId": question.id, "value": _valid_value(question)}]
+        assert (
+            client.post(url, json={"responses": responses}, headers=auth_header).status_code == 200
+        )
+
+        question.retired = True
+        bump_catalog_version()
+        db.session.commit()
+
+        # the form still holds the earlier answer and sends it back
+        response = client.post(url, json={"responses": responses}, headers=auth_header)
+        assert response.status_code == 200
+        catalog = get_assessment_catalog(site_page.site_assessment.assessment_id)
+        assert question.id not in catalog.pages_by_id[site_page.page_id].question_ids
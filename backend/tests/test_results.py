@@ -0,0 +1,128 @@
+from backend.commands import rebuild_results_command
+from backend.logic.results import build_page_section
+from backend.models import db, SiteAssessment, SiteAssessmentResult, SitePage, User
+from backend.utils.jwt_utils import generate_jwt_payload
+
+
+def _needs_question(site_page):
+    return next(
+        q
+        for q in site_page.page.questions
+        if "need" in q.text.lower() and q.question_type == "MultiSelect"
+    )
+
+
+def test_list_answers_that_are_not_all_strings_are_summarized():
+    section = build_page_section(
+        1, 1, "Food", [(7, "What do you need most?", "per month", [2, None, "Rice"])]
+    )
+    assert section["responses"][0]["responseValue"] == [2, None, "Rice"]
+    assert section["needs"] == [{"highlight": "2, Rice", "subtext": "per month"}]
+
+
+def test_saving_a_page_updates_its_result_section(app, client, auth_header, load_site_assessment):
+    with app.app_context():
+        site_assessment = load_site_assessment()
+        site_page = next(
+            sp
+            for sp in site_assessment.site_pages
+            if any("need" in q.text.lower() for q in sp.page.questions)
+        )
+        question = _needs_question(site_page)
+        value = question.options[:2]
+
+        client.post(
+            f"/api/site-assessment/{site_assessment.id}/site-page/{site_page.id}/save",
+            json={"responses": [{"questionId": question.id, "value": value}]},
+            headers=auth_header,
+        )
+
+        result = SiteAssessmentResult.query.filter_by(site_assessment_id=site_assessment.id).one()
+        section = result.data["sections"][str(site_page.id)]
+        assert section["responses"] == [
+            {"questionId": question.id, "questionText": question.text, "responseValue": value}
+        ]
+
+        summary = client.get(
+            f"/api/site-assessment/{site_assessment.id}/summary", headers=auth_header
+        ).json
+        assert summary["summary"] == [
+            {
+                "sitePageId": site_page.id,
+                "sitePageTitle": site_page.title,
+                "responses": section["responses"],
+            }
+        ]
+        assert summary["carousel"]["cards"][0]["highlight"] == ", ".join(value)
+        assert summary["carousel"]["organizationName"] == site_assessment.site.name
+
+
+def test_summary_is_a_single_row_read(
+    app, client, auth_header, count_queries, load_site_assessment
+):
+    with app.app_context():
+        site_assessment = load_site_assessment()
+        url = f"/api/site-assessment/{site_assessment.id}/summary"
+        client.get(url, headers=auth_header)
+
+        with count_queries() as statements:
+            assert client.get(url, headers=auth_header).status_code == 200
+        assert len(statements) == 1
+
+
+def test_summary_is_only_served_to_its_site(app, client, auth_header, load_site_assessment):
+    with app.app_context():
+        site_assessment = load_site_assessment()
+        url = f"/api/site-assessment/{site_assessment.id}/summary"
+        user = User.query.filter_by(email="testuser@example.com").first()
+        other = User.query.filter(User.site_id != user.site_id, User.site_id.isnot(None)).first()
+        other_header = {"Authorization": f"Bearer {generate_jwt_payload(other)}"}
+
+        assert client.get(url).status_code == 401
+        assert client.get(url, headers=other_header).status_code == 404
+
+
+def test_rebuild_results_command(app, client, auth_header, load_site_assessment):
+    with app.app_context():
+        site_assessment = load_site_assessment()
+
+        output = app.test_cli_runner().invoke(rebuild_results_command).output
+        assert "Rebuilt 1 site assessment results" in output
+
+        result = SiteAssessmentResult.query.filter_by(site_assessment_id=site_assessment.id).one()
+        assert set(result.data["sections"]) == {str(sp.id) for sp in site_assessment.site_pages}
+
+
+def test_summary_get_is_side_effect_free(
+    app, client, auth_header, count_queries, load_site_assessment
+):
+    with app.app_context():
+        site_assessment_id = load_site_assessment().id
+        SiteAssessmentResult.query.delete()
+        db.session.commit()
+
+        with count_queries() as statements:
+            response = client.get(
+                f"/api/site-assessment/{site_assessment_id}/summary", headers=auth_header
+            )
+
+        assert response.status_code == 200
+        assert all(s.lstrip().upper().startswith("SELECT") for s in statements)
+        assert len(statements) == 2  # assessment + result row, then the joined summary query
+        db.session.expire_all()
+        assert not db.session.get(SiteAssessment, site_assessment_id).confirmed
+        assert SiteAssessmentResult.query.count() == 0
+
+
+def test_confirm_action(app, client, auth_header, load_site_assessment):
+    with app.app_context():
+        site_assessment = load_site_assessment()
+
+        response = client.post(
+            f"/api/site-assessment/{site_assessment.id}/confirm", headers=auth_header
+        )
+
+        assert response.status_code == 200
+        db.session.expire_all()
+        assert db.session.get(SiteAssessment, site_assessment.id).confirmed
+        assert client.post(f"/api/site-assessment/{site_assessment.id}/confirm").status_code == 401
@@ -0,0 +1,29 @@
+import json
+
+from backend.models import db, Page, Question, User
+from backend.utils.import_data import load_seed_data
+
+
+def test_load_seed_data_keeps_ids_in_one_insert_per_table(app, client, count_queries, tmp_path):
+    with open("data/test_seed.json", encoding="utf-8") as f:
+        data = json.load(f)
+    # ids with gaps must survive the round trip
+    for page in data["pages"]:
+        page["id"] += 100
+    for question in data["questions"]:
+        question["page_id"] += 100
+    path = tmp_path / "seed.json"
+    path.write_text(json.dumps(data))
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        with count_queries() as statements:
+            load_seed_data(db, str(path))
+
+        inserts = [s for s in statements if s.startswith("INSERT INTO")]
+        assert len(inserts) == 5 + 1  # one per seed table, plus the catalog version
+        assert sorted(p.id for p in Page.query) == sorted(p["id"] for p in data["pages"])
+        question = data["questions"][0]
+        assert db.session.get(Question, question["id"]).page_id == question["page_id"]
+        assert sorted(u.id for u in User.query) == sorted(u["id"] for u in data["users"])
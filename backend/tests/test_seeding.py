@@ -0,0 +1,51 @@
+from backend.logic.seeding import read_seed_plan, seed_assessment
+from backend.models import Assessment, Page, Question, SiteQuestion
+from backend.utils.item_catalog import load_item_catalog
+
+QUESTIONS_CSV = "data/questions.csv"
+OPTIONS_JSON = "data/response_options.json"
+
+
+def _plan():
+    return read_seed_plan(QUESTIONS_CSV, OPTIONS_JSON, load_item_catalog().choices)
+
+
+def test_plan_resolves_pages_and_parents():
+    plan = _plan()
+    titles = [page.title for page in plan.pages]
+    assert len(titles) == len(set(titles))
+    assert "Site" not in titles and "Organization" not in titles
+
+    children = [q for q in plan.profile_questions("Site") if q.parent_item_id]
+    assert {q.parent_item_id for q in children} == {"WAREHOUSE"}
+    food_needs = next(
+        q for q in plan.assessment_questions() if q.page == "Food" and "six months" in q.text
+    )
+    assert food_needs.options[-1] == "None" and food_needs.allows_additional_input
+
+
+def test_seeding_writes_in_bulk_and_reuses_profile_questions(app, client, count_queries):
+    with app.app_context():
+        plan = _plan()
+        site_questions = SiteQuestion.query.count()
+
+        with count_queries() as statements:
+            assessment, timings = seed_assessment(
+                1999, "Spring", QUESTIONS_CSV, OPTIONS_JSON, load_item_catalog().choices
+            )
+        assert set(timings) == {"plan_ms", "write_ms"}
+        # a few statements per table, not one per row
+        assert len(statements) <= 16
+
+        assert Page.query.filter_by(assessment_id=assessment.id).count() == len(plan.pages)
+        questions = Question.query.join(Question.page).filter(Page.assessment_id == assessment.id)
+        assert questions.count() == len(plan.assessment_questions())
+
+        seed_assessment(1999, "Fall", QUESTIONS_CSV, OPTIONS_JSON, load_item_catalog().choices)
+        assert Assessment.query.filter_by(year=1999).count() == 2
+        expected = max(site_questions, len(plan.profile_questions("Site")))
+        assert SiteQuestion.query.count() == expected
+
+        warehouse = SiteQuestion.query.filter_by(slug="sitewarehouse").one()
+        children = SiteQuestion.query.filter_by(parent_question_id=warehouse.id).all()
+        assert {q.slug for q in children} == {"sitewarehousespace", "sitewarehousetruck"}
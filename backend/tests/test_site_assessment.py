@@ -1,8 +1,8 @@
-from backend.app import app
 from backend.models import db, SiteAssessment, SitePage, Page, User
+from backend.utils.jwt_utils import generate_jwt_payload
 
 
-def test_get_site_assessment(client, auth_header):
+def test_get_site_assessment(app, client, auth_header):
     """Test fetching a SiteAssessment and its associated SitePages."""
     with app.app_context():
         response = client.get("/api/site-assessment", headers=auth_header)
@@ -21,7 +21,7 @@ def test_get_site_assessment(client, auth_header):
                 assert page["progress"] == "LOCKED"
 
 
-def test_save_site_page(client, auth_header):
+def test_save_site_page(app, client, auth_header):
     """Test saving a SitePage (sets progress to STARTEDREQUIRED)."""
     with app.app_context():
         user = User.query.filter_by(email="testuser@example.com").first()
@@ -34,6 +34,7 @@ def test_save_site_page(client, auth_header):
         response = client.post(
             f"/api/site-assessment/{site_page.site_assessment_id}/site-page/{site_page.id}/save",
             json={"responses": []},
+            headers=auth_header,
         )
         assert response.status_code == 200
         assert response.json["message"] == "SitePage saved successfully"
@@ -42,7 +43,7 @@ def test_save_site_page(client, auth_header):
         assert updated_page.progress == "STARTEDREQUIRED"
 
 
-def test_complete_site_page(client, auth_header):
+def test_complete_site_page(app, client, auth_header):
     """Test completing all required SitePages and unlocking non-required ones."""
     with app.app_context():
         client.get("/api/site-assessment", headers=auth_header)
@@ -56,6 +57,7 @@ def test_complete_site_page(client, auth_header):
             response = client.post(
                 f"/api/site-assessment/{page.site_assessment_id}/site-page/{page.id}/save",
                 json={"responses": [], "confirmed": True},
+                headers=auth_header,
             )
             assert response.status_code == 200
             assert response.json["message"] == "SitePage completed successfully"
@@ -76,3 +78,41 @@ def test_complete_site_page(client, auth_header):
                 assert refreshed.progress == "UNSTARTEDREQUIRED"
             else:
                 assert refreshed.progress == "UNSTARTEDOPTIONAL"
+
+
+def test_get_site_page_of_another_site(app, client, auth_header):
+    """A SitePage is only served to users of its site, and only under its assessment."""
+    with app.app_context():
+        client.get("/api/site-assessment", headers=auth_header)
+        user = User.query.filter_by(email="testuser@example.com").first()
+        site_assessment = SiteAssessment.query.filter_by(site_id=user.site_id).first()
+        site_page = SitePage.query.filter_by(site_assessment_id=site_assessment.id).first()
+        other = User.query.filter(User.site_id != user.site_id, User.site_id.isnot(None)).first()
+        other_header = {"Authorization": f"Bearer {generate_jwt_payload(other)}"}
+
+        url = f"/api/site-assessment/{site_assessment.id}/site-page/{site_page.id}"
+        assert client.get(url, headers=auth_header).status_code == 200
+        assert client.get(url, headers=other_header).status_code == 403
+        wrong_assessment = f"/api/site-assessment/{site_assessment.id + 1}/site-page/{site_page.id}"
+        assert client.get(wrong_assessment, headers=auth_header).status_code == 404
+        missing = f"/api/site-assessment/{site_assessment.id}/site-page/999999"
+        assert client.get(missing, headers=auth_header).status_code == 404
+
+
+def test_save_site_page_checks_the_caller_and_the_assessment(app, client, auth_header):
+    """Saves need a token of the page's site and the page's own assessment id."""
+    with app.app_context():
+        client.get("/api/site-assessment", headers=auth_header)
+        user = User.query.filter_by(email="testuser@example.com").first()
+        site_assessment = SiteAssessment.query.filter_by(site_id=user.site_id).first()
+        site_page = SitePage.query.filter_by(site_assessment_id=site_assessment.id).first()
+        other = User.query.filter(User.site_id != user.site_id, User.site_id.isnot(None)).first()
+        other_header = {"Authorization": f"Bearer {generate_jwt_payload(other)}"}
+        body = {"responses": []}
+
+        url = f"/api/site-assessment/{site_assessment.id}/site-page/{site_page.id}/save"
+        assert client.post(url, json=body).status_code == 401
+        assert client.post(url, json=body, headers=other_header).status_code == 404
+        wrong = f"/api/site-assessment/{site_assessment.id + 1}/site-page/{site_page.id}/save"
+        assert client.post(wrong, json=body, headers=auth_header).status_code == 404
+        assert client.post(url, json=body, headers=auth_header).status_code == 200
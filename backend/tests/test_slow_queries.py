@@ -0,0 +1,65 @@
+import json
+
+from backend.app import create_app
+from backend.models import db, Site
+from backend.utils.slow_queries import analyze, log_files, normalize_sql, parameter_shape
+
+
+def test_normalize_sql():
+    assert normalize_sql("SELECT a FROM t\n  WHERE id = 5 AND name = 'x''y'") == (
+        "SELECT a FROM t WHERE id = ? AND name = ?"
+    )
+    assert normalize_sql("SELECT t1.a FROM t1 WHERE t1.id IN (?, ?, ?)") == (
+        "SELECT t1.a FROM t1 WHERE t1.id IN (...)"
+    )
+    assert normalize_sql("SELECT x::text FROM t WHERE id = %(id_1)s") == (
+        "SELECT x::text FROM t WHERE id = ?"
+    )
+    assert parameter_shape((1, "a")) == ["int", "str"]
+    assert parameter_shape([{"id": 1}, {"id": 2}], executemany=True) == {
+        "rows": 2,
+        "row": {"id": "int"},
+    }
+
+
+def test_slow_statements_are_logged_with_plan_route_and_call_site(tmp_path):
+    path = tmp_path / "slow.jsonl"
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": "sqlite://",
+            "PASSWORD_HASH_ROUNDS": 4,
+            "PASSWORD_HASH_WORKERS": 1,
+            "SLOW_QUERY_LOG_PATH": str(path),
+            "SLOW_QUERY_THRESHOLD_MS": 0,
+        }
+    )
+    with app.app_context():
+        db.create_all()
+        with app.test_request_context("/api/status"):
+            Site.query.filter_by(id=1).all()
+            Site.query.filter_by(id=2).all()
+
+    entries = [json.loads(line) for line in path.read_text().splitlines()]
+    lookups = [e for e in entries if e["statement"].endswith("FROM site WHERE site.id = ?")]
+    assert len(lookups) == 2
+    first, second = lookups
+    assert first["fingerprint"] == second["fingerprint"]
+    assert first["route"] == "api.status"
+    assert first["callSite"].startswith("backend/tests/test_slow_queries.py:")
+    assert first["params"] == ["int"]
+    assert any("SEARCH site" in " ".join(row) for row in first["plan"])
+    assert "plan" not in second
+
+    ranking = analyze(log_files(path))
+    assert ranking == sorted(ranking, key=lambda g: g["totalMs"], reverse=True)
+
+    result = app.test_cli_runner().invoke(
+        args=["slow-queries", str(path), "--sort", "p95", "--top", "1000", "--json"]
+    )
+    assert result.exit_code == 0, result.output
+    groups = {g["fingerprint"]: g for g in json.loads(result.output)}
+    group = groups[first["fingerprint"]]
+    assert group["count"] == 2
+    assert group["routes"] == ["api.status"]
+    assert group["p95Ms"] >= group["p50Ms"]
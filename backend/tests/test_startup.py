@@ -0,0 +1,45 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from sqlalchemy import inspect
+
+from backend.app import create_app
+from backend.models import db
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+# cumulative import time of backend.app; about a second on a laptop
+IMPORT_BUDGET_SECONDS = 3.0
+LAZY_MODULES = {"pandas", "numpy", "bcrypt"}
+
+
+def _import_times():
+    """Run a cold interpreter with -X importtime; map module -> cumulative microseconds."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.app as a; a.create_app()"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        if cumulative.strip().isdigit():
+            times[module.strip()] = int(cumulative)
+    return times
+
+
+def test_cold_start_stays_within_budget():
+    times = _import_times()
+    assert times["backend.app"] / 1e6 < IMPORT_BUDGET_SECONDS
+    assert not LAZY_MODULES & {module.split(".")[0] for module in times}
+
+
+def test_create_app_has_no_side_effects(tmp_path):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'app.db'}"})
+    with app.app_context():
+        assert inspect(db.engine).get_table_names() == []
+    assert {"seed", "export-seed"} <= set(app.cli.commands)
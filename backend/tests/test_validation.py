@@ -0,0 +1,67 @@
+import json
+
+from backend.catalog import get_assessment_catalog
+from backend.models import Question
+from backend.validation import validate_responses as _validate_responses
+
+
+def _question(question_type):
+    return Question.query.filter_by(question_type=question_type).first()
+
+
+def validate_responses(responses):
+    question = Question.query.first()
+    catalog = get_assessment_catalog(question.page.assessment_id)
+    return _validate_responses(responses, catalog.questions)
+
+
+def test_numeric_values_are_coerced(app, client):
+    with app.app_context():
+        question = _question("Numeric")
+        responses = [{"questionId": question.id, "value": "12"}]
+        assert validate_responses(responses) == []
+        assert responses[0]["value"] == 12.0
+
+        errors = validate_responses([{"questionId": question.id, "value": "twelve"}])
+        assert errors and "Invalid numeric response" in errors[0]
+
+
+def test_multiselect_requires_list_of_known_options(app, client):
+    with app.app_context():
+        question = next(
+            q
+            for q in Question.query.filter_by(question_type="MultiSelect")
+            if q.options and not q.allows_additional_input
+        )
+        option = question.options[0]
+
+        assert validate_responses([{"questionId": question.id, "value": [option]}]) == []
+        assert (
+            "must be a list"
+            in validate_responses([{"questionId": question.id, "value": option}])[0]
+        )
+        assert (
+            "Invalid option"
+            in validate_responses(
+                [{"questionId": question.id, "value": [option, "not an option"]}]
+            )[0]
+        )
+
+
+def test_grid_shape_is_checked(app, client):
+    with app.app_context():
+        question = _question("DemoGrid")
+        grid = {"Male": {"Infants": 1, "Adults": 2}, "Female": {"Kids": 3}}
+
+        assert validate_responses([{"questionId": question.id, "value": json.dumps(grid)}]) == []
+        errors = validate_responses(
+            [{"questionId": question.id, "value": json.dumps({"Male": {"Elders": 1}})}]
+        )
+        assert errors and "Invalid grid response" in errors[0]
+
+
+def test_unknown_question_is_rejected(app, client):
+    with app.app_context():
+        assert validate_responses([{"questionId": 999999, "value": "x"}]) == [
+            "Invalid question ID: 999999"
+        ]
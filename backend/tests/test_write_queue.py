@@ -0,0 +1,126 @@
+import sqlite3
+import threading
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from backend.logic.write_queue import WriteBusyError, WriteQueue, _Job, run_with_retry
+from backend.models import db, Organization, QuestionResponse, Site, SitePage
+
+
+def _locked():
+    return OperationalError("COMMIT", {}, sqlite3.OperationalError("database is locked"))
+
+
+def test_lock_errors_are_retried_then_given_up(app):
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise _locked()
+        return "saved"
+
+    with app.app_context():
+        assert run_with_retry(flaky, attempts=5, base_ms=1) == "saved"
+        assert len(calls) == 3
+
+        calls.clear()
+
+        def always_locked():
+            calls.append(1)
+            raise _locked()
+
+        with pytest.raises(OperationalError):
+            run_with_retry(always_locked, attempts=2, base_ms=1)
+        assert len(calls) == 2
+
+
+def test_other_errors_are_not_retried(app):
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise OperationalError("SELECT", {}, sqlite3.OperationalError("no such table: x"))
+
+    with app.app_context():
+        with pytest.raises(OperationalError):
+            run_with_retry(broken, attempts=5, base_ms=1)
+    assert len(calls) == 1
+
+
+def _site_page(site_assessment):
+    return SitePage.query.filter_by(site_assessment_id=site_assessment.id, title="Food").first()
+
+
+def test_save_goes_through_the_writer_thread(
+    app, client, auth_header, monkeypatch, load_site_assessment
+):
+    write_queue = WriteQueue(app)
+    monkeypatch.setitem(app.extensions, "write_queue", write_queue)
+    try:
+        with app.app_context():
+            site_page = _site_page(load_site_assessment())
+            question = next(q for q in site_page.page.questions if q.question_type == "MultiSelect")
+            url = (
+                f"/api/site-assessment/{site_page.site_assessment_id}"
+                f"/site-page/{site_page.id}/save"
+            )
+            response = client.post(
+                url,
+                json={"responses": [{"questionId": question.id, "value": []}]},
+                headers=auth_header,
+            )
+            assert response.status_code == 200
+            # committed before the request returned
+            db.session.expire_all()
+            assert QuestionResponse.query.filter_by(site_page_id=site_page.id).count() == 1
+        assert write_queue.stats()["saves"] == 1
+    finally:
+        write_queue.stop()
+
+
+def test_failed_save_does_not_fail_its_batch(app, client):
+    def add_site(name):
+        org = Organization.query.first() or Organization(name="Batch Org")
+        db.session.add(org)
+        db.session.flush()
+        db.session.add(Site(name=name, organization_id=org.id))
+        return name
+
+    def broken():
+        raise ValueError("bad save")
+
+    batch = [_Job(add_site, ("Batch Site",)), _Job(broken, ()), _Job(add_site, ("Other Site",))]
+    with app.app_context():
+        WriteQueue(app)._commit(batch)
+        assert Site.query.filter(Site.name.in_(["Batch Site", "Other Site"])).count() == 2
+
+    assert batch[0].future.result() == "Batch Site"
+    assert batch[2].future.result() == "Other Site"
+    with pytest.raises(ValueError):
+        batch[1].future.result()
+
+
+def test_save_that_waits_too_long_is_cancelled(app):
+    write_queue = WriteQueue(app, batch_size=1)
+    started, release = threading.Event(), threading.Event()
+    ran = []
+
+    def slow():
+        started.set()
+        release.wait(5)
+
+    try:
+        writer_busy = threading.Thread(target=write_queue.submit, args=(slow,))
+        writer_busy.start()
+        assert started.wait(5)
+        with pytest.raises(WriteBusyError):
+            write_queue.submit(ran.append, 1, timeout=0.05)
+        release.set()
+        writer_busy.join()
+    finally:
+        write_queue.stop()
+    # the writer skipped the save its request gave up on
+    assert ran == []
+    assert write_queue.stats()["saves"] == 1
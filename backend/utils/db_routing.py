@@ -0,0 +1,61 @@
+"""Send the reads of GET endpoints to a separate read engine.
+
+Set ``SQLALCHEMY_READ_DATABASE_URI`` (env ``READ_DATABASE_URL``) to a replica, or for
+SQLite in WAL mode to a read-only connection to the same file, e.g.
+``sqlite:///file:/path/database.db?mode=ro&uri=true``. ``create_app`` keeps its engine
+in ``app.extensions["read_engine"]``; it is not a Flask-SQLAlchemy bind, since no
+model lives only there and ``create_all`` must not try to create tables on it.
+
+Views decorated with ``use_read_engine`` run their SELECTs on that engine. Writes
+always go to the primary, and once a request has written anything (a flush, or an
+INSERT/UPDATE/DELETE statement) its remaining reads stay on the primary too, so a
+request reads its own writes. Without a read engine nothing changes.
+"""
+
+import functools
+
+import sqlalchemy as sa
+from flask import current_app
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+READ_ENGINE = "read_engine"
+_ROUTE_READS = "route_reads"
+_WROTE = "wrote"
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get(_ROUTE_READS):
+            if isinstance(clause, sa.UpdateBase):
+                self.info[_WROTE] = True
+            elif not self.info.get(_WROTE) and not self._flushing:
+                read_engine = get_read_engine()
+                if read_engine is not None:
+                    return read_engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def get_read_engine():
+    return current_app.extensions.get(READ_ENGINE)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _remember_write(session, flush_context):
+    session.info[_WROTE] = True
+
+
+def use_read_engine(view):
+    """Route the view's reads to the read engine until it writes."""
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        info = current_app.extensions["sqlalchemy"].session.info
+        info[_ROUTE_READS] = True
+        try:
+            return view(*args, **kwargs)
+        finally:
+            info.pop(_ROUTE_READS, None)
+            info.pop(_WROTE, None)
+
+    return wrapper
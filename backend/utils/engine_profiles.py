@@ -0,0 +1,77 @@
+"""Database engine settings, picked by ``DB_ENGINE_PROFILE``.
+
+* ``sqlite``: a file database tuned for many short concurrent saves. Every new
+  connection switches to WAL (readers no longer block the writer), relaxes fsync
+  to ``synchronous=NORMAL`` (safe with WAL), waits ``busy_timeout`` for the write
+  lock instead of failing at once, and gets a larger page cache and mmap window.
+* ``server``: PostgreSQL/MySQL. A sized connection pool with pre-ping, and
+  connections recycled before server-side idle timeouts close them.
+* ``default``: SQLAlchemy's defaults, i.e. what the app ran with before profiles.
+* ``auto`` (the default) picks ``sqlite`` or ``server`` from the database URL.
+"""
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+PROFILES = ("auto", "sqlite", "server", "default")
+
+
+def resolve_profile(config):
+    profile = config["DB_ENGINE_PROFILE"]
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown DB_ENGINE_PROFILE {profile!r}, expected one of {PROFILES}")
+    if profile == "auto":
+        url = make_url(config["SQLALCHEMY_DATABASE_URI"])
+        return "sqlite" if url.get_backend_name() == "sqlite" else "server"
+    return profile
+
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured profile."""
+    profile = resolve_profile(config)
+    if profile == "server":
+        return {
+            "pool_size": config["DB_POOL_SIZE"],
+            "max_overflow": config["DB_MAX_OVERFLOW"],
+            "pool_pre_ping": True,
+            "pool_recycle": config["DB_POOL_RECYCLE_SECONDS"],
+        }
+    if profile == "sqlite":
+        # the driver's own lock wait, in seconds; busy_timeout below covers the same ground
+        return {"connect_args": {"timeout": config["SQLITE_BUSY_TIMEOUT_MS"] / 1000}}
+    return {}
+
+
+def sqlite_pragmas(config, wal=True):
+    pragmas = {
+        "synchronous": "NORMAL",
+        "busy_timeout": config["SQLITE_BUSY_TIMEOUT_MS"],
+        "cache_size": -config["SQLITE_CACHE_SIZE_KB"],  # negative: KiB rather than pages
+        "mmap_size": config["SQLITE_MMAP_SIZE"],
+    }
+    if wal:
+        pragmas = {"journal_mode": "WAL", **pragmas}
+    return pragmas
+
+
+def install_sqlite_pragmas(engine, pragmas):
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def configure_engine(engine, config, read_only=False):
+    """Hook the profile's per-connection setup onto ``engine``.
+
+    A ``read_only`` engine cannot switch the journal mode; it relies on the primary
+    having put the file in WAL mode.
+    """
+    if resolve_profile(config) != "sqlite" or engine.dialect.name != "sqlite":
+        return
+    database = engine.url.database
+    in_memory = not database or database == ":memory:" or database.startswith("file::memory:")
+    # an in-memory database has no file to keep a write-ahead log next to
+    install_sqlite_pragmas(engine, sqlite_pragmas(config, wal=not (in_memory or read_only)))
@@ -0,0 +1,21 @@
+from flask import Response, jsonify, request
+
+
+def etag_response(etag, build):
+    """Return ``jsonify(build())`` tagged with a strong ``etag``, or 304 if the client has it.
+
+    ``build`` is only called when the client's If-None-Match does not match, so an
+    unchanged resource is never serialized. The tag must change whenever the payload
+    would, e.g. by deriving it from the catalog version and a revision counter.
+    """
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify(build())
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def site_assessment_etag(site_assessment, catalog_version):
+    return f"site-assessment-{catalog_version}-{site_assessment.id}-{site_assessment.revision}"
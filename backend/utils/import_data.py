@@ -1,64 +1,35 @@
 import json
 
 from backend.models import Assessment, Page, Question, Site, User
+from backend.catalog import bump_catalog_version
+from backend.logic.seeding import bulk_insert
+
+# JSON key -> model, in foreign key order
+SEED_TABLES = [
+    ("assessments", Assessment),
+    ("pages", Page),
+    ("questions", Question),
+    ("sites", Site),
+    ("users", User),
+]
 
 
 def load_seed_data(db, path="data/test_seed.json"):
+    """Insert the rows of an export_seed_data file, keeping their ids.
+
+    Each table is written with a single executemany INSERT; no per-row flush is
+    needed since the foreign keys in the file already point at the right ids.
+    """
     with open(path, "r", encoding="utf-8") as f:
         data = json.load(f)
 
-    id_maps = {
-        "assessment": {},
-        "page": {},
-        "question": {},
-        "site": {},
-        "user": {},
-    }
-
-    # Insert assessments
-    for obj in data["assessments"]:
-        old_id = obj.pop("id")
-        a = Assessment(**obj)
-        db.session.add(a)
-        db.session.flush()  # Get new ID
-        id_maps["assessment"][old_id] = a.id
-
-    # Insert pages
-    for obj in data["pages"]:
-        old_id = obj.pop("id")
-        obj["assessment_id"] = id_maps["assessment"][obj["assessment_id"]]
-        p = Page(**obj)
-        db.session.add(p)
-        db.session.flush()
-        id_maps["page"][old_id] = p.id
-
-    # Insert questions
-    for obj in data["questions"]:
-        old_id = obj.pop("id")
-        obj["page_id"] = id_maps["page"][obj["page_id"]]
-        if obj["parent_question_id"]:
-            obj["parent_question_id"] = id_maps["question"].get(obj["parent_question_id"])
-        q = Question(**obj)
-        db.session.add(q)
-        db.session.flush()
-        id_maps["question"][old_id] = q.id
-
-    # Insert sites
-    for obj in data["sites"]:
-        old_id = obj.pop("id")
-        s = Site(**obj)
-        db.session.add(s)
-        db.session.flush()
-        id_maps["site"][old_id] = s.id
-
-    # Insert users
-    for obj in data["users"]:
-        old_id = obj.pop("id")
-        obj["site_id"] = id_maps["site"][obj["site_id"]]
-        u = User(**obj)
-        db.session.add(u)
-        db.session.flush()
-        id_maps["user"][old_id] = u.id
+    for key, model in SEED_TABLES:
+        rows = data.get(key, [])
+        if model is Question:
+            # parents first, for databases that check the self reference per row
+            rows = sorted(rows, key=lambda row: row.get("parent_question_id") is not None)
+        bulk_insert(model, rows)
 
+    bump_catalog_version()
     db.session.commit()
     print("✅ Test database loaded from JSON")
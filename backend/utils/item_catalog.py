@@ -0,0 +1,104 @@
+"""Needs items offered on the category pages, kept as a local snapshot.
+
+The items come from the donations Google Sheet. ``refresh_item_catalog`` reads the
+sheet (or a CSV exported from it), maps the sheet categories onto assessment pages
+and writes ``data/item_catalog.json`` with the next version number. Seeding only
+ever reads that snapshot, so starting the app never touches the network.
+"""
+
+import json
+from dataclasses import dataclass
+from datetime import datetime, UTC
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping
+
+SHEET_URL = "https://docs.google.com/spreadsheets/d/1hh41TeFexc-0Byg3iDSzbA2nLYd05bgSuwrKu-DUmww/export?format=csv&id=1hh41TeFexc-0Byg3iDSzbA2nLYd05bgSuwrKu-DUmww&gid=0"
+ITEM_CATALOG_PATH = Path(__file__).resolve().parent.parent / "data" / "item_catalog.json"
+
+# sheet category -> assessment page title
+CATEGORY_MAPPER = {
+    "Baby": "Infants and Children",
+    "Cleaning": "Hygeine",
+    "Clothing": "Clothing",
+    "Cooking": "Food",
+    "Education": "Infants and Children",
+    "Electronic": "Household",
+    "Food": "Food",
+    "Health": "Hygeine",
+    "Infrastructure": "Infrastructure",
+    "Office": "Household",
+    "Shelter": "Shelter",
+    "Toys & Activities": "Infants and Children",
+    "W.A.S.H.": "Hygeine",
+}
+
+
+@dataclass(frozen=True)
+class ItemCatalog:
+    version: int
+    source: str
+    created_at: str
+    # page title -> items, in sheet order
+    choices: Mapping
+
+
+def choices_from_sheet(df):
+    """Map the rows marked for the needs assessment to {page title: [items]}."""
+    import pandas as pd
+
+    df = df[df["Include in Needs Assessment"] == True]
+    df = pd.DataFrame(
+        {
+            "Category": df["Category"].str.strip().map(CATEGORY_MAPPER),
+            "Item": df["Item"].str.strip(),
+        }
+    )
+    df = df.dropna().drop_duplicates()
+    return {
+        category: items.tolist() for category, items in df.groupby("Category", sort=True)["Item"]
+    }
+
+
+def read_snapshot(path=ITEM_CATALOG_PATH):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return ItemCatalog(
+        version=data["version"],
+        source=data["source"],
+        created_at=data["created_at"],
+        choices=MappingProxyType({c: tuple(items) for c, items in data["choices"].items()}),
+    )
+
+
+@lru_cache(maxsize=None)
+def _load(path):
+    return read_snapshot(path)
+
+
+def load_item_catalog(path=ITEM_CATALOG_PATH) -> ItemCatalog:
+    """The snapshot at ``path``, parsed once per process."""
+    return _load(Path(path))
+
+
+def refresh_item_catalog(source=SHEET_URL, path=ITEM_CATALOG_PATH, header_row=1):
+    """Read the sheet (URL or local CSV path) and write the next snapshot version."""
+    import pandas as pd
+
+    path = Path(path)
+    choices = choices_from_sheet(pd.read_csv(source, header=header_row))
+    if not choices:
+        raise ValueError(f"No needs assessment items found in {source}")
+    previous = read_snapshot(path).version if path.exists() else 0
+    snapshot = {
+        "version": previous + 1,
+        "source": str(source),
+        "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
+        "choices": choices,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, indent=2)
+        f.write("\n")
+    _load.cache_clear()
+    return load_item_catalog(path)
@@ -1,12 +1,18 @@
 import jwt
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, UTC
 from flask import request, current_app
 from backend.models import User, db
+from backend.utils.principals import Principal, principal_cache
 
 
 def generate_jwt_payload(user):
+    now = datetime.now(UTC)
     payload = {
         "user_id": user.id,
+        "site_id": user.site_id,
+        "organization_id": user.organization_id,
+        "iat": now,
+        "exp": now + timedelta(seconds=current_app.config["JWT_EXP_DELTA_SECONDS"]),
     }
     token = jwt.encode(
         payload, current_app.config["JWT_SECRET"], algorithm=current_app.config["JWT_ALGORITHM"]
@@ -18,16 +24,23 @@ class JWTError(Exception):
     pass
 
 
-def get_jwt_payload():
+class AdminRequiredError(Exception):
+    pass
+
+
+def get_bearer_token():
     auth_header = request.headers.get("Authorization")
     if not auth_header:
         raise JWTError("Missing authorization header")
     parts = auth_header.split()
     if len(parts) != 2 or parts[0].lower() != "bearer":
         raise JWTError("Invalid authorization header format")
-    token = parts[1]
+    return parts[1]
+
+
+def decode_token(token):
     try:
-        payload = jwt.decode(
+        return jwt.decode(
             token,
             current_app.config.get("JWT_SECRET"),
             algorithms=[current_app.config.get("JWT_ALGORITHM")],
@@ -36,17 +49,63 @@ def get_jwt_payload():
         raise JWTError("Token has expired")
     except jwt.InvalidTokenError:
         raise JWTError("Invalid token")
-    return payload
 
 
-def get_current_user():
-    payload = get_jwt_payload()
-    user_id = payload.get("user_id")
+def get_jwt_payload():
+    return decode_token(get_bearer_token())
 
+
+def _principal_from_payload(payload):
+    user_id = payload.get("user_id")
     if not user_id:
         raise JWTError("Invalid token payload: missing user_id")
 
-    user = db.session.get(User, user_id)
+    has_claims = "site_id" in payload and "organization_id" in payload
+    # a user without a site is about to create one, possibly through another worker,
+    # so a missing site is never taken from the token
+    if (
+        has_claims
+        and payload["site_id"] is not None
+        and principal_cache.claims_are_current(user_id, payload.get("iat"))
+    ):
+        return Principal(user_id, payload["site_id"], payload["organization_id"])
+
+    # tokens without a site, without claims, or whose claims predate a change of site
+    # or organization
+    row = db.session.execute(
+        db.select(User.site_id, User.organization_id).where(User.id == user_id)
+    ).first()
+    if row is None:
+        raise JWTError("User not found")
+    return Principal(user_id, row.site_id, row.organization_id)
+
+
+def get_current_principal():
+    """The user id, site and organization behind the request's token.
+
+    Served from the principal cache or the token's claims, so scoping a query to the
+    user's site or organization does not need a User lookup.
+    """
+    token = get_bearer_token()
+    principal = principal_cache.get(token)
+    if principal is None:
+        payload = decode_token(token)
+        principal = _principal_from_payload(payload)
+        principal_cache.put(token, principal, expires_at=payload.get("exp"))
+    return principal
+
+
+def get_current_user():
+    principal = get_current_principal()
+    user = db.session.get(User, principal.user_id)
     if not user:
         raise JWTError("User not found")
     return user
+
+
+def get_current_admin():
+    """Like get_current_user, but the user's email must be listed in ADMIN_EMAILS."""
+    user = get_current_user()
+    if user.email not in current_app.config.get("ADMIN_EMAILS", ()):
+        raise AdminRequiredError("Admin access required")
+    return user
@@ -0,0 +1,279 @@
+"""Per-endpoint request and SQL metrics, exposed in Prometheus text format.
+
+``init_metrics(app)`` hooks Flask's request callbacks, and ``instrument_engine`` hooks
+``before_cursor_execute``/``after_cursor_execute`` on each engine. While a request
+is being handled its statements are tallied in ``flask.g``; when it finishes, the
+tally is folded into the totals of its endpoint (``api.summary`` and so on; requests
+that match no route are counted as ``unmatched``), which ``/api/metrics`` renders
+for admins (scrape it with an admin's bearer token):
+
+* ``http_request_duration_seconds``: latency histogram per endpoint and method,
+* ``http_requests_total``: requests per endpoint, method and status,
+* ``db_queries_total`` / ``db_query_duration_seconds_total``: statements and time in the database,
+* ``db_rows_returned_total``: rows the database handed back (SELECTs and
+  ``RETURNING``). Most drivers (sqlite3 among them) only know those once they are
+  fetched, so the cursor is wrapped in ``_CountingCursor`` and rows are counted as
+  SQLAlchemy fetches them; rows a request never fetches are not counted,
+* ``db_rows_affected_total``: rows inserted, updated or deleted, as reported by the
+  driver's ``rowcount``,
+* ``http_response_bytes_total``: body sizes (streamed responses count as 0).
+
+With ``SERVER_TIMING_ENABLED`` every response also carries a ``Server-Timing`` header
+with the request's database time and query count, which browsers' dev tools show
+next to the request.
+
+Statements run outside a request (CLI commands, the write-queue thread) are not
+counted.
+"""
+
+import threading
+import time
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+# seconds; Prometheus client defaults
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+UNMATCHED = "unmatched"
+
+
+class RequestStats:
+    """What one request cost, kept in ``g`` while it runs."""
+
+    __slots__ = ("started", "queries", "db_seconds", "rows_returned", "rows_affected")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.rows_returned = 0
+        self.rows_affected = 0
+
+
+class _EndpointTotals:
+    __slots__ = (
+        "buckets",
+        "count",
+        "seconds",
+        "queries",
+        "db_seconds",
+        "rows_returned",
+        "rows_affected",
+        "response_bytes",
+    )
+
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.seconds = 0.0
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.rows_returned = 0
+        self.rows_affected = 0
+        self.response_bytes = 0
+
+
+class MetricsRegistry:
+    """Thread-safe totals per (endpoint, method) plus request counts per status."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {}
+        self._statuses = {}
+
+    def record(self, endpoint, method, status, seconds, stats, response_bytes):
+        with self._lock:
+            totals = self._totals.get((endpoint, method))
+            if totals is None:
+                totals = self._totals[(endpoint, method)] = _EndpointTotals()
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    totals.buckets[i] += 1
+            totals.count += 1
+            totals.seconds += seconds
+            totals.queries += stats.queries
+            totals.db_seconds += stats.db_seconds
+            totals.rows_returned += stats.rows_returned
+            totals.rows_affected += stats.rows_affected
+            totals.response_bytes += response_bytes
+            key = (endpoint, method, status)
+            self._statuses[key] = self._statuses.get(key, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._totals.clear()
+            self._statuses.clear()
+
+    def render(self):
+        """The metrics in Prometheus text exposition format."""
+        with self._lock:
+            totals = sorted(self._totals.items())
+            statuses = sorted(self._statuses.items())
+
+        lines = [
+            "# HELP http_request_duration_seconds Time spent handling requests.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (endpoint, method), t in totals:
+            labels = f'endpoint="{endpoint}",method="{method}"'
+            for bound, count in zip(LATENCY_BUCKETS, t.buckets):
+                lines.append(
+                    f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}'
+                )
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {t.count}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {t.seconds:.6f}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {t.count}")
+
+        lines += [
+            "# HELP http_requests_total Requests handled, by status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (endpoint, method, status), count in statuses:
+            lines.append(
+                f'http_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}}'
+                f" {count}"
+            )
+
+        for name, kind, help_text, attribute, fmt in (
+            ("db_queries_total", "counter", "SQL statements executed.", "queries", "{}"),
+            (
+                "db_query_duration_seconds_total",
+                "counter",
+                "Time spent executing SQL statements.",
+                "db_seconds",
+                "{:.6f}",
+            ),
+            (
+                "db_rows_returned_total",
+                "counter",
+                "Rows returned by SQL statements.",
+                "rows_returned",
+                "{}",
+            ),
+            (
+                "db_rows_affected_total",
+                "counter",
+                "Rows inserted, updated or deleted.",
+                "rows_affected",
+                "{}",
+            ),
+            (
+                "http_response_bytes_total",
+                "counter",
+                "Response body bytes.",
+                "response_bytes",
+                "{}",
+            ),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            for (endpoint, method), t in totals:
+                value = fmt.format(getattr(t, attribute))
+                lines.append(f'{name}{{endpoint="{endpoint}",method="{method}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+def current_request_stats():
+    if has_request_context():
+        return g.get("request_stats")
+    return None
+
+
+class _CountingCursor:
+    """A DBAPI cursor that adds the rows fetched from it to a request's stats."""
+
+    __slots__ = ("_cursor", "_stats")
+
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._stats.rows_returned += 1
+            yield row
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._stats.rows_returned += 1
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._cursor.fetchmany(*args)
+        self._stats.rows_returned += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._stats.rows_returned += len(rows)
+        return rows
+
+
+def instrument_engine(engine):
+    """Count the statements ``engine`` runs on behalf of the current request."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        stats = current_request_stats()
+        if stats is None:
+            return
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - started
+        is_dml = context is not None and (context.isinsert or context.isupdate or context.isdelete)
+        if is_dml and cursor.rowcount > 0:
+            stats.rows_affected += cursor.rowcount
+        if context is not None and cursor.description is not None:
+            # the result is built from context.cursor right after this event
+            context.cursor = _CountingCursor(cursor, stats)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_started"):
+            connection.info["query_started"].pop()
+
+
+def server_timing(stats, seconds):
+    return (
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries", '
+        f"total;dur={seconds * 1000:.1f}"
+    )
+
+
+def _start_request():
+    g.request_stats = RequestStats()
+
+
+def _finish_request(response):
+    stats = g.pop("request_stats", None)
+    if stats is None:
+        return response
+    seconds = time.perf_counter() - stats.started
+    if request.url_rule is not None:
+        endpoint = request.endpoint
+    else:
+        endpoint = UNMATCHED
+    size = 0 if response.is_streamed else response.calculate_content_length() or 0
+    metrics.record(endpoint, request.method, response.status_code, seconds, stats, size)
+    if current_app.config["SERVER_TIMING_ENABLED"]:
+        response.headers["Server-Timing"] = server_timing(stats, seconds)
+    return response
+
+
+def init_metrics(app):
+    """Record request metrics for ``app``; a no-op unless ``METRICS_ENABLED``."""
+    if app.config["METRICS_ENABLED"]:
+        app.before_request(_start_request)
+        app.after_request(_finish_request)
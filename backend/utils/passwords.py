@@ -0,0 +1,207 @@
+"""Password hashing off the request thread.
+
+bcrypt holds a worker thread for the whole hash (a quarter second or more at the
+default cost), so ``register`` and ``login`` hand it to a small process pool. The
+pool is bounded: at most ``max_pending`` hashes are queued or running, and a request
+that cannot get a slot within ``queue_timeout`` seconds gets ``HashingBusyError``
+(a 503) instead of piling up behind the others. So does a hash that takes longer
+than ``timeout`` (it keeps its slot until the worker is actually done with it) or
+whose worker died; a pool with a dead worker is replaced with a fresh one, so the
+next request works again.
+
+The work factor comes from ``PASSWORD_HASH_ROUNDS``; ``flask calibrate-password-hashing``
+measures this host and suggests a value for a target latency.
+"""
+
+import multiprocessing
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+DEFAULT_ROUNDS = 12
+MIN_ROUNDS = 4
+MAX_ROUNDS = 16
+
+
+class HashingBusyError(Exception):
+    pass
+
+
+def _hash(password, rounds):
+    import bcrypt
+
+    start = time.perf_counter()
+    hashed = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+    return hashed, (time.perf_counter() - start) * 1000
+
+
+def _verify(password, hashed):
+    import bcrypt
+
+    start = time.perf_counter()
+    try:
+        ok = bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+    except ValueError:
+        # not a bcrypt hash
+        ok = False
+    return ok, (time.perf_counter() - start) * 1000
+
+
+class _Timings:
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.wait_ms = 0.0
+
+    def record(self, elapsed_ms, wait_ms):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.wait_ms += wait_ms
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "meanMs": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "maxMs": round(self.max_ms, 2),
+            "meanWaitMs": round(self.wait_ms / self.count, 2) if self.count else 0.0,
+        }
+
+
+class PasswordHasher:
+    """bcrypt through a bounded process pool. The pool starts on first use."""
+
+    def __init__(
+        self, rounds=DEFAULT_ROUNDS, workers=2, max_pending=16, queue_timeout=2.0, timeout=30.0
+    ):
+        self._lock = threading.Lock()
+        self._executor = None
+        self.configure(rounds, workers, max_pending, queue_timeout, timeout)
+
+    def configure(self, rounds, workers, max_pending, queue_timeout, timeout):
+        self.shutdown()
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self.pending = 0
+        self.rejected = 0
+        self._timings = {"hash": _Timings(), "verify": _Timings()}
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that holds database connections and threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _discard(self, executor):
+        """Replace ``executor`` with a fresh pool on next use (unless already replaced)."""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, fn, *args):
+        executor = self._pool()
+        try:
+            return executor, executor.submit(fn, *args)
+        except BrokenProcessPool:
+            # a worker died since the last hash
+            self._discard(executor)
+            executor = self._pool()
+            return executor, executor.submit(fn, *args)
+
+    def _run(self, kind, fn, *args):
+        slots = self._slots
+        if not slots.acquire(timeout=self.queue_timeout):
+            with self._lock:
+                self.rejected += 1
+            raise HashingBusyError("Too many password hashes in progress, try again shortly")
+        with self._lock:
+            self.pending += 1
+
+        def release(future=None):
+            with self._lock:
+                self.pending -= 1
+            slots.release()
+
+        start = time.perf_counter()
+        try:
+            executor, future = self._submit(fn, *args)
+        except BaseException:
+            release()
+            raise
+        # the slot is held until the worker is done, not until this request gives up:
+        # a running bcrypt call cannot be cancelled, so it still counts against max_pending
+        future.add_done_callback(release)
+        try:
+            result, elapsed_ms = future.result(timeout=self.timeout)
+        except TimeoutError:
+            future.cancel()
+            raise HashingBusyError("Password hashing timed out, try again shortly") from None
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise HashingBusyError("Password hashing failed, try again shortly") from None
+        total_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._timings[kind].record(elapsed_ms, max(total_ms - elapsed_ms, 0.0))
+        return result
+
+    def hash(self, password):
+        """bcrypt hash of ``password`` at the configured cost, as a str."""
+        return self._run("hash", _hash, password, self.rounds)
+
+    def verify(self, password, hashed):
+        return self._run("verify", _verify, password, hashed)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "rounds": self.rounds,
+                "workers": self.workers,
+                "pending": self.pending,
+                "maxPending": self.max_pending,
+                "rejected": self.rejected,
+                **{kind: timings.as_dict() for kind, timings in self._timings.items()},
+            }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher()
+
+
+def default_workers():
+    return min(4, os.cpu_count() or 1)
+
+
+def calibrate_rounds(target_ms, min_rounds=MIN_ROUNDS, max_rounds=MAX_ROUNDS, samples=3):
+    """Time bcrypt on this host for increasing costs. Returns (rounds, {rounds: median ms}).
+
+    ``rounds`` is the highest cost whose median hash time stays within ``target_ms``
+    (``min_rounds`` if even that is slower). Each extra round doubles the time, so
+    measuring stops at the first cost over the target.
+    """
+    timings = {}
+    chosen = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        timings[rounds] = statistics.median(
+            _hash("calibration-password", rounds)[1] for _ in range(samples)
+        )
+        if timings[rounds] > target_ms:
+            break
+        chosen = rounds
+    return chosen, timings
@@ -0,0 +1,124 @@
+"""Who is making a request, resolved from the bearer token without a User lookup.
+
+Tokens carry the user's ``site_id`` and ``organization_id``. The principal built from
+a token is kept in a small TTL + LRU cache keyed by the token, so repeated requests
+skip both JWT decoding and the database.
+
+Claims go stale when a user's site or organization changes. ``invalidate_principal``
+(or ``invalidate_principal_on_commit`` from inside a transaction) drops the cached
+principals of that user and records the time of the change; tokens issued before it
+are resolved from the database from then on. That record only exists in this process,
+so the profile saves also hand the client a fresh token with the new claims, and a
+token that says the user has no site is always checked against the database (the
+site may have been created through another worker since).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+DEFAULT_TTL_SECONDS = 60
+DEFAULT_MAX_ENTRIES = 1024
+
+
+@dataclass(frozen=True)
+class Principal:
+    user_id: int
+    site_id: int | None
+    organization_id: int | None
+
+
+class PrincipalCache:
+    """Thread-safe map of token -> Principal with per-entry expiry and LRU eviction."""
+
+    def __init__(self, ttl=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._changed_at = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, ttl, max_entries):
+        with self._lock:
+            self.ttl = ttl
+            self.max_entries = max_entries
+            self._entries.clear()
+
+    def get(self, token):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, token, principal, expires_at=None):
+        """Cache ``principal`` for ``ttl`` seconds, but never past the token's ``exp``."""
+        lifetime = self.ttl
+        if expires_at is not None:
+            lifetime = min(lifetime, expires_at - time.time())
+        if lifetime <= 0:
+            return
+        with self._lock:
+            self._entries[token] = (time.monotonic() + lifetime, principal)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            self._changed_at[user_id] = time.time()
+            stale = [t for t, (_, p) in self._entries.items() if p.user_id == user_id]
+            for token in stale:
+                del self._entries[token]
+
+    def claims_are_current(self, user_id, issued_at):
+        """False if the user's site or org changed after the token was issued."""
+        changed_at = self._changed_at.get(user_id)
+        return changed_at is None or (issued_at is not None and issued_at > changed_at)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._changed_at.clear()
+
+    def stats(self):
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+principal_cache = PrincipalCache()
+
+
+def invalidate_principal(user_id):
+    """Call whenever a user's site_id or organization_id changes."""
+    principal_cache.invalidate_user(user_id)
+
+
+_PENDING = "principals_to_invalidate"
+
+
+def invalidate_principal_on_commit(session, user_id):
+    """Invalidate once ``session`` commits, so no one caches the pre-commit row meanwhile."""
+    session.info.setdefault(_PENDING, set()).add(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    for user_id in session.info.pop(_PENDING, ()):
+        invalidate_principal(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session):
+    session.info.pop(_PENDING, None)
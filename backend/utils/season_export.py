@@ -0,0 +1,210 @@
+"""Streaming export of everything answered in one assessment season.
+
+Every record is a flat row with the columns in ``EXPORT_COLUMNS``; ``record_type``
+tells organizations, sites and the three kinds of answers apart. Rows come from
+queries read with ``yield_per`` and are encoded one chunk at a time, so memory stays
+flat no matter how many sites took part.
+"""
+
+import csv
+import io
+import json
+
+from sqlalchemy import select
+
+from backend.models import (
+    db,
+    Assessment,
+    Organization,
+    OrganizationQuestion,
+    OrganizationQuestionResponse,
+    Page,
+    Question,
+    QuestionResponse,
+    Site,
+    SiteAssessment,
+    SitePage,
+    SiteQuestion,
+    SiteQuestionResponse,
+)
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+EXPORT_COLUMNS = [
+    "record_type",
+    "organization_id",
+    "organization_name",
+    "site_id",
+    "site_name",
+    "people_served",
+    "page_title",
+    "question_id",
+    "question_slug",
+    "question_text",
+    "question_type",
+    "value",
+]
+
+
+def _season_site_ids(year, season):
+    return (
+        select(SiteAssessment.site_id)
+        .join(Assessment, Assessment.id == SiteAssessment.assessment_id)
+        .where(Assessment.year == year, Assessment.season == season)
+    )
+
+
+def _season_organization_ids(year, season):
+    return select(Site.organization_id).where(Site.id.in_(_season_site_ids(year, season)))
+
+
+def _stream(stmt):
+    return db.session.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+
+
+def _organizations(year, season):
+    stmt = (
+        select(Organization.id, Organization.name)
+        .where(Organization.id.in_(_season_organization_ids(year, season)))
+        .order_by(Organization.id)
+    )
+    for org_id, name in _stream(stmt):
+        yield {"record_type": "organization", "organization_id": org_id, "organization_name": name}
+
+
+def _sites(year, season):
+    stmt = (
+        select(Site.organization_id, Site.id, Site.name, Site.people_served)
+        .where(Site.id.in_(_season_site_ids(year, season)))
+        .order_by(Site.id)
+    )
+    for org_id, site_id, name, people_served in _stream(stmt):
+        yield {
+            "record_type": "site",
+            "organization_id": org_id,
+            "site_id": site_id,
+            "site_name": name,
+            "people_served": people_served,
+        }
+
+
+def _question_columns(question):
+    return question.id, question.slug, question.text, question.question_type
+
+
+def _answer(record_type, question_id, slug, text, question_type, value, **owner):
+    return {
+        "record_type": record_type,
+        **owner,
+        "question_id": question_id,
+        "question_slug": slug,
+        "question_text": text,
+        "question_type": question_type,
+        "value": value,
+    }
+
+
+def _organization_answers(year, season):
+    stmt = (
+        select(
+            OrganizationQuestionResponse.organization_id,
+            *_question_columns(OrganizationQuestion),
+            OrganizationQuestionResponse.value,
+        )
+        .join(
+            OrganizationQuestion,
+            OrganizationQuestion.id == OrganizationQuestionResponse.question_id,
+        )
+        .where(
+            OrganizationQuestionResponse.organization_id.in_(_season_organization_ids(year, season))
+        )
+        .order_by(OrganizationQuestionResponse.organization_id, OrganizationQuestion.order)
+    )
+    for org_id, *question in _stream(stmt):
+        yield _answer("organization_response", *question, organization_id=org_id)
+
+
+def _site_answers(year, season):
+    stmt = (
+        select(
+            SiteQuestionResponse.site_id,
+            *_question_columns(SiteQuestion),
+            SiteQuestionResponse.value,
+        )
+        .join(SiteQuestion, SiteQuestion.id == SiteQuestionResponse.question_id)
+        .where(SiteQuestionResponse.site_id.in_(_season_site_ids(year, season)))
+        .order_by(SiteQuestionResponse.site_id, SiteQuestion.order)
+    )
+    for site_id, *question in _stream(stmt):
+        yield _answer("site_response", *question, site_id=site_id)
+
+
+def _assessment_answers(year, season):
+    stmt = (
+        select(
+            SiteAssessment.site_id,
+            Page.title,
+            *_question_columns(Question),
+            QuestionResponse.value,
+        )
+        .join(SitePage, SitePage.id == QuestionResponse.site_page_id)
+        .join(SiteAssessment, SiteAssessment.id == SitePage.site_assessment_id)
+        .join(Assessment, Assessment.id == SiteAssessment.assessment_id)
+        .join(Question, Question.id == QuestionResponse.question_id)
+        .join(Page, Page.id == Question.page_id)
+        .where(Assessment.year == year, Assessment.season == season)
+        .order_by(SiteAssessment.site_id, Page.order, Question.order, Question.id)
+    )
+    for site_id, page_title, *question in _stream(stmt):
+        yield _answer("question_response", *question, site_id=site_id, page_title=page_title)
+
+
+def iter_season_records(year, season):
+    """Yield every export record of the season, one query (and batch) at a time."""
+    yield from _organizations(year, season)
+    yield from _sites(year, season)
+    yield from _organization_answers(year, season)
+    yield from _site_answers(year, season)
+    yield from _assessment_answers(year, season)
+
+
+def _chunks(lines, size=EXPORT_BATCH_SIZE):
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= size:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+def iter_ndjson(records):
+    return _chunks(json.dumps(record) + "\n" for record in records)
+
+
+def _csv_lines(records):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, lineterminator="\n")
+    writer.writeheader()
+    for record in records:
+        value = record.get("value")
+        if value is not None and not isinstance(value, str):
+            # lists, grids and numbers keep their JSON form in the value cell
+            record = {**record, "value": json.dumps(value)}
+        writer.writerow(record)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def iter_csv(records):
+    return _chunks(_csv_lines(records))
+
+
+def iter_season_export(year, season, export_format="ndjson"):
+    """Yield the season export as text chunks in ``export_format`` (ndjson or csv)."""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {export_format}")
+    records = iter_season_records(year, season)
+    return iter_csv(records) if export_format == "csv" else iter_ndjson(records)
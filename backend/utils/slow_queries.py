@@ -0,0 +1,247 @@
+"""Log the statements that take longer than ``SLOW_QUERY_THRESHOLD_MS``.
+
+Enabled by setting ``SLOW_QUERY_LOG_PATH`` (env ``SLOW_QUERY_LOG``). Each slow statement
+becomes one JSON line in a rotating file with:
+
+* ``statement``: the SQL with literals replaced by ``?`` and IN lists collapsed, and
+  ``fingerprint``, a short hash of it that groups executions of the same statement,
+* ``params``: the shape of the bound parameters (names and Python types, no values),
+* ``route``: the Flask endpoint handling the request, if any,
+* ``callSite``: the innermost frame in the app's own code that ran the statement,
+* ``plan``: the first time a fingerprint is logged by this process, the output of
+  ``EXPLAIN QUERY PLAN`` (SQLite) or ``EXPLAIN`` (PostgreSQL, MySQL) for it.
+
+``flask slow-queries`` ranks the logged statements by total and p95 time.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import sys
+import threading
+import time
+from datetime import datetime, UTC
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from flask import has_request_context, request
+from sqlalchemy import event
+
+THIS_FILE = Path(__file__).resolve()
+BACKEND_DIR = THIS_FILE.parent.parent
+EXPLAIN_PREFIXES = {
+    "sqlite": "EXPLAIN QUERY PLAN",
+    "postgresql": "EXPLAIN",
+    "mysql": "EXPLAIN",
+    "mariadb": "EXPLAIN",
+}
+EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT")
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|(?<!:):(?!:)\w+|\$\d+|\?")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement):
+    """``statement`` with literals and placeholders as ``?`` and IN lists as ``IN (...)``."""
+    sql = _STRING.sub("?", statement)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("IN (...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def fingerprint(normalized):
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12]
+
+
+def parameter_shape(parameters, executemany=False):
+    if executemany:
+        rows = list(parameters or ())
+        return {"rows": len(rows), "row": parameter_shape(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return None
+
+
+def call_site():
+    """``file:line in function`` of the innermost frame in the app's code, outside this module."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        path = Path(frame.f_code.co_filename)
+        if path.is_relative_to(BACKEND_DIR) and path != THIS_FILE:
+            relative = path.relative_to(BACKEND_DIR.parent)
+            return f"{relative}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+def explain(dbapi_connection, dialect_name, statement, parameters):
+    """The query plan of ``statement`` as a list of rows, or an error message."""
+    prefix = EXPLAIN_PREFIXES.get(dialect_name)
+    if prefix is None or not statement.lstrip().upper().startswith(EXPLAINABLE):
+        return None
+    # a failed statement aborts the whole transaction on PostgreSQL
+    savepoint = dialect_name == "postgresql"
+    cursor = dbapi_connection.cursor()
+    try:
+        if savepoint:
+            cursor.execute("SAVEPOINT slow_query_explain")
+        cursor.execute(f"{prefix} {statement}", parameters)
+        plan = [[str(column) for column in row] for row in cursor.fetchall()]
+        if savepoint:
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        return plan
+    except Exception as error:  # a plan is best effort; never fail the real query
+        if savepoint:
+            cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+        return {"error": str(error)}
+    finally:
+        cursor.close()
+
+
+class SlowQueryLog:
+    """Times statements on the engines it is installed on and logs the slow ones."""
+
+    def __init__(self, logger, threshold_ms):
+        self.logger = logger
+        self.threshold = threshold_ms / 1000
+        self._explained = set()
+        self._lock = threading.Lock()
+
+    def install(self, engine):
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            seconds = time.perf_counter() - conn.info["slow_query_started"].pop()
+            if seconds >= self.threshold:
+                self.record(conn, statement, parameters, executemany, seconds)
+
+        @event.listens_for(engine, "handle_error")
+        def handle_error(exception_context):
+            connection = exception_context.connection
+            if connection is not None and connection.info.get("slow_query_started"):
+                connection.info["slow_query_started"].pop()
+
+    def _first_time(self, key):
+        with self._lock:
+            if key in self._explained:
+                return False
+            self._explained.add(key)
+            return True
+
+    def record(self, conn, statement, parameters, executemany, seconds):
+        normalized = normalize_sql(statement)
+        key = fingerprint(normalized)
+        entry = {
+            "ts": datetime.now(UTC).isoformat(),
+            "ms": round(seconds * 1000, 3),
+            "fingerprint": key,
+            "statement": normalized,
+            "params": parameter_shape(parameters, executemany),
+            "route": request.endpoint if has_request_context() else None,
+            "callSite": call_site(),
+        }
+        if self._first_time(key):
+            plan_parameters = parameters[0] if executemany and parameters else parameters
+            entry["plan"] = explain(
+                conn.connection.dbapi_connection, conn.dialect.name, statement, plan_parameters
+            )
+        self.logger.info(json.dumps(entry, default=str))
+
+
+def slow_query_logger(path, max_bytes, backups):
+    """A logger writing bare JSON lines to a rotating file at ``path``."""
+    logger = logging.getLogger(f"backend.slow_queries.{Path(path).resolve()}")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    if not logger.handlers:
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+    return logger
+
+
+def init_slow_query_log(app, engines):
+    """Install the slow-query log on ``engines`` if ``SLOW_QUERY_LOG_PATH`` is set."""
+    path = app.config["SLOW_QUERY_LOG_PATH"]
+    if not path:
+        return None
+    log = SlowQueryLog(
+        slow_query_logger(
+            path, app.config["SLOW_QUERY_LOG_MAX_BYTES"], app.config["SLOW_QUERY_LOG_BACKUPS"]
+        ),
+        app.config["SLOW_QUERY_THRESHOLD_MS"],
+    )
+    for engine in engines:
+        log.install(engine)
+    return log
+
+
+def log_files(path):
+    """``path`` and its rotated backups, oldest first."""
+    path = Path(path)
+    backups = [p for p in path.parent.glob(f"{path.name}.*") if p.suffix[1:].isdigit()]
+    backups.sort(key=lambda p: int(p.suffix[1:]), reverse=True)
+    return backups + ([path] if path.exists() else [])
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list."""
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def analyze(paths):
+    """Aggregate log entries per fingerprint, slowest total first."""
+    groups = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as lines:
+            for line in lines:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                group = groups.setdefault(
+                    entry["fingerprint"],
+                    {
+                        "fingerprint": entry["fingerprint"],
+                        "statement": entry["statement"],
+                        "times": [],
+                        "routes": set(),
+                        "callSites": set(),
+                        "plan": None,
+                    },
+                )
+                group["times"].append(entry["ms"])
+                if entry.get("route"):
+                    group["routes"].add(entry["route"])
+                if entry.get("callSite"):
+                    group["callSites"].add(entry["callSite"])
+                if entry.get("plan") is not None:
+                    group["plan"] = entry["plan"]
+
+    ranked = []
+    for group in groups.values():
+        times = sorted(group.pop("times"))
+        ranked.append(
+            {
+                **group,
+                "count": len(times),
+                "totalMs": round(sum(times), 3),
+                "p50Ms": percentile(times, 0.5),
+                "p95Ms": percentile(times, 0.95),
+                "maxMs": times[-1],
+                "routes": sorted(group["routes"]),
+                "callSites": sorted(group["callSites"]),
+            }
+        )
+    ranked.sort(key=lambda g: g["totalMs"], reverse=True)
+    return ranked
@@ -2,9 +2,13 @@ from datetime import datetime, UTC
 
 from flask import session, request
 from flask import jsonify
+from sqlalchemy.orm import joinedload, selectinload
 
 from backend.models import db, SiteAssessment, SitePage, Page, User, Assessment, Question, Site
+from backend.catalog import get_assessment_catalog
 from backend.consts import REQUIRED_PAGES
+from backend.logic.progress import LOCKED, UNSTARTED_REQUIRED, initial_counters
+from backend.logic.results import rebuild_result
 
 
 def create_site_assessment(site_id, assessment_id):
@@ -14,24 +18,56 @@ def create_site_assessment(site_id, assessment_id):
     db.session.commit()
 
     # Create SitePages for the assessment
-    pages = Page.query.filter_by(assessment_id=assessment_id).all()
+    pages = get_assessment_catalog(assessment_id).pages
+    site_pages = []
     for page in pages:
+        if page.retired:
+            continue
         is_required = page.title in REQUIRED_PAGES
         site_page = SitePage(
             site_assessment_id=site_assessment.id,
             page_id=page.id,
             required=is_required,
-            progress="UNSTARTEDREQUIRED" if is_required else "LOCKED",
+            progress=UNSTARTED_REQUIRED if is_required else LOCKED,
             order=page.order,
             is_confirmation_page=page.is_confirmation_page,
             title=page.title,
         )
         db.session.add(site_page)
+        site_pages.append(site_page)
 
+    for counter, value in initial_counters(site_pages).items():
+        setattr(site_assessment, counter, value)
+    db.session.flush()
+    rebuild_result(site_assessment)
     db.session.commit()
     return site_assessment
 
 
+def site_assessment_tree_query():
+    """Query SiteAssessments with the site and site pages the API serializes eager loaded.
+
+    The site is joined in and the site pages are fetched with one extra SELECT ... IN
+    query. Pages and questions come from the question catalog, so serializing an
+    assessment costs a fixed number of queries regardless of how many pages it has.
+    """
+    return SiteAssessment.query.options(
+        joinedload(SiteAssessment.site),
+        selectinload(SiteAssessment.site_pages),
+    )
+
+
+def bump_site_assessment_revisions(*criteria):
+    """Increment the revision of the SiteAssessments matching ``criteria``.
+
+    The revision is part of the ETag of the assessment endpoints, so every save that
+    changes an assessment, its pages, responses or site must call this.
+    """
+    SiteAssessment.query.filter(*criteria).update(
+        {SiteAssessment.revision: SiteAssessment.revision + 1}, synchronize_session=False
+    )
+
+
 def get_current_season():
     """Determine the current season based on the month."""
     month = datetime.now(UTC).month
@@ -57,47 +93,3 @@ def ensure_assessment_exists(site_id):
         site_assessment = create_site_assessment(site_id, assessment.id)
 
     return site_assessment
-
-
-def unlock_remaining_pages(site_assessment_id):
-    """Unlock non-required SitePages once all required SitePages are complete."""
-    site_pages = SitePage.query.filter_by(site_assessment_id=site_assessment_id).all()
-    # if Demographics is locked, make it "UNSTARTEDREQUIRED" and return
-
-    original_required_pages = [sp for sp in site_pages if sp.title in REQUIRED_PAGES]
-
-    # If all required pages are complete, unlock remaining pages
-    if all(sp.progress == "COMPLETE" for sp in original_required_pages):
-        for sp in site_pages:
-            if sp.progress == "LOCKED":
-                if sp.is_confirmation_page or sp.required:
-                    sp.progress = "UNSTARTEDREQUIRED"
-                else:
-                    sp.progress = "UNSTARTEDOPTIONAL"
-                db.session.add(sp)
-        db.session.commit()
-
-
-def update_from_profile_page(page, site_assessment, responses_data):
-    """Update requires pages from the services the user has selected."""
-    for response in responses_data:
-        question = Question.query.filter_by(id=response["questionId"]).first()
-        if question and question.text == "Which of the following areas do you have needs in?":
-            required_pages = response["value"]
-            for site_page in site_assessment.site_pages:
-                page = Page.query.filter_by(id=site_page.page_id).first()
-                if page.title in required_pages:
-                    site_page.required = True
-                    db.session.add(site_page)
-        if question and question.text == "Organization Name":
-            site = Site.query.filter_by(id=site_assessment.site_id).first()
-            site.name = response["value"]
-            db.session.add(site)
-        if (
-            question
-            and question.text == "How many individuals does your organisation support in one month?"
-        ):
-            site = Site.query.filter_by(id=site_assessment.site_id).first()
-            site.people_served = response["value"]
-            db.session.add(site)
-    db.session.commit()
@@ -1,33 +1,142 @@
-from backend.models import Question
+import json
+import numbers
 
+MULTI_SELECT_TYPES = {"MultiSelect", "MultiselectWithOther"}
+OPTION_TYPES = MULTI_SELECT_TYPES | {"Dropdown"}
 
-def validate_responses(responses, require_all=False):
-    """Validate responses before saving or completing a SitePage."""
+# row labels, column labels of the grids rendered by DemoGridInput / SizingGridInput
+GRID_SHAPES = {
+    "DemoGrid": (
+        frozenset({"Male", "Female"}),
+        frozenset({"Infants", "Kids", "Teens", "Adults"}),
+    ),
+    "SizingGrid": (
+        frozenset({"Men", "Women", "Boys", "Girls"}),
+        frozenset({"XS", "S", "M", "L", "XL", "XXL"}),
+    ),
+}
+
+
+def is_need_question(text):
+    """Needs questions are highlighted as cards in the assessment summary."""
+    return "need" in text.lower()
+
+
+class CompiledQuestion:
+    """A question definition reduced to what validation and save side effects need.
+
+    ``checks`` is the list of per-type value checks chosen once when the question is
+    compiled, so validating a response never inspects the question type again.
+    """
+
+    __slots__ = (
+        "id",
+        "text",
+        "subtext",
+        "slug",
+        "order",
+        "question_type",
+        "required",
+        "parent_question_id",
+        "options",
+        "checks",
+    )
+
+    def __init__(self, question):
+        self.id = question.id
+        self.text = question.text
+        self.subtext = question.subtext
+        self.slug = question.slug
+        self.order = question.order
+        self.parent_question_id = question.parent_question_id
+        self.question_type = question.question_type
+        self.required = question.required
+        self.options = frozenset(question.options or [])
+        self.checks = _checks_for(self, question.allows_additional_input)
+
+    def validate(self, response, require_all=False):
+        """Return the errors for ``response``; may coerce ``response["value"]`` in place."""
+        errors = []
+        if require_all and self.required and not response.get("value"):
+            errors.append(f"Missing value for required question: {self.text}")
+        if not response.get("value"):
+            return errors
+        for check in self.checks:
+            error = check(self, response)
+            if error:
+                errors.append(error)
+                break
+        return errors
+
+
+def _check_numeric(question, response):
+    try:
+        response["value"] = float(response["value"])
+    except (TypeError, ValueError):
+        return f"Invalid numeric response for question: {question.text}: {response['value']}"
+
+
+def _check_list(question, response):
+    if not isinstance(response["value"], list):
+        return f"MultiSelect responses must be a list for question: {question.text}"
+
+
+def _check_options(question, response):
+    value = response["value"]
+    values = value if isinstance(value, list) else [value]
+    invalid = [v for v in values if not isinstance(v, str) or v not in question.options]
+    if invalid:
+        return f"Invalid option for question: {question.text}: {invalid}"
+
+
+def _check_grid(question, response):
+    rows, columns = GRID_SHAPES[question.question_type]
+    grid = response["value"]
+    if isinstance(grid, str):
+        try:
+            grid = json.loads(grid)
+        except ValueError:
+            grid = None
+    valid = isinstance(grid, dict) and all(
+        row in rows
+        and isinstance(cells, dict)
+        and all(
+            column in columns and isinstance(count, numbers.Number) and not isinstance(count, bool)
+            for column, count in cells.items()
+        )
+        for row, cells in grid.items()
+    )
+    if not valid:
+        return f"Invalid grid response for question: {question.text}"
+
+
+def _checks_for(question, allows_additional_input):
+    question_type = question.question_type
+    checks = []
+    if question_type == "Numeric":
+        checks.append(_check_numeric)
+    if question_type in MULTI_SELECT_TYPES:
+        checks.append(_check_list)
+    # free text is allowed next to the options for the "WithOther" variants
+    if question_type in OPTION_TYPES and question.options and not allows_additional_input:
+        checks.append(_check_options)
+    if question_type in GRID_SHAPES:
+        checks.append(_check_grid)
+    return checks
+
+
+def validate_responses(responses, questions, require_all=False):
+    """Validate responses before saving or completing a SitePage.
+
+    ``questions`` maps question id to CompiledQuestion, normally the ``questions`` of
+    the assessment's catalog.
+    """
     errors = []
     for response in responses:
-        question = Question.query.get(response["questionId"])
+        question = questions.get(response["questionId"])
         if not question:
             errors.append(f"Invalid question ID: {response['questionId']}")
             continue
-
-        # Ensure required questions have answers
-        if require_all and question.required and not response.get("value"):
-            errors.append(f"Missing value for required question: {question.text}")
-        if not response.get("value"):
-            continue
-
-        # Numeric validationx
-        if question.question_type == "Numeric":
-            try:
-                response["value"] = float(response["value"])
-            except ValueError:
-                errors.append(
-                    f"Invalid numeric response for question: {question.text}: {response['value']}"
-                )
-
-        # MultiSelect validation
-        if question.question_type in ["MultiSelect", "MultiselectWithOther"]:
-            if not isinstance(response.get("value"), list):
-                errors.append(f"MultiSelect responses must be a list for question: {question.text}")
+        errors.extend(question.validate(response, require_all))
 
     return errors
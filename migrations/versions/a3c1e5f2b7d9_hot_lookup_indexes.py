@@ -0,0 +1,100 @@
+"""Indexes and uniqueness constraints for the hot lookups
+
+Revision ID: a3c1e5f2b7d9
+Revises:
+Create Date: 2026-10-18 10:00:00.000000
+
+Databases created with ``flask seed`` (``db.create_all``) already have these, so
+every index is only created when missing. Duplicate rows are removed before the
+unique indexes go in: for responses the newest row per (owner, question) is kept,
+which is the value the app has been showing; for site assessments the oldest one
+per (site, assessment) is kept together with its pages, answers and result.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c1e5f2b7d9'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# (table, index name, columns, unique)
+INDEXES = [
+    ('question_response', 'uq_question_response_site_page_id_question_id',
+     ['site_page_id', 'question_id'], True),
+    ('organization_question_response',
+     'uq_organization_question_response_organization_id_question_id',
+     ['organization_id', 'question_id'], True),
+    ('site_question_response', 'uq_site_question_response_site_id_question_id',
+     ['site_id', 'question_id'], True),
+    ('site_assessment', 'uq_site_assessment_site_id_assessment_id',
+     ['site_id', 'assessment_id'], True),
+    ('site_page', 'ix_site_page_site_assessment_id', ['site_assessment_id'], False),
+    ('page', 'ix_page_assessment_id_order', ['assessment_id', 'order'], False),
+    ('question', 'ix_question_page_id_order', ['page_id', 'order'], False),
+    ('question', 'ix_question_slug', ['slug'], False),
+    ('organization_question', 'ix_organization_question_slug', ['slug'], False),
+    ('site_question', 'ix_site_question_slug', ['slug'], False),
+]
+
+# response table -> owner column
+RESPONSE_OWNERS = {
+    'question_response': 'site_page_id',
+    'organization_question_response': 'organization_id',
+    'site_question_response': 'site_id',
+}
+
+
+def _dedupe_responses(table, owner):
+    op.execute(
+        f"DELETE FROM {table} WHERE id NOT IN ("
+        f"SELECT MAX(id) FROM {table} GROUP BY {owner}, question_id)"
+    )
+
+
+def _dedupe_site_assessments(tables):
+    duplicates = (
+        "SELECT id FROM site_assessment WHERE id NOT IN ("
+        "SELECT MIN(id) FROM site_assessment GROUP BY site_id, assessment_id)"
+    )
+    op.execute(
+        "DELETE FROM question_response WHERE site_page_id IN ("
+        f"SELECT id FROM site_page WHERE site_assessment_id IN ({duplicates}))"
+    )
+    op.execute(f"DELETE FROM site_page WHERE site_assessment_id IN ({duplicates})")
+    if 'site_assessment_result' in tables:
+        op.execute(
+            f"DELETE FROM site_assessment_result WHERE site_assessment_id IN ({duplicates})"
+        )
+    op.execute(f"DELETE FROM site_assessment WHERE id IN ({duplicates})")
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    if 'site_assessment' in tables:
+        _dedupe_site_assessments(tables)
+    for table, owner in RESPONSE_OWNERS.items():
+        if table in tables:
+            _dedupe_responses(table, owner)
+
+    for table, name, columns, unique in INDEXES:
+        if table not in tables:
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table)}
+        if name not in existing:
+            op.create_index(name, table, columns, unique=unique)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    for table, name, columns, unique in reversed(INDEXES):
+        if table not in tables:
+            continue
+        if name in {index['name'] for index in inspector.get_indexes(table)}:
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,59 @@
+"""Page progress counters on site_assessment
+
+Revision ID: b4d2f6a8c0e1
+Revises: a3c1e5f2b7d9
+Create Date: 2026-10-18 12:00:00.000000
+
+The counters are backfilled by counting each assessment's site pages, with the same
+rules as backend/logic/progress.py. Databases created with ``flask seed`` already
+have the columns, so only missing ones are added; the backfill runs either way.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4d2f6a8c0e1'
+down_revision = 'a3c1e5f2b7d9'
+branch_labels = None
+depends_on = None
+
+# counter -> condition on site_page
+COUNTERS = {
+    'pages_locked': "progress = 'LOCKED'",
+    'required_remaining': (
+        "required = :true AND (is_confirmation_page IS NULL OR is_confirmation_page = :false)"
+        " AND progress NOT IN ('LOCKED', 'COMPLETE')"
+    ),
+    'optional_started': "progress = 'STARTEDOPTIONAL'",
+    'pages_complete': "progress = 'COMPLETE'",
+}
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'site_assessment' not in inspector.get_table_names():
+        return
+    existing = {column['name'] for column in inspector.get_columns('site_assessment')}
+    with op.batch_alter_table('site_assessment') as batch_op:
+        for counter in COUNTERS:
+            if counter not in existing:
+                batch_op.add_column(
+                    sa.Column(counter, sa.Integer(), nullable=False, server_default='0')
+                )
+
+    assignments = ", ".join(
+        f"{counter} = (SELECT COUNT(*) FROM site_page"
+        f" WHERE site_page.site_assessment_id = site_assessment.id AND {condition})"
+        for counter, condition in COUNTERS.items()
+    )
+    op.get_bind().execute(
+        sa.text(f"UPDATE site_assessment SET {assignments}").bindparams(true=True, false=False)
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('site_assessment') as batch_op:
+        for counter in reversed(COUNTERS):
+            batch_op.drop_column(counter)
@@ -0,0 +1,56 @@
+"""Season templates and retired pages and questions
+
+Revision ID: c6e8a0b2d4f3
+Revises: b4d2f6a8c0e1
+Create Date: 2026-10-18 14:00:00.000000
+
+``assessment.template_id`` points a season at the assessment whose pages and
+questions it uses, and ``retired`` flags rows that were dropped from questions.csv
+(see backend/logic/catalog_sync.py). Existing seasons own their rows and nothing is
+retired, so the new columns start out NULL and false. Databases created with
+``flask seed`` already have the columns, so only missing ones are added.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6e8a0b2d4f3'
+down_revision = 'b4d2f6a8c0e1'
+branch_labels = None
+depends_on = None
+
+RETIRED_TABLES = ['page', 'question', 'organization_question', 'site_question']
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    def missing(table, column):
+        if table not in tables:
+            return False
+        return column not in {c['name'] for c in inspector.get_columns(table)}
+
+    if missing('assessment', 'template_id'):
+        with op.batch_alter_table('assessment') as batch_op:
+            batch_op.add_column(sa.Column('template_id', sa.Integer(), nullable=True))
+            batch_op.create_foreign_key(
+                'fk_assessment_template_id_assessment', 'assessment', ['template_id'], ['id']
+            )
+
+    for table in RETIRED_TABLES:
+        if missing(table, 'retired'):
+            with op.batch_alter_table(table) as batch_op:
+                batch_op.add_column(
+                    sa.Column('retired', sa.Boolean(), nullable=False, server_default=sa.false())
+                )
+
+
+def downgrade():
+    for table in reversed(RETIRED_TABLES):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('retired')
+    with op.batch_alter_table('assessment') as batch_op:
+        batch_op.drop_column('template_id')
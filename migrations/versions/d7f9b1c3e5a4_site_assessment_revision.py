@@ -0,0 +1,37 @@
+"""Revision counter on site_assessment
+
+Revision ID: d7f9b1c3e5a4
+Revises: c6e8a0b2d4f3
+Create Date: 2026-10-18 14:10:00.000000
+
+``site_assessment.revision`` is part of the ETag of the assessment endpoints and is
+incremented by every save. Existing rows start at 0. Databases created with
+``flask seed`` already have the column, so it is only added when missing.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7f9b1c3e5a4'
+down_revision = 'c6e8a0b2d4f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'site_assessment' not in inspector.get_table_names():
+        return
+    existing = {column['name'] for column in inspector.get_columns('site_assessment')}
+    if 'revision' not in existing:
+        with op.batch_alter_table('site_assessment') as batch_op:
+            batch_op.add_column(
+                sa.Column('revision', sa.Integer(), nullable=False, server_default='0')
+            )
+
+
+def downgrade():
+    with op.batch_alter_table('site_assessment') as batch_op:
+        batch_op.drop_column('revision')
@@ -0,0 +1,41 @@
+"""catalog_version table
+
+Revision ID: e8a0c2d4f6b5
+Revises: d7f9b1c3e5a4
+Create Date: 2026-10-18 14:20:00.000000
+
+A single-row counter bumped whenever question definitions change; processes
+compare it with the version of their cached catalogs (backend/catalog.py). The
+row starts at version 0, which is what the app assumes while the table is empty.
+Databases created with ``flask seed`` already have the table, so it is only
+created when missing, and the row only inserted when there is none.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8a0c2d4f6b5'
+down_revision = 'd7f9b1c3e5a4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'catalog_version' not in inspector.get_table_names():
+        op.create_table(
+            'catalog_version',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('version', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+        )
+    op.execute(
+        "INSERT INTO catalog_version (id, version) SELECT 1, 0"
+        " WHERE NOT EXISTS (SELECT 1 FROM catalog_version)"
+    )
+
+
+def downgrade():
+    op.drop_table('catalog_version')
@@ -44,13 +44,21 @@ export const authOptions: NextAuthOptions = {
     async jwt({
       token,
       user,
+      trigger,
+      session,
     }: {
       token: JWT;
       user?: (DefaultUser & { accessToken?: string }) | null;
+      trigger?: "signIn" | "signUp" | "update";
+      session?: { accessToken?: string };
     }) {
       if (user) {
         token.accessToken = user.accessToken;
       }
+      // profile saves return a new token once the user's site or organization changed
+      if (trigger === "update" && session?.accessToken) {
+        token.accessToken = session.accessToken;
+      }
       return token;
     },
     async session({ session, token }: { session: DefaultSession; token: JWT }) {
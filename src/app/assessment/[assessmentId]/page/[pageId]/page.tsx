@@ -170,6 +170,10 @@ export default function AssessmentPage() {
 
     // Then: Route based on context
     if (isConfirmationPage && confirmed) {
+      await fetch(`/flask-api/site-assessment/${siteAssessment.id}/confirm`, {
+        method: "POST",
+        headers: { Authorization: `Bearer ${session.user.accessToken}` },
+      });
       router.push(`/assessment/${siteAssessment.id}/summary`);
     } else {
       const currentIndex = assessmentPages.findIndex(
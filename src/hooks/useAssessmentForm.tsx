@@ -12,7 +12,7 @@ export function useAssessmentForm(config: {
   saveEndpoint: string;
   onSuccessRedirect: string;
 }) {
-  const { data: session, status } = useSession();
+  const { data: session, status, update } = useSession();
   const router = useRouter();
 
   const [questions, setQuestions] = useState<Question[]>([]);
@@ -111,9 +111,12 @@ export function useAssessmentForm(config: {
         router.push("/login");
         return;
       }
+      const body = await res.json();
       if (!res.ok) {
-        const err = await res.json();
-        throw new Error(err.error || "Failed to save survey data");
+        throw new Error(body.error || "Failed to save survey data");
+      }
+      if (body.accessToken) {
+        await update({ accessToken: body.accessToken });
       }
 
       router.push(config.onSuccessRedirect);